@@ -0,0 +1,317 @@
+"""Benchmark the hot loop of :mod:`sequana_pipetools.monitor`.
+
+Synthetic working directories (``logs/<rule>/<sample>.log`` files, output
+files acting as noise and a ``.sequana/snakemake.log``) are generated for a
+given number of jobs, in the snakemake v7 or v8 log format.  Each stage of a
+monitor tick is then timed over several ticks, new jobs being started and
+finished between two ticks as in a real run.  For each stage the median, 95th
+percentile and first (cold) tick latencies are reported together with the
+memory allocated and the peak memory measured with tracemalloc.
+
+Usage::
+
+    python benchmarks/bench_monitor.py                     # 1k/10k/100k jobs, v7 and v8
+    python benchmarks/bench_monitor.py -n 1000 -f v8 --ticks 20
+    python benchmarks/bench_monitor.py -n 10000 --save baseline.json
+    python benchmarks/bench_monitor.py -n 10000 --compare baseline.json --tolerance 0.25
+
+With ``--compare``, the exit code is 1 if the median latency of any stage is
+slower than the baseline by more than the tolerance.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import rich_click as click
+from rich.console import Console
+from rich.table import Table
+
+from sequana_pipetools import monitor
+
+RULES = (
+    "fastqc",
+    "fastp",
+    "bowtie2",
+    "samtools_sort",
+    "mark_duplicates",
+    "feature_counts",
+    "salmon",
+    "qualimap",
+    "bamcoverage",
+    "multiqc_sample",
+)
+
+_TS_FMT = "%a %b %d %H:%M:%S %Y"
+
+
+def _job_start(ts: datetime, rule: str, sample: str, jobid: int) -> str:
+    return (
+        f"[{ts.strftime(_TS_FMT)}]\n"
+        f"{'localrule' if rule == 'fastqc' else 'rule'} {rule}:\n"
+        f"    input: data/{sample}_R1_.fastq.gz\n"
+        f"    output: {sample}/{rule}/{sample}.out\n"
+        f"    log: logs/{rule}/{sample}.log\n"
+        f"    jobid: {jobid}\n"
+        f"    reason: Missing output files: {sample}/{rule}/{sample}.out\n"
+        f"    wildcards: sample={sample}\n"
+        f"    resources: tmpdir=/tmp\n\n"
+    )
+
+
+def _job_end(fmt: str, ts: datetime, rule: str, jobid: int) -> str:
+    if fmt == "v7":
+        finished = f"Finished jobid: {jobid} (Rule: {rule})\n"
+    else:
+        finished = f"Finished job {jobid}.\n"
+    return f"[{ts.strftime(_TS_FMT)}]\n{finished}{jobid} of many steps done\n"
+
+
+class SyntheticRun:
+    """A working directory with ``n_jobs`` jobs spread over :data:`RULES`.
+
+    Jobs are numbered in order; all but the last ``n_running`` ones are
+    finished (old log files, start and end blocks in the snakemake log).
+    :meth:`advance` finishes the running jobs and starts ``churn`` new ones,
+    mimicking what happens between two monitor ticks.
+    """
+
+    def __init__(self, root: Path, n_jobs: int, fmt: str = "v8", running: float = 0.01, noise: int = 2):
+        self.root = Path(root)
+        self.fmt = fmt
+        self.n_jobs = n_jobs
+        self.noise = noise
+        self.snakelog = self.root / ".sequana" / "snakemake.log"
+        self.snakelog.parent.mkdir(parents=True, exist_ok=True)
+        self.ts = datetime(2025, 1, 1, 8, 0, 0)
+        self.running: list = []
+        self.log_to_job: dict = {}
+        self.expected: dict = {}
+        self._next = 0
+
+        n_running = max(1, int(n_jobs * running))
+        old = time.time() - 3600
+        with open(self.snakelog, "w") as fh:
+            for _ in range(n_jobs - n_running):
+                rule, sample, jobid, log = self._new_job()
+                fh.write(_job_start(self.ts, rule, sample, jobid))
+                self.ts += timedelta(seconds=1)
+                fh.write(_job_end(fmt, self.ts, rule, jobid))
+                os.utime(log, (old, old))
+            for _ in range(n_running):
+                job = self._new_job()
+                fh.write(_job_start(self.ts, *job[:3]))
+                self.running.append(job)
+
+    def _new_job(self):
+        jobid = self._next
+        self._next += 1
+        rule = RULES[jobid % len(RULES)]
+        sample = f"sample_{jobid // len(RULES):06d}"
+        log = self.root / "logs" / rule / f"{sample}.log"
+        log.parent.mkdir(parents=True, exist_ok=True)
+        log.write_text(f"{rule} {sample}\n")
+        for i in range(self.noise):
+            out = self.root / sample / rule / f"{sample}.{i}.out"
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.touch()
+        rel = str(log.relative_to(self.root))
+        self.log_to_job[rel] = (rule, sample)
+        self.expected[rule] = self.expected.get(rule, 0) + 1
+        return rule, sample, jobid, log
+
+    def advance(self, churn: int) -> None:
+        """Finish the running jobs and start ``churn`` new ones."""
+        old = time.time() - 3600
+        self.ts += timedelta(seconds=1)
+        with open(self.snakelog, "a") as fh:
+            for rule, _sample, jobid, log in self.running:
+                fh.write(_job_end(self.fmt, self.ts, rule, jobid))
+                os.utime(log, (old, old))
+            self.running = []
+            for _ in range(churn):
+                job = self._new_job()
+                fh.write(_job_start(self.ts, *job[:3]))
+                self.running.append(job)
+
+
+def _render(group) -> None:
+    Console(file=io.StringIO(), width=160).print(group)
+
+
+def _stages(run: SyntheticRun):
+    """Return the list of ``(name, callable)`` stages of a monitor tick.
+
+    Stages are stateful (like in ``run_monitor``): each callable is called
+    once per tick and carries its state over to the next tick.
+    """
+    workdir = run.root
+    ctx = {"full": {}, "poll": {}, "inotify": {}, "sm_full": {}, "sm": {}, "prev_merged": {}, "merged": {}}
+    polling = monitor._PollingLogWatcher(workdir)
+    parser = monitor._SnakemakeLogParser(run.snakelog)
+    start_time = time.time()
+    counters = monitor._RuleCounters(start_time)
+
+    def scan_full():
+        ctx["full"] = monitor._scan_logs(workdir, ctx["full"], run.log_to_job)
+
+    def scan_polling():
+        ctx["poll"] = monitor._scan_logs(workdir, ctx["poll"], run.log_to_job, watcher=polling)
+
+    def snakelog_full():
+        ctx["sm_full"] = monitor._scan_snakemake_log(run.snakelog, ctx["sm_full"])
+
+    def snakelog_tail():
+        ctx["sm"] = parser.update()
+
+    def merge():
+        ctx["merged"], ctx["prev_merged"] = monitor._merge_states(ctx["poll"], ctx["sm"], ctx["prev_merged"])
+
+    def count():
+        counters.update(ctx["merged"])
+
+    def build_display():
+        ctx["group"] = monitor._build_display(
+            "bench", "", run.expected, ctx["merged"], start_time, None, {}, counters=counters
+        )
+
+    def render():
+        _render(ctx["group"])
+
+    stages = [("_scan_logs[rglob]", scan_full), ("_scan_logs[polling]", scan_polling)]
+    try:
+        inotify = monitor._InotifyLogWatcher(workdir)
+
+        def scan_inotify():
+            ctx["inotify"] = monitor._scan_logs(workdir, ctx["inotify"], run.log_to_job, watcher=inotify)
+
+        stages.append(("_scan_logs[inotify]", scan_inotify))
+    except OSError:
+        pass
+    stages += [
+        ("_scan_snakemake_log[full]", snakelog_full),
+        ("_scan_snakemake_log[tail]", snakelog_tail),
+        ("_merge_states", merge),
+        ("_RuleCounters.update", count),
+        ("_build_display", build_display),
+        ("render", render),
+    ]
+    return stages
+
+
+def benchmark(n_jobs: int, fmt: str, ticks: int = 10, churn: int = 20, skip=()) -> dict:
+    """Run the benchmark for one configuration; return ``{stage: metrics}``."""
+    with tempfile.TemporaryDirectory(prefix="sequana_monitor_bench_") as tmpdir:
+        run = SyntheticRun(Path(tmpdir), n_jobs, fmt)
+        stages = [(name, func) for name, func in _stages(run) if not any(s in name for s in skip)]
+        timings: dict = {name: [] for name, _ in stages}
+
+        for _ in range(ticks):
+            for name, func in stages:
+                t0 = time.perf_counter()
+                func()
+                timings[name].append(time.perf_counter() - t0)
+            run.advance(churn)
+
+        # one more tick under tracemalloc (it slows execution down, so timings
+        # above are measured without it)
+        memory: dict = {}
+        tracemalloc.start()
+        try:
+            for name, func in stages:
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                func()
+                current, peak = tracemalloc.get_traced_memory()
+                memory[name] = (current - before, peak - before)
+        finally:
+            tracemalloc.stop()
+
+    results = {}
+    for name, values in timings.items():
+        steady = values[1:] or values
+        results[name] = {
+            "first_ms": values[0] * 1000,
+            "median_ms": statistics.median(steady) * 1000,
+            "p95_ms": sorted(steady)[min(len(steady) - 1, int(0.95 * len(steady)))] * 1000,
+            "alloc_kib": memory[name][0] / 1024,
+            "peak_kib": memory[name][1] / 1024,
+        }
+    return results
+
+
+def _report(console: Console, key: str, results: dict, baseline: dict | None) -> list:
+    table = Table(title=key, title_justify="left")
+    for col in ("stage", "first (ms)", "median (ms)", "p95 (ms)", "alloc (KiB)", "peak (KiB)"):
+        table.add_column(col, justify="left" if col == "stage" else "right", no_wrap=True)
+    if baseline is not None:
+        table.add_column("vs baseline", justify="right")
+
+    regressions = []
+    for name, m in results.items():
+        row = [
+            name,
+            f"{m['first_ms']:.2f}",
+            f"{m['median_ms']:.2f}",
+            f"{m['p95_ms']:.2f}",
+            f"{m['alloc_kib']:.0f}",
+            f"{m['peak_kib']:.0f}",
+        ]
+        if baseline is not None:
+            ref = baseline.get(f"{key}/{name}")
+            if ref:
+                ratio = m["median_ms"] / max(ref["median_ms"], 1e-6)
+                row.append(f"{ratio:.2f}x")
+                regressions.append((f"{key}/{name}", ratio))
+            else:
+                row.append("—")
+        table.add_row(*row)
+    console.print(table)
+    return regressions
+
+
+@click.command(context_settings=dict(help_option_names=["-h", "--help"]))
+@click.option(
+    "-n", "--jobs", "jobs", type=int, multiple=True, help="Number of jobs (repeatable). Default: 1000 10000 100000"
+)
+@click.option(
+    "-f", "--format", "formats", type=click.Choice(["v7", "v8"]), multiple=True, help="Snakemake log format(s)"
+)
+@click.option("--ticks", default=10, show_default=True, help="Number of monitor ticks per configuration")
+@click.option("--churn", default=20, show_default=True, help="Jobs started (and finished) between two ticks")
+@click.option("--skip", multiple=True, help="Skip stages whose name contains this string (e.g. rglob)")
+@click.option("--save", type=click.Path(), help="Save results as JSON (to be used later with --compare)")
+@click.option("--compare", type=click.Path(exists=True), help="Compare median latencies with a saved JSON file")
+@click.option("--tolerance", default=0.25, show_default=True, help="Allowed relative slowdown with --compare")
+def main(jobs, formats, ticks, churn, skip, save, compare, tolerance):
+    """Benchmark the sequana_pipetools monitor on synthetic working directories."""
+    console = Console()
+    baseline = json.loads(Path(compare).read_text()) if compare else None
+    flat: dict = {}
+    regressions = []
+    for fmt in formats or ("v7", "v8"):
+        for n_jobs in jobs or (1000, 10000, 100000):
+            key = f"{fmt}/{n_jobs}"
+            results = benchmark(n_jobs, fmt, ticks=ticks, churn=churn, skip=skip)
+            regressions += _report(console, key, results, baseline)
+            flat.update({f"{key}/{name}": m for name, m in results.items()})
+
+    if save:
+        Path(save).write_text(json.dumps(flat, indent=2))
+
+    slower = [(name, ratio) for name, ratio in regressions if ratio > 1 + tolerance]
+    for name, ratio in slower:
+        console.print(f"[bold red]Regression[/bold red] {name}: {ratio:.2f}x slower than baseline")
+    sys.exit(1 if slower else 0)
+
+
+if __name__ == "__main__":
+    main()
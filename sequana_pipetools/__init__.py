@@ -1,4 +1,4 @@
-from importlib import metadata
+from importlib import import_module, metadata
 
 
 def get_package_version(package_name):
@@ -11,27 +11,53 @@ def get_package_version(package_name):
 
 version = get_package_version("sequana_pipetools")
 
-from easydev.logging_tools import Logging
-
-logger = Logging("sequana_pipetools", "WARNING", "cyan")
-# To keep the inheritance/propagation of levels. Logging from easydev will do
-# the formatting only.
+# Same setup as easydev.logging_tools.Logging("sequana_pipetools", "WARNING", "cyan")
+# (colored formatting and level), without importing easydev, which is slow.
 import colorlog
 
-logger = colorlog.getLogger(logger.name)
-
-from .misc import (  # noqa: F401
-    AttrDict,
-    download_and_extract_tar_gz,
-    levenshtein_distance,
-    url2hash,
-)
-from .sequana_manager import SequanaManager  # noqa: F401
-from .snaketools import (  # noqa: F401
-    Pipeline,
-    PipelineManager,
-    PipelineManagerDirectory,
-    SequanaConfig,
-    get_run,
-    get_shell,
+logger = colorlog.getLogger("sequana_pipetools")
+_handler = colorlog.StreamHandler()
+_handler.setFormatter(
+    colorlog.ColoredFormatter(
+        "%(log_color)s%(levelname)-8s[%(name)s:%(lineno)d]: %(reset)s %(cyan)s%(message)s",
+        log_colors={"DEBUG": "cyan", "INFO": "green", "WARNING": "yellow", "ERROR": "red", "CRITICAL": "bold_red"},
+    )
 )
+logger.addHandler(_handler)
+logger.setLevel("WARNING")
+
+# The public API is imported when first used (PEP 562), so that importing
+# sequana_pipetools (pipelines --help, completion, every snakemake job) stays
+# cheap. See tests/test_import.py for the import-time budget.
+_LAZY = {
+    "AttrDict": "misc",
+    "download_and_extract_tar_gz": "misc",
+    "levenshtein_distance": "misc",
+    "url2hash": "misc",
+    "SequanaManager": "sequana_manager",
+    "Pipeline": "snaketools",
+    "PipelineManager": "snaketools",
+    "PipelineManagerDirectory": "snaketools",
+    "SequanaConfig": "snaketools",
+    "get_run": "snaketools",
+    "get_shell": "snaketools",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(f"{__name__}.{_LAZY[name]}"), name)
+        globals()[name] = value
+        return value
+    # submodules (e.g. sequana_pipetools.snaketools)
+    if not name.startswith("__"):
+        try:
+            return import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as err:
+            if err.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
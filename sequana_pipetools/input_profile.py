@@ -0,0 +1,111 @@
+"""Size profile of the input files of a pipeline.
+
+When a pipeline is created with the slurm profile, :func:`profile_inputs`
+records the size of the input files of each sample and an estimate of their
+number of reads (FastQ files only), obtained by decompressing the first MB of
+each file. The profile is saved in ``.sequana/input_profile.json`` and used to
+scale the memory and runtime requested for the jobs of the largest samples
+(see :func:`sequana_pipetools.snaketools.profile.create_profile`).
+"""
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sequana_pipetools.integrity import _GZIP_MAGIC, _is_fastq
+
+# compressed bytes read at the beginning of each file to estimate its number of reads
+_SAMPLE_BYTES = 1 << 20
+
+# files are sampled in threads (zlib releases the GIL)
+_THREADS = 8
+
+PROFILE_NAME = "input_profile.json"
+
+
+def estimate_reads(path: str) -> int | None:
+    """Estimate the number of reads of a FastQ file from its first :data:`_SAMPLE_BYTES`
+
+    The number of records found in the sample is scaled by the ratio between
+    the size of the file and the size of the sample. The count is exact for
+    files smaller than the sample. Returns None for other files or if the
+    file cannot be read.
+    """
+    if not _is_fastq(path):
+        return None
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as fin:
+            sample = fin.read(_SAMPLE_BYTES)
+    except OSError:
+        return None
+
+    data = sample
+    if sample[:2] == _GZIP_MAGIC:
+        data, chunk = [], sample
+        try:
+            while chunk:
+                decomp = zlib.decompressobj(31)
+                data.append(decomp.decompress(chunk))
+                chunk = decomp.unused_data
+        except zlib.error:
+            return None
+        data = b"".join(data)
+
+    lines = data.count(b"\n")
+    if len(sample) >= size:
+        return (lines + (data[-1:] not in (b"", b"\n"))) // 4
+    return round(lines / 4 * size / len(sample))
+
+
+def _samples(filenames: list, read_tag: str = None, **kwargs) -> dict:
+    """Return the files of each sample, named as the PipelineManager does"""
+    from sequana_pipetools.snaketools import FastQFactory, FileFactory
+
+    if read_tag:
+        ff = FastQFactory(filenames, read_tag=read_tag, **kwargs)
+        return {tag: [x for x in (ff.get_file1(tag), ff.get_file2(tag)) if x] for tag in ff.tags}
+    ff = FileFactory(filenames, **kwargs)
+    return {tag: [filename] for tag, filename in zip(ff.filenames, ff.realpaths)}
+
+
+def profile_inputs(filenames: list, read_tag: str = None, **kwargs) -> dict:
+    """Return the size profile of the input files
+
+    :param filenames: the input files
+    :param read_tag: read tag of the FastQ files (e.g. ``_R[12]_``), used to
+        group the files by sample
+    :param kwargs: sample naming options of the :class:`FileFactory`
+        (e.g. *sample_pattern*, *extra_prefixes_to_strip*)
+    :return: a dict with the ``files``, ``size`` (bytes) and ``reads``
+        (estimated, None if unknown) of each sample (``samples``) and the
+        totals ``size`` and ``reads``.
+    """
+    samples = _samples(filenames, read_tag, **kwargs)
+    files = [x for names in samples.values() for x in names]
+    with ThreadPoolExecutor(min(_THREADS, max(1, len(files)))) as executor:
+        reads = dict(zip(files, executor.map(estimate_reads, files)))
+
+    profile = {"samples": {}, "size": 0, "reads": 0}
+    for sample, names in samples.items():
+        counts = [reads[x] for x in names]
+        entry = {
+            "files": names,
+            "size": sum(os.path.getsize(x) for x in names),
+            "reads": None if None in counts else sum(counts),
+        }
+        profile["samples"][sample] = entry
+        profile["size"] += entry["size"]
+        if profile["reads"] is not None:
+            profile["reads"] = None if entry["reads"] is None else profile["reads"] + entry["reads"]
+    return profile
+
+
+def save_profile(profile: dict, workdir) -> Path:
+    """Save the *profile* in the .sequana directory of *workdir*"""
+    path = Path(workdir) / ".sequana" / PROFILE_NAME
+    path.write_text(json.dumps(profile, indent=2))
+    return path
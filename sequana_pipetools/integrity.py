@@ -0,0 +1,206 @@
+"""Integrity pre-flight of the input files of a pipeline.
+
+Truncated or corrupted gzip files are usually found hours after a pipeline was
+started, when a tool crashes on a cluster node. :func:`check_integrity` reads
+all the input files to the end in a process pool (gzip files are
+stream-decompressed, which validates their CRC and size trailers), counts the
+reads of the FastQ files and reports the pairs of FastQ files with different
+numbers of reads. Results are cached by (path, size, mtime) in sequana's user
+config directory, so that checking the same files again is free.
+"""
+from __future__ import annotations
+
+import json
+import os
+import stat
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import colorlog
+
+logger = colorlog.getLogger(__name__)
+
+# size of the blocks read from the files
+_CHUNK = 1 << 20
+
+_CACHE_NAME = "input_integrity.json"
+
+# maximum number of files kept in the cache (the oldest are removed first)
+_CACHE_SIZE = 100_000
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+# ── single file ───────────────────────────────────────────────────────────────
+
+
+def _is_fastq(path: str) -> bool:
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return name.endswith((".fastq", ".fq"))
+
+
+def _read_gzip(fin) -> int:
+    """Return the number of lines of a gzip file, raising ValueError if it is truncated or corrupted.
+
+    Concatenated gzip members (e.g. bgzip files) are supported.
+    """
+    lines, last, pending = 0, b"\n", False
+    decomp = zlib.decompressobj(31)
+    while True:
+        chunk = fin.read(_CHUNK)
+        if not chunk:
+            break
+        while chunk:
+            pending = True
+            try:
+                data = decomp.decompress(chunk)
+            except zlib.error as err:
+                raise ValueError(f"corrupted gzip file ({err})") from None
+            if data:
+                lines += data.count(b"\n")
+                last = data[-1:]
+            if decomp.eof:
+                # next member, if any
+                chunk, pending = decomp.unused_data, False
+                decomp = zlib.decompressobj(31)
+            else:
+                chunk = b""
+    if pending:
+        raise ValueError("truncated gzip file (unexpected end of file)")
+    return lines + (last != b"\n")
+
+
+def check_file(path: str) -> tuple:
+    """Read *path* to the end; return its number of reads (FastQ files only) and an error message (or None)"""
+    try:
+        with open(path, "rb") as fin:
+            if fin.read(2) == _GZIP_MAGIC:
+                fin.seek(0)
+                lines = _read_gzip(fin)
+            else:
+                fin.seek(0)
+                lines, last = 0, b"\n"
+                for chunk in iter(lambda: fin.read(_CHUNK), b""):
+                    lines += chunk.count(b"\n")
+                    last = chunk[-1:]
+                lines += last != b"\n"
+    except (OSError, ValueError) as err:
+        return None, str(err)
+
+    if not _is_fastq(path):
+        return None, None
+    if lines % 4:
+        return None, f"{lines} lines, not a multiple of 4 (truncated FastQ file?)"
+    return lines // 4, None
+
+
+# ── cache ─────────────────────────────────────────────────────────────────────
+
+
+def _cache_path() -> Path:
+    """Return the location of the cache (sequana's user config directory)."""
+    from easydev import CustomConfig
+
+    return Path(CustomConfig("sequana", verbose=False).user_config_dir) / _CACHE_NAME
+
+
+def _load_cache(path: Path) -> dict:
+    try:
+        with open(path) as fin:
+            cache = json.load(fin)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: Path, cache: dict):
+    # drop the oldest entries; write atomically since several setups may run at once
+    for key in list(cache)[: max(0, len(cache) - _CACHE_SIZE)]:
+        del cache[key]
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(cache))
+        os.replace(tmp, path)
+    except OSError as err:  # pragma: no cover
+        logger.debug(f"Could not save the integrity cache {path}: {err}")
+        tmp.unlink(missing_ok=True)
+
+
+# ── input files ───────────────────────────────────────────────────────────────
+
+
+def _pairs(filenames: list, read_tag: str) -> list:
+    """Return the (R1, R2) real paths of the paired FastQ files"""
+    from sequana_pipetools.snaketools import FastQFactory
+
+    fastq = [x for x in filenames if _is_fastq(x)]
+    if not read_tag or not fastq:
+        return []
+    try:
+        ff = FastQFactory(fastq, read_tag=read_tag)
+    except (ValueError, FileNotFoundError):
+        return []
+    pairs = [(ff.get_file1(tag), ff.get_file2(tag)) for tag in ff.tags]
+    return [(file1, file2) for file1, file2 in pairs if file2]
+
+
+def check_integrity(filenames: list, read_tag: str = None, jobs: int = None, cache: bool | str = True) -> dict:
+    """Check that all *filenames* can be read to the end
+
+    :param filenames: the input files
+    :param read_tag: read tag of the paired FastQ files (e.g. ``_R[12]_``);
+        with it, pairs with different numbers of reads are reported
+    :param jobs: number of processes (default: number of CPUs)
+    :param cache: use the cache (True), not (False) or the cache file given
+    :return: a dict with the number of ``reads`` of each FastQ file, the
+        ``errors`` (file: message) and the ``mismatches``, a list of
+        ``(file1, reads1, file2, reads2)`` for pairs of FastQ files with
+        different numbers of reads. Files are given by their real path.
+    """
+    cache_path = (_cache_path() if cache is True else Path(cache)) if cache else None
+    known = _load_cache(cache_path) if cache_path else {}
+
+    reads, errors, todo = {}, {}, {}
+    for filename in dict.fromkeys(os.path.realpath(x) for x in filenames):
+        try:
+            info = os.stat(filename)
+        except OSError as err:
+            errors[filename] = str(err)
+            continue
+        if stat.S_ISDIR(info.st_mode):
+            continue
+        entry = known.get(filename)
+        if entry and entry[:2] == [info.st_size, info.st_mtime_ns]:
+            reads[filename] = entry[2]
+        else:
+            todo[filename] = [info.st_size, info.st_mtime_ns]
+
+    if todo:
+        logger.info(f"Checking the integrity of {len(todo)} input files ({len(reads)} already checked)")
+        workers = min(jobs or os.cpu_count() or 1, len(todo))
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as executor:
+                results = list(executor.map(check_file, todo))
+        else:
+            results = [check_file(x) for x in todo]
+
+        for (filename, key), (count, error) in zip(todo.items(), results):
+            if error:
+                errors[filename] = error
+            else:
+                reads[filename] = count
+                known.pop(filename, None)
+                known[filename] = key + [count]
+        if cache_path:
+            _save_cache(cache_path, known)
+
+    mismatches = []
+    for file1, file2 in _pairs(filenames, read_tag):
+        if reads.get(file1) is not None and reads.get(file2) is not None and reads[file1] != reads[file2]:
+            mismatches.append((file1, reads[file1], file2, reads[file2]))
+
+    return {"reads": reads, "errors": errors, "mismatches": mismatches}
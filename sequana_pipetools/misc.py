@@ -18,8 +18,6 @@ import tarfile
 from types import SimpleNamespace
 
 import colorlog
-import requests
-from tqdm import tqdm
 
 from sequana_pipetools import get_package_version
 
@@ -46,6 +44,9 @@ def download_and_extract_tar_gz(url, extract_to):
     :param url: URL of the .tar.gz file
     :param extract_to: Directory where the contents will be extracted
     """
+    import requests
+    from tqdm import tqdm
+
     # Get the file name from the URL
     filename = url.split("/")[-1]
     file_path = os.path.join(extract_to, filename)
@@ -137,6 +138,8 @@ def levenshtein_distance(token1: str, token2: str) -> int:
 
 
 def get_url_file_size(url):
+    import requests
+
     try:
         response = requests.head(url, allow_redirects=True)
         if response.status_code == 200 and "Content-Length" in response.headers:
@@ -11,13 +11,20 @@ The monitor runs snakemake as a child process so the user only needs to call
 ``sh runme.sh`` (or the generated ``sequana_pipetools_monitor`` command).
 """
 
+import errno
+import hashlib
+import json
 import os
 import re
 import signal
+import statistics
+import struct
 import subprocess
 import sys
+import threading
 import time
 from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
 
@@ -41,10 +48,56 @@ except ImportError:
 
 # ── job states ───────────────────────────────────────────────────────────────
 
-WAITING = "waiting"
-RUNNING = "running"
-DONE = "done"
-FAILED = "failed"
+WAITING = 0
+RUNNING = 1
+DONE = 2
+FAILED = 3
+_STATE_NAMES = ("waiting", "running", "done", "failed")
+_STATE_CODES = {name: code for code, name in enumerate(_STATE_NAMES)}
+
+
+class _Job:
+    """State of a tracked job.
+
+    ``state`` is one of the integer codes above, ``start`` and ``end`` are
+    epoch times (``end`` is None until the job finishes).  Read-only item
+    access (``job["state"]``, ``job["start"]``…) is kept for compatibility
+    with the former dict records, start and end being returned as datetimes.
+    """
+
+    __slots__ = ("state", "start", "end")
+
+    def __init__(self, state: int, start: float, end: float | None = None):
+        self.state = state
+        self.start = start
+        self.end = end
+
+    def __getitem__(self, key: str):
+        if key == "state":
+            return self.state
+        if key not in ("start", "end"):
+            raise KeyError(key)
+        value = getattr(self, key)
+        return None if value is None else datetime.fromtimestamp(value)
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def copy(self) -> "_Job":
+        return _Job(self.state, self.start, self.end)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, _Job):
+            return NotImplemented
+        return (self.state, self.start, self.end) == (other.state, other.start, other.end)
+
+    def __repr__(self) -> str:
+        return f"_Job({_STATE_NAMES[self.state]}, {self.start}, {self.end})"
+
 
 # seconds without mtime change before a log file is considered done
 _DONE_THRESHOLD = 3.0
@@ -62,6 +115,14 @@ def _elapsed_str(seconds: float) -> str:
     return f"{m}m {s:02d}s"
 
 
+def _eta_str(done: int, expected: int, elapsed: float) -> str:
+    """Estimate the remaining time from the rate of jobs done so far."""
+    if 0 < done < expected and elapsed > 0:
+        rate = done / elapsed
+        return f"~{_elapsed_str((expected - done) / rate)}"
+    return "—"
+
+
 def _ram_gb(pid: int) -> float:
     if not _HAS_PSUTIL:
         return 0.0
@@ -78,7 +139,106 @@ def _ram_gb(pid: int) -> float:
         return 0.0
 
 
-def _parse_dryrun(snakefile: str, profile: str, workdir: Path):
+class _DryRunParser:
+    """Line-by-line parser of the output of ``snakemake --dryrun``.
+
+    Two things are extracted in a single pass:
+
+    - ``log_to_job`` from the verbose job blocks::
+
+        rule fastqc:
+            log: samples/Hm2_GTGAAA_L005_R1_001/fastqc.log
+            wildcards: sample=Hm2_GTGAAA_L005_R1_001
+
+    - ``expected`` job counts per rule from the job stats section.
+
+    - ``deps``, the rules each rule depends on (``{rule: [upstream rules]}``),
+      from the ``input:`` and ``output:`` files of the job blocks.
+
+    While lines are fed, ``partial`` holds the expected counts known so far
+    (the job stats if already seen, the number of job blocks per rule
+    otherwise).  It is replaced by a new dict, never modified, so that it can
+    be read from another thread.
+    """
+
+    _PUBLISH_EVERY = 500  # job blocks between two updates of ``partial``
+
+    def __init__(self):
+        self.log_to_job: dict = {}
+        self.expected: OrderedDict = OrderedDict()
+        self.seen: OrderedDict = OrderedDict()  # rule → job blocks seen so far
+        self.partial: OrderedDict = OrderedDict()
+        self.complete = False  # set by _parse_dryrun if snakemake exited normally
+        self.deps: dict = {}  # set by close()
+        self._rule: str | None = None
+        self._logs: list = []
+        self._sample: str | None = None
+        self._in_stats = False
+        self._blocks = 0
+        self._producers: dict = {}  # output file → rule
+        self._inputs: dict = {}  # rule → input files
+
+    def _flush(self):
+        if self._rule and self._logs:
+            for lp in self._logs:
+                self.log_to_job[lp] = (self._rule, self._sample or Path(lp).stem)
+        self._rule = None
+        self._logs = []
+        self._sample = None
+
+    @staticmethod
+    def _files(value: str) -> list:
+        return [f for f in (f.strip() for f in value.split(",")) if f]
+
+    def feed(self, line: str) -> None:
+        s = line.strip()
+        if (s.startswith("rule ") or s.startswith("checkpoint ")) and s.endswith(":"):
+            self._flush()
+            self._rule = s.split()[1].rstrip(":")
+            self.seen[self._rule] = self.seen.get(self._rule, 0) + 1
+            self._blocks += 1
+            if not self.expected and self._blocks % self._PUBLISH_EVERY == 0:
+                self.partial = OrderedDict(self.seen)
+        elif self._rule:
+            if s.startswith("log:"):
+                self._logs.extend(self._files(s[4:]))
+            elif s.startswith("input:"):
+                self._inputs.setdefault(self._rule, set()).update(self._files(s[6:]))
+            elif s.startswith("output:"):
+                for output in self._files(s[7:]):
+                    self._producers[output] = self._rule
+            elif s.startswith("wildcards:"):
+                for part in s[10:].split(","):
+                    part = part.strip()
+                    if part.startswith("sample="):
+                        self._sample = part[7:].strip()
+                        break
+
+        low = line.lower()
+        if "job stats" in low or "job counts" in low:
+            self._in_stats = True
+        elif self._in_stats:
+            parts = line.split()
+            if parts and parts[-1].isdigit() and parts[0] not in ("job", "total") and not parts[0].startswith("-"):
+                self.expected[parts[0]] = int(parts[-1])
+            elif not s:
+                self._in_stats = False
+                if self.expected:
+                    self.partial = OrderedDict(self.expected)
+
+    def close(self) -> None:
+        """Flush the last job block and resolve ``deps`` (call once the output is exhausted)."""
+        self._flush()
+        self.partial = OrderedDict(self.expected or self.seen)
+        producers = self._producers
+        for rule, inputs in self._inputs.items():
+            upstream = {producers[f] for f in inputs if f in producers} - {rule}
+            if upstream:
+                self.deps[rule] = sorted(upstream)
+        self._producers, self._inputs = {}, {}
+
+
+def _parse_dryrun(snakefile: str, profile: str, workdir: Path, parser: _DryRunParser | None = None):
     """Run snakemake --dryrun and return ``(expected, log_to_job)``.
 
     ``expected``  – OrderedDict[rule_name, int]: job counts per rule (all rules,
@@ -89,6 +249,13 @@ def _parse_dryrun(snakefile: str, profile: str, workdir: Path):
                     ``log:`` / ``wildcards:`` output so classification is exact
                     rather than heuristic.
 
+    The output is streamed through a :class:`_DryRunParser` (``parser`` if
+    given, to follow the progress from another thread) rather than held in
+    memory.  After 120 s the dry run is killed and whatever was parsed is
+    returned; ``parser.complete`` tells whether snakemake exited normally.
+
+    The rule dependencies are left in ``parser.deps``.
+
     Falls back to ``({}, {})`` on any error so the monitor still works.
     """
     # Run dryrun without the profile to avoid version-incompatible profile keys
@@ -98,68 +265,138 @@ def _parse_dryrun(snakefile: str, profile: str, workdir: Path):
     configfile = workdir / "config.yaml"
     if configfile.exists():
         cmd += ["--configfile", str(configfile)]
+    parser = parser if parser is not None else _DryRunParser()
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=workdir, timeout=120)
-        output = result.stdout + result.stderr
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace", cwd=workdir
+        )
     except Exception:
         return OrderedDict(), {}
 
-    log_to_job: dict = {}
-
-    # ── pass 1: parse verbose job blocks to build log_path → (rule, sample) ──
-    # Each block looks like:
-    #   rule fastqc:
-    #       log: samples/Hm2_GTGAAA_L005_R1_001/fastqc.log
-    #       wildcards: sample=Hm2_GTGAAA_L005_R1_001
-    current_rule: str | None = None
-    current_logs: list = []
-    current_sample: str | None = None
-
-    def _flush():
-        nonlocal current_rule, current_logs, current_sample
-        if current_rule and current_logs:
-            for lp in current_logs:
-                sample = current_sample or Path(lp).stem
-                log_to_job[lp] = (current_rule, sample)
-        current_rule = None
-        current_logs = []
-        current_sample = None
-
-    for line in output.splitlines():
-        s = line.strip()
-        if (s.startswith("rule ") or s.startswith("checkpoint ")) and s.endswith(":"):
-            _flush()
-            current_rule = s.split()[1].rstrip(":")
-        elif current_rule:
-            if s.startswith("log:"):
-                for lf in s[4:].split(","):
-                    lf = lf.strip()
-                    if lf:
-                        current_logs.append(lf)
-            elif s.startswith("wildcards:"):
-                for part in s[10:].split(","):
-                    part = part.strip()
-                    if part.startswith("sample="):
-                        current_sample = part[7:].strip()
-                        break
-    _flush()
+    timer = threading.Timer(120, proc.kill)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            parser.feed(line)
+        parser.complete = proc.wait() == 0
+    except Exception:
+        proc.kill()
+        return OrderedDict(), {}
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+    parser.close()
+    return parser.expected, parser.log_to_job
 
-    # ── pass 2: job stats section for per-rule counts ─────────────────────────
-    expected: OrderedDict = OrderedDict()
-    in_stats = False
-    for line in output.splitlines():
-        low = line.lower()
-        if "job stats" in low or "job counts" in low:
-            in_stats = True
+
+# ── dry-run cache ────────────────────────────────────────────────────────────
+
+_DRYRUN_CACHE = "dryrun_cache.json"
+
+
+def _dryrun_key(snakefile: str, workdir: Path) -> str:
+    """Return a hash of what the dry run depends on.
+
+    That is the snakefile, ``config.yaml``, the files of the ``rules/``
+    directory and the list of input files (``input_directory`` and
+    ``input_pattern`` of the config).
+    """
+    md5 = hashlib.md5()
+
+    def _add_file(path: Path):
+        md5.update(str(path).encode())
+        try:
+            md5.update(path.read_bytes())
+        except OSError:
+            md5.update(b"\0missing")
+
+    _add_file(workdir / snakefile)
+    _add_file(workdir / "config.yaml")
+    rules = workdir / "rules"
+    if rules.is_dir():
+        for path in sorted(p for p in rules.rglob("*") if p.is_file()):
+            _add_file(path)
+
+    for path in _input_files(workdir):
+        md5.update(str(path).encode() + b"\n")
+    return md5.hexdigest()
+
+
+def _input_files(workdir: Path) -> list:
+    """Return the input files of the pipeline (``input_directory`` and ``input_pattern`` of ``config.yaml``)."""
+    try:
+        import yaml
+
+        config = yaml.safe_load((workdir / "config.yaml").read_text())
+    except Exception:
+        return []
+    if not isinstance(config, dict) or not config.get("input_directory"):
+        return []
+    input_dir = workdir / config["input_directory"]
+    return sorted(input_dir.glob(config.get("input_pattern") or "*"))
+
+
+def _input_gb(workdir: Path) -> float | None:
+    """Return the mean size of the input files in GB, or None if unknown."""
+    sizes = []
+    for path in _input_files(workdir):
+        try:
+            sizes.append(path.stat().st_size)
+        except OSError:
             continue
-        if in_stats:
-            parts = line.split()
-            if parts and parts[-1].isdigit() and parts[0] not in ("job", "total") and not parts[0].startswith("-"):
-                expected[parts[0]] = int(parts[-1])
-            elif not line.strip():
-                in_stats = False
+    return sum(sizes) / len(sizes) / 1024**3 if sizes and sum(sizes) else None
+
 
-    return expected, log_to_job
+def _load_dryrun_cache(workdir: Path, key: str | None = None):
+    """Return the cached ``(expected, log_to_job, deps)`` if it was saved with *key*, else None.
+
+    With ``key`` None, the cached result is returned whatever its key.
+    """
+    try:
+        data = json.loads((workdir / ".sequana" / _DRYRUN_CACHE).read_text())
+        if key is not None and data["key"] != key:
+            return None
+        log_to_job = {log: tuple(job) for log, job in data["log_to_job"].items()}
+        return OrderedDict(data["expected"]), log_to_job, data.get("deps", {})
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _run_dryrun(snakefile: str, profile: str, workdir: Path, key: str, parser: _DryRunParser | None = None):
+    """Run :func:`_parse_dryrun` and cache its result under *key*.
+
+    Returns ``(expected, log_to_job, deps)``.  A dry run that failed (non-zero
+    exit, timeout or no expected job counts) is not cached.
+    """
+    parser = parser if parser is not None else _DryRunParser()
+    expected, log_to_job = _parse_dryrun(snakefile, profile, workdir, parser)
+    if expected and parser.complete:
+        cache = workdir / ".sequana" / _DRYRUN_CACHE
+        data = {"key": key, "expected": expected, "log_to_job": log_to_job, "deps": parser.deps}
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, separators=(",", ":")))
+            os.replace(tmp, cache)
+        except OSError as err:  # pragma: no cover
+            logger.warning(f"Could not cache the dry run: {err}")
+    return expected, log_to_job, parser.deps
+
+
+class _BackgroundDryRun(threading.Thread):
+    """Run :func:`_run_dryrun` in a thread; ``result`` is set once it is done.
+
+    Meanwhile, ``parser.partial`` gives the expected job counts known so far.
+    """
+
+    def __init__(self, snakefile: str, profile: str, workdir: Path, key: str):
+        super().__init__(name="dryrun", daemon=True)
+        self.args = (snakefile, profile, workdir, key)
+        self.parser = _DryRunParser()
+        self.result = (OrderedDict(), {}, {})
+
+    def run(self):
+        self.result = _run_dryrun(*self.args, parser=self.parser)
 
 
 # ── log-file scanner ─────────────────────────────────────────────────────────
@@ -178,6 +415,447 @@ def _find_log_files(workdir: Path):
         yield path
 
 
+def _skip_dir(name: str) -> bool:
+    return name.startswith(".") or name in _SKIP_DIRS
+
+
+# ── log-file watchers ────────────────────────────────────────────────────────
+#
+# A full ``_find_log_files`` walk costs one stat per file in the working
+# directory, which is prohibitive on large runs (hundreds of thousands of
+# files on NFS).  A watcher keeps track of the tree between two scans and only
+# reports the .log files that appeared or changed since the previous call, so
+# that ``_scan_logs`` only pays for what actually changed.
+
+# file systems on which inotify does not see writes made by other hosts
+# (e.g. slurm jobs running on compute nodes)
+_NETWORK_FS = frozenset({"nfs", "nfs4", "cifs", "smbfs", "smb3", "lustre", "gpfs", "beegfs", "fuse.sshfs", "ceph"})
+
+
+def _fs_type(path: Path) -> str:
+    """Return the file system type of *path* from /proc/self/mounts (Linux only)."""
+    path = str(path)
+    best, fstype = "", ""
+    try:
+        with open("/proc/self/mounts") as fh:
+            for line in fh:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace("\\040", " ")
+                inside = mount_point == "/" or path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) > len(best):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        pass
+    return fstype
+
+
+class _PollingLogWatcher:
+    """Portable watcher that only re-lists directories whose mtime changed.
+
+    Creating, renaming or deleting an entry updates the mtime of its parent
+    directory, so new log files are found by stat'ing the known directories
+    only.  Appending to a file does not touch its directory though; files whose
+    mtime is recent (i.e. that may still be written to) are therefore kept in a
+    *hot* set and stat'ed on every poll.  Once a file has been quiet for more
+    than ``settle`` seconds, the scanner considers it DONE and it is no longer
+    stat'ed.
+    """
+
+    backend = "polling"
+
+    def __init__(self, workdir: Path, settle: float = _DONE_THRESHOLD):
+        self.workdir = Path(workdir)
+        self.roots = [self.workdir]  # see add_root()
+        self.settle = settle
+        self._dirs: dict = {}  # directory → last seen st_mtime_ns
+        self._files: dict = {}  # directory → names of the .log files seen so far
+        self._hot: dict = {}  # recently modified .log file → st_mtime
+        self._initial: dict = {}  # files found by add_root(), reported by the next poll()
+        self._primed = False
+        # path → [mtime, rule, sample] of log files not yet DONE (owned by _scan_logs)
+        self.active: dict = {}
+        self.n_reported = 0  # total number of changes reported by poll()
+
+    def _list_dir(self, directory: str, changed: dict) -> None:
+        """(Re-)list one directory, recursing into directories not seen before."""
+        try:
+            self._dirs[directory] = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            self._dirs.pop(directory, None)
+            self._files.pop(directory, None)
+            return
+        names = self._files.setdefault(directory, set())
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _skip_dir(entry.name) and entry.path not in self._dirs:
+                        self._list_dir(entry.path, changed)
+                elif entry.name.endswith(".log") and entry.name not in names:
+                    mtime = entry.stat().st_mtime
+                    names.add(entry.name)
+                    self._hot[entry.path] = mtime
+                    changed[entry.path] = mtime
+            except OSError:
+                continue
+
+    def poll(self) -> dict:
+        """Return ``{path: mtime}`` for log files created or modified since the last call."""
+        changed, self._initial = self._initial, {}
+        if not self._primed:
+            self._primed = True
+            for root in self.roots:
+                self._list_dir(str(root), changed)
+        else:
+            for directory, mtime_ns in list(self._dirs.items()):
+                try:
+                    current = os.stat(directory).st_mtime_ns
+                except OSError:
+                    # directory removed: forget it and the files it contained
+                    # (its subdirectories are removed as well, hence forgotten)
+                    del self._dirs[directory]
+                    self._files.pop(directory, None)
+                    continue
+                if current != mtime_ns:
+                    self._prune_deleted(directory)
+                    self._list_dir(directory, changed)
+
+            now = time.time()
+            for path, mtime in list(self._hot.items()):
+                if path in changed:
+                    continue
+                try:
+                    current = os.stat(path).st_mtime
+                except OSError:
+                    self._hot.pop(path, None)
+                    directory, name = os.path.split(path)
+                    self._files.get(directory, set()).discard(name)
+                    continue
+                if current != mtime:
+                    self._hot[path] = current
+                    changed[path] = current
+                elif now - current > self.settle:
+                    del self._hot[path]
+        self.n_reported += len(changed)
+        return {Path(p): m for p, m in sorted(changed.items())}
+
+    def _prune_deleted(self, directory: str) -> None:
+        # files deleted from a directory must be forgotten so that a re-created
+        # file (e.g. a rerun job) is reported again
+        known = self._files.get(directory)
+        if not known:
+            return
+        try:
+            deleted = known - set(os.listdir(directory))
+        except OSError:
+            return
+        for name in deleted:
+            known.discard(name)
+            self._hot.pop(os.path.join(directory, name), None)
+
+    def add_root(self, root: Path) -> None:
+        """Also watch the tree of *root* (see :class:`_LogWatcherGroup`)."""
+        self.roots.append(Path(root))
+        if self._primed:
+            self._list_dir(str(root), self._initial)
+
+    def remove_root(self, root: Path) -> None:
+        """Stop watching the tree of *root*."""
+        self.roots = [r for r in self.roots if r != Path(root)]
+        root = str(root)
+        prefix = root + os.sep
+
+        def inside(path):
+            return path == root or path.startswith(prefix)
+
+        self._dirs = {d: m for d, m in self._dirs.items() if not inside(d)}
+        self._files = {d: names for d, names in self._files.items() if not inside(d)}
+        self._hot = {f: m for f, m in self._hot.items() if not inside(f)}
+        self._initial = {f: m for f, m in self._initial.items() if not inside(f)}
+
+    def close(self) -> None:
+        pass
+
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE_SELF
+_IN_EVENT = struct.Struct("iIII")
+
+
+class _InotifyLogWatcher:
+    """Linux watcher based on inotify(7), accessed through ctypes.
+
+    One watch is registered per directory of the working tree; each poll only
+    drains the kernel event queue and stats the log files named in the events,
+    so the cost is proportional to the number of changed files.  Raises
+    ``OSError`` if inotify is unavailable or the watch limit
+    (``fs.inotify.max_user_watches``) is reached, in which case the caller
+    should fall back to :class:`_PollingLogWatcher`.
+    """
+
+    backend = "inotify"
+
+    def __init__(self, workdir: Path, settle: float = _DONE_THRESHOLD):
+        import ctypes
+        import ctypes.util
+
+        self.workdir = Path(workdir)
+        self.roots = [self.workdir]  # see add_root()
+        self.settle = settle
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._ctypes = ctypes
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._wd_to_dir: dict = {}
+        # path → [mtime, rule, sample] of log files not yet DONE (owned by _scan_logs)
+        self.active: dict = {}
+        self.n_reported = 0  # total number of changes reported by poll()
+        # the initial walk happens here so that hitting the watch limit makes
+        # the constructor fail (and the caller fall back to polling)
+        self._initial: dict = {}
+        try:
+            self._add_tree(str(self.workdir), self._initial)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, directory: str, changed: dict) -> None:
+        """Watch *directory* and its sub-directories; report the log files found."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_WATCH_MASK)
+        if wd < 0:
+            err = self._ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached")
+            return  # directory vanished in the meantime
+        self._wd_to_dir[wd] = directory
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _skip_dir(entry.name):
+                        self._add_tree(entry.path, changed)
+                elif entry.name.endswith(".log"):
+                    changed[entry.path] = entry.stat().st_mtime
+            except OSError:
+                continue
+
+    def _add_tree_safe(self, directory: str, changed: dict) -> None:
+        try:
+            self._add_tree(directory, changed)
+        except OSError as err:
+            logger.warning(f"Cannot watch {directory} ({err}); some jobs may not be tracked")
+
+    def poll(self) -> dict:
+        """Return ``{path: mtime}`` for log files created or modified since the last call."""
+        changed, self._initial = self._initial, {}
+        touched: set = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = _IN_EVENT.unpack_from(buf, offset)
+                offset += _IN_EVENT.size
+                name = os.fsdecode(buf[offset : offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & _IN_Q_OVERFLOW:
+                    # events were lost: fall back to a full re-walk once
+                    for wd_ in list(self._wd_to_dir):
+                        self._libc.inotify_rm_watch(self._fd, wd_)
+                    self._wd_to_dir.clear()
+                    for root in self.roots:
+                        self._add_tree_safe(str(root), changed)
+                    continue
+                if mask & _IN_IGNORED:
+                    self._wd_to_dir.pop(wd, None)
+                    continue
+                directory = self._wd_to_dir.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO) and not _skip_dir(name):
+                        # files may have been created before the watch was added
+                        self._add_tree_safe(path, changed)
+                elif name.endswith(".log"):
+                    touched.add(path)
+
+        for path in touched:
+            if path in changed:
+                continue
+            try:
+                changed[path] = os.stat(path).st_mtime
+            except OSError:
+                continue
+        self.n_reported += len(changed)
+        return {Path(p): m for p, m in sorted(changed.items())}
+
+    def add_root(self, root: Path) -> None:
+        """Also watch the tree of *root* with the same inotify instance.
+
+        Raises ``OSError`` if the watch limit is reached (the watches already
+        added for *root* are then removed).
+        """
+        try:
+            self._add_tree(str(root), self._initial)
+        except OSError:
+            self.remove_root(root)
+            raise
+        self.roots.append(Path(root))
+
+    def remove_root(self, root: Path) -> None:
+        """Stop watching the tree of *root*."""
+        self.roots = [r for r in self.roots if r != Path(root)]
+        root = str(root)
+        prefix = root + os.sep
+        for wd, directory in list(self._wd_to_dir.items()):
+            if directory == root or directory.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._wd_to_dir[wd]
+        self._initial = {f: m for f, m in self._initial.items() if not f.startswith(prefix)}
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:  # pragma: no cover
+            pass
+
+
+def _make_log_watcher(workdir: Path, backend: str = "auto"):
+    """Return the best log watcher for *workdir*.
+
+    ``backend`` is one of ``auto``, ``inotify`` or ``polling``.  In ``auto``
+    mode inotify is used on Linux unless the working directory lives on a
+    network file system, where inotify does not see writes from other hosts.
+    """
+    workdir = Path(workdir)
+    if _watcher_backend(workdir, backend) == "polling":
+        return _PollingLogWatcher(workdir)
+    try:
+        return _InotifyLogWatcher(workdir)
+    except (OSError, AttributeError) as err:
+        logger.debug(f"inotify unavailable ({err}); falling back to polling")
+        return _PollingLogWatcher(workdir)
+
+
+def _watcher_backend(workdir: Path, backend: str = "auto") -> str:
+    if backend == "auto":
+        if not sys.platform.startswith("linux") or _fs_type(workdir) in _NETWORK_FS:
+            return "polling"
+        return "inotify"
+    return backend
+
+
+class _LogWatcherView:
+    """The part of a :class:`_LogWatcherGroup` watching one working directory.
+
+    Has the interface of a log watcher expected by :func:`_scan_logs`.
+    """
+
+    def __init__(self, group: "_LogWatcherGroup", workdir: Path, backend: str):
+        self.group = group
+        self.workdir = workdir
+        self.backend = backend
+        self.active: dict = {}  # see _PollingLogWatcher
+        self.n_reported = 0
+        self.pending: dict = {}  # changes dispatched by the group, not polled yet
+
+    def poll(self) -> dict:
+        changed, self.pending = self.pending, {}
+        self.n_reported += len(changed)
+        return changed
+
+    def close(self) -> None:
+        self.group.remove(self.workdir)
+
+
+class _LogWatcherGroup:
+    """Log watchers shared by several working directories.
+
+    The working directories watched with the same backend (see
+    :func:`_make_log_watcher`) share a single watcher: one inotify instance,
+    or one polling state.  :meth:`add` returns a view of one working
+    directory that :func:`_scan_logs` can use; :meth:`poll` polls each
+    watcher once and dispatches the changes to the views.
+    """
+
+    def __init__(self, backend: str = "auto"):
+        self.backend = backend
+        self._watchers: dict = {}  # backend → watcher
+        self._views: dict = {}  # workdir → _LogWatcherView
+
+    def add(self, workdir: Path) -> _LogWatcherView:
+        workdir = Path(workdir)
+        backend = _watcher_backend(workdir, self.backend)
+        watcher = self._watchers.get(backend)
+        try:
+            if watcher is None:
+                watcher = _InotifyLogWatcher(workdir) if backend == "inotify" else _PollingLogWatcher(workdir)
+                self._watchers[backend] = watcher
+            else:
+                watcher.add_root(workdir)
+        except (OSError, AttributeError) as err:
+            logger.debug(f"inotify unavailable for {workdir} ({err}); falling back to polling")
+            backend = "polling"
+            watcher = self._watchers.get(backend)
+            if watcher is None:
+                watcher = self._watchers[backend] = _PollingLogWatcher(workdir)
+            else:
+                watcher.add_root(workdir)
+        view = self._views[workdir] = _LogWatcherView(self, workdir, backend)
+        return view
+
+    def remove(self, workdir: Path) -> None:
+        view = self._views.pop(Path(workdir), None)
+        if view is not None:
+            self._watchers[view.backend].remove_root(view.workdir)
+
+    def poll(self) -> None:
+        """Poll the watchers and dispatch the changes to the views."""
+        views = self._views
+        for watcher in self._watchers.values():
+            for path, mtime in watcher.poll().items():
+                for parent in path.parents:
+                    view = views.get(parent)
+                    if view is not None:
+                        view.pending[path] = mtime
+                        break
+
+    def close(self) -> None:
+        for watcher in self._watchers.values():
+            watcher.close()
+        self._watchers.clear()
+        self._views.clear()
+
+
 def _classify_log(path: Path, workdir: Path):
     """Return (rule_name, sample_name) from a log file path.
 
@@ -203,7 +881,32 @@ def _classify_log(path: Path, workdir: Path):
     return rule, sample
 
 
-def _scan_logs(workdir: Path, prev: dict, log_to_job: dict | None = None) -> "OrderedDict[str, OrderedDict]":
+def _log_job(prev_job: _Job | None, mtime: float, now: float) -> _Job:
+    """Return the job entry of a log file given its mtime and previous entry.
+
+    The previous entry is updated in place and returned.
+    """
+    if prev_job is None:
+        prev_job = _Job(RUNNING, now)
+    elif prev_job.state == DONE:
+        return prev_job
+
+    # Use now when first transitioning to DONE rather than stat.st_mtime: on
+    # Linux ctime and mtime update together, so mtime - ctime ≈ 0, giving a
+    # near-zero elapsed duration.
+    if now - mtime > _DONE_THRESHOLD:
+        prev_job.state = DONE
+        if prev_job.end is None:  # otherwise preserve existing end time
+            prev_job.end = now  # first DONE detection ≈ real end
+    else:
+        prev_job.state = RUNNING
+        prev_job.end = None
+    return prev_job
+
+
+def _scan_logs(
+    workdir: Path, prev: dict, log_to_job: dict | None = None, watcher=None
+) -> "OrderedDict[str, OrderedDict]":
     """Recursively scan workdir for .log files and return per-rule per-sample state.
 
     ``log_to_job`` maps relative log path strings to ``(rule, sample)`` tuples
@@ -212,7 +915,14 @@ def _scan_logs(workdir: Path, prev: dict, log_to_job: dict | None = None) -> "Or
 
     ``prev`` is the state from the previous scan; preserves start times and
     avoids resetting a DONE job back to RUNNING.
+
+    When a ``watcher`` (see :func:`_make_log_watcher`) is given, the tree is
+    not walked: only the files reported by the watcher and the jobs that are
+    still RUNNING are looked at, and ``prev`` is updated in place.
     """
+    if watcher is not None:
+        return _scan_logs_incremental(workdir, prev, log_to_job, watcher)
+
     state: OrderedDict = OrderedDict()
     now = time.time()
 
@@ -231,32 +941,56 @@ def _scan_logs(workdir: Path, prev: dict, log_to_job: dict | None = None) -> "Or
         if rule not in state:
             state[rule] = OrderedDict()
 
-        prev_job = prev.get(rule, {}).get(sample)
+        state[rule][sample] = _log_job(prev.get(rule, {}).get(sample), stat.st_mtime, now)
+    return state
+
 
-        if prev_job and prev_job["state"] == DONE:
-            state[rule][sample] = prev_job
+def _reclassify_logs(workdir: Path, state: dict, log_to_job: dict, watcher=None) -> dict:
+    """Move the jobs classified by :func:`_classify_log` to their dry-run ``(rule, sample)``.
+
+    Used when the dry run completes after log files were first scanned (see
+    ``background_dryrun`` in :func:`run_monitor`).  ``state`` and the
+    ``watcher``'s active files are updated in place.
+    """
+    active = watcher.active if watcher is not None else {}
+    for rel, (rule, sample) in log_to_job.items():
+        if os.path.isabs(rel):
+            continue
+        path = workdir / rel
+        guess_rule, guess_sample = _classify_log(path, workdir)
+        if (guess_rule, guess_sample) == (rule, sample):
             continue
+        job = state.get(guess_rule, {}).pop(guess_sample, None)
+        if job is not None:
+            state.setdefault(rule, OrderedDict()).setdefault(sample, job)
+            if not state[guess_rule]:
+                del state[guess_rule]
+        if path in active:
+            active[path][1:] = [rule, sample]
+    return state
 
-        age = now - stat.st_mtime
-        job_state = DONE if age > _DONE_THRESHOLD else RUNNING
-        start = prev_job["start"] if prev_job else datetime.now()
-        # Use datetime.now() when first transitioning to DONE rather than
-        # stat.st_mtime: on Linux ctime and mtime update together, so
-        # mtime - ctime ≈ 0, giving a near-zero elapsed duration.
-        if job_state == DONE:
-            if prev_job and prev_job.get("end"):
-                end = prev_job["end"]  # preserve existing end time
-            else:
-                end = datetime.now()  # first DONE detection ≈ real end
+
+def _scan_logs_incremental(workdir: Path, prev: dict, log_to_job: dict | None, watcher) -> dict:
+    active = watcher.active
+    for log_file, mtime in watcher.poll().items():
+        if log_file in active:
+            active[log_file][0] = mtime
+            continue
+        rel_str = str(log_file.relative_to(workdir))
+        if log_to_job and rel_str in log_to_job:
+            rule, sample = log_to_job[rel_str]
         else:
-            end = None
+            rule, sample = _classify_log(log_file, workdir)
+        active[log_file] = [mtime, rule, sample]
 
-        state[rule][sample] = {
-            "state": job_state,
-            "start": start,
-            "end": end,
-        }
-    return state
+    now = time.time()
+    for log_file, (mtime, rule, sample) in list(active.items()):
+        rule_jobs = prev.setdefault(rule, OrderedDict())
+        job = _log_job(rule_jobs.get(sample), mtime, now)
+        rule_jobs[sample] = job
+        if job.state == DONE:
+            del active[log_file]
+    return prev
 
 
 _TS_RE = re.compile(r"^\[(\w+ \w+ +\d+ \d+:\d+:\d+ \d+)\]")
@@ -268,156 +1002,343 @@ _WILDCARDS_RE = re.compile(r"wildcards:\s*sample=(\S+)")
 _ERROR_RULE_RE = re.compile(r"Error in (?:rule|checkpoint) (\w+):")
 
 
-def _scan_snakemake_log(snakelog: Path, prev: dict) -> dict:
-    """Parse snakemake's own log to track per-rule job progress.
+class _SnakemakeLogParser:
+    """Incremental (tail-follow) parser of snakemake's own log.
 
-    This is the primary tracker for pipelines whose rules have no ``log:``
-    directive (e.g. slicer).  For rules that *do* produce log files,
-    ``_scan_logs`` provides richer sample-name information and takes
-    precedence.
+    The parser remembers the byte offset reached in the log together with the
+    parsing state (``pending`` starts, ``jobid_to_rule``, ``done_count``, last
+    timestamp…) so that each :meth:`update` only processes the bytes appended
+    since the previous call.  If the file shrinks (truncation) or is replaced
+    by another file (rotation, detected through its inode), the parsing state
+    is reset and the log is read again from the start; jobs already seen as
+    DONE or FAILED are kept, as a full re-parse would do.
 
-    Returns the same ``{rule: {job_key: {state, start, end}}}`` structure
-    as ``_scan_logs``.  Job keys are ``sample=<value>`` when a wildcard
-    sample can be inferred, otherwise ``job_<n>``.
-    """
-    if not snakelog.exists():
-        return {}
+    ``prev`` may be a state as returned by :func:`_scan_snakemake_log`: its
+    DONE and FAILED entries are preserved.
 
-    # Preserve already-DONE entries from previous call
-    state: dict = {}
-    for rule, jobs in prev.items():
-        for key, job in jobs.items():
-            if job["state"] in (DONE, FAILED):
-                state.setdefault(rule, OrderedDict())[key] = job
+    The state returned is updated in place: only the rules whose jobs changed
+    in the new bytes are touched, the finished jobs being added once.
+    """
 
-    try:
-        text = snakelog.read_text(errors="replace")
-    except OSError:
-        return state
+    def __init__(self, snakelog: Path, prev: dict | None = None):
+        self.snakelog = Path(snakelog)
+        # DONE / FAILED entries: {rule: {job_key: {state, start, end}}}
+        self.finished: dict = {}
+        for rule, jobs in (prev or {}).items():
+            for key, job in jobs.items():
+                if job.state in (DONE, FAILED):
+                    self.finished.setdefault(rule, OrderedDict())[key] = job
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self._inode = None
+        self._partial = b""
+        self.current_ts: float | None = None  # epoch time of the last timestamp line
+        # pending starts per rule: list of [start_ts, sample_name|None, jobid|None]
+        self.pending: dict = {}
+        self.done_count: dict = {}  # rule → int
+        self.jobid_to_rule: dict = {}  # jobid str → rule name  (snakemake >=8)
+        self.last_rule: str | None = None  # rule seen most recently (for jobid association)
+        self._state: dict = {}  # returned by update()
+        self._running: dict = {}  # rule → keys of the RUNNING jobs in _state
+        self._new: dict = {}  # rule → keys of the jobs finished since the last update
+        self._dirty: set | None = None  # rules to update in _state (None: all of them)
+
+    def update(self, final: bool = False) -> dict:
+        """Process newly appended bytes and return ``{rule: {job_key: {state, start, end}}}``.
+
+        A trailing line without newline is kept for the next call, unless
+        ``final`` is True (the log will not grow anymore).
+        """
+        try:
+            st = self.snakelog.stat()
+        except OSError:
+            self._reset()
+            return {}
 
-    current_ts: datetime | None = None
-    # pending starts per rule: list of (start_ts, sample_name|None, jobid|None)
-    pending: dict = {}
-    done_count: dict = {}  # rule → int
-    jobid_to_rule: dict = {}  # jobid str → rule name  (snakemake >=8)
-    last_rule: str | None = None  # rule seen most recently (for jobid association)
+        if st.st_size < self.offset or (self._inode is not None and st.st_ino != self._inode):
+            self._reset()
+        self._inode = st.st_ino
 
-    for line in text.splitlines():
+        if st.st_size > self.offset:
+            try:
+                with open(self.snakelog, "rb") as fh:
+                    fh.seek(self.offset)
+                    data = fh.read(st.st_size - self.offset)
+            except OSError:
+                return self._build_state()
+            self.offset += len(data)
+            lines = (self._partial + data).split(b"\n")
+            self._partial = lines.pop()
+            for line in lines:
+                self._parse_line(line.decode(errors="replace").rstrip("\r"))
+
+        if final and self._partial:
+            self._parse_line(self._partial.decode(errors="replace").rstrip("\r"))
+            self._partial = b""
+
+        return self._build_state()
+
+    def _finish(self, rule: str, entry, state: int) -> None:
+        n = self.done_count.get(rule, 0)
+        start_ts, sample_val = (entry[0], entry[1]) if entry else (self.current_ts, None)
+        end_ts = self.current_ts or time.time()
+        job_key = f"sample={sample_val}" if sample_val else f"job_{n + 1}"
+        self.finished.setdefault(rule, OrderedDict())[job_key] = _Job(state, start_ts or end_ts, end_ts)
+        self.done_count[rule] = n + 1
+        self._new.setdefault(rule, []).append(job_key)
+        self._touch(rule)
+
+    def _touch(self, rule: str) -> None:
+        if self._dirty is not None:
+            self._dirty.add(rule)
+
+    def _parse_line(self, line: str) -> None:
         ts_m = _TS_RE.match(line)
         if ts_m:
             try:
-                current_ts = datetime.strptime(ts_m.group(1), "%a %b %d %H:%M:%S %Y")
+                self.current_ts = datetime.strptime(ts_m.group(1), "%a %b %d %H:%M:%S %Y").timestamp()
             except ValueError:
                 pass
-            continue
+            return
 
         # job starting: "localrule X:" or "rule X:"
         rs_m = _RULE_START_RE.match(line.strip())
         if rs_m:
-            last_rule = rs_m.group(1)
-            pending.setdefault(last_rule, []).append([current_ts or datetime.now(), None, None])
-            continue
+            self.last_rule = rs_m.group(1)
+            self.pending.setdefault(self.last_rule, []).append([self.current_ts or time.time(), None, None])
+            self._touch(self.last_rule)
+            return
 
         # jobid line immediately following rule start (snakemake >=8: "    jobid: 5")
         jid_m = _JOBID_RE.match(line)
-        if jid_m and last_rule:
+        if jid_m and self.last_rule:
             jid = jid_m.group(1)
-            jobid_to_rule[jid] = last_rule
+            self.jobid_to_rule[jid] = self.last_rule
             # attach jobid to the last pending entry for this rule
-            starts = pending.get(last_rule, [])
+            starts = self.pending.get(self.last_rule, [])
             if starts and starts[-1][2] is None:
                 starts[-1][2] = jid
-            last_rule = None  # consumed
-            continue
+            self.last_rule = None  # consumed
+            return
 
         # wildcard on the next line after rule start: grab sample name
         wc_m = _WILDCARDS_RE.search(line)
         if wc_m:
             sample_val = wc_m.group(1).rstrip(",")
-            for starts in reversed(list(pending.values())):
+            for rule, starts in reversed(list(self.pending.items())):
                 if starts and starts[-1][1] is None:
                     starts[-1][1] = sample_val
+                    self._touch(rule)
                     break
-            continue
+            return
 
         # job finished — snakemake >=8: "Finished job 5."
         fin8_m = _FINISHED_JOB_RE.match(line.strip())
         if fin8_m:
             jid = fin8_m.group(1)
-            rule = jobid_to_rule.get(jid)
+            rule = self.jobid_to_rule.pop(jid, None)
             if rule:
-                n = done_count.get(rule, 0)
-                starts = pending.get(rule, [])
+                starts = self.pending.get(rule, [])
                 # find the pending entry with this jobid
                 entry = next((e for e in starts if e[2] == jid), starts[0] if starts else None)
                 if entry and entry in starts:
                     starts.remove(entry)
-                start_ts, sample_val = (entry[0], entry[1]) if entry else (current_ts, None)
-                end_ts = current_ts or datetime.now()
-                job_key = f"sample={sample_val}" if sample_val else f"job_{n + 1}"
-                state.setdefault(rule, OrderedDict())[job_key] = {
-                    "state": DONE,
-                    "start": start_ts or end_ts,
-                    "end": end_ts,
-                }
-                done_count[rule] = n + 1
-            continue
+                self._finish(rule, entry, DONE)
+            return
 
         # job finished — snakemake <8: "Finished jobid: 5 (Rule: flye)"
         fin_m = _FINISHED_RE.search(line)
         if fin_m:
             rule = fin_m.group(1)
-            n = done_count.get(rule, 0)
-            starts = pending.get(rule, [])
-            start_ts, sample_val, _ = starts.pop(0) if starts else (current_ts, None, None)
-            end_ts = current_ts or datetime.now()
-            job_key = f"sample={sample_val}" if sample_val else f"job_{n + 1}"
-            state.setdefault(rule, OrderedDict())[job_key] = {
-                "state": DONE,
-                "start": start_ts or end_ts,
-                "end": end_ts,
-            }
-            done_count[rule] = n + 1
-            continue
+            starts = self.pending.get(rule, [])
+            self._finish(rule, starts.pop(0) if starts else None, DONE)
+            return
 
         # job failed
         err_m = _ERROR_RULE_RE.search(line)
         if err_m:
             rule = err_m.group(1)
-            n = done_count.get(rule, 0)
-            starts = pending.get(rule, [])
-            start_ts, sample_val, _ = starts.pop(0) if starts else (current_ts, None, None)
-            end_ts = current_ts or datetime.now()
-            job_key = f"sample={sample_val}" if sample_val else f"job_{n + 1}"
-            state.setdefault(rule, OrderedDict())[job_key] = {
-                "state": FAILED,
-                "start": start_ts or end_ts,
-                "end": end_ts,
+            starts = self.pending.get(rule, [])
+            self._finish(rule, starts.pop(0) if starts else None, FAILED)
+
+    def checkpoint(self) -> dict:
+        """Return the parsing state (not the finished jobs) as a JSON-serialisable dict."""
+        return {
+            "offset": self.offset,
+            "inode": self._inode,
+            "partial": self._partial.decode("latin-1"),
+            "current_ts": self.current_ts,
+            "pending": {rule: starts for rule, starts in self.pending.items() if starts},
+            "done_count": self.done_count,
+            "jobid_to_rule": self.jobid_to_rule,
+            "last_rule": self.last_rule,
+        }
+
+    def restore(self, checkpoint: dict) -> None:
+        """Restore a parsing state saved with :meth:`checkpoint`.
+
+        The next :meth:`update` resumes reading at the saved offset (or from
+        the start if the log was truncated or replaced meanwhile).
+        """
+        self.offset = checkpoint["offset"]
+        self._inode = checkpoint["inode"]
+        self._partial = checkpoint["partial"].encode("latin-1")
+        self.current_ts = checkpoint["current_ts"]
+        self.pending = {rule: [list(entry) for entry in starts] for rule, starts in checkpoint["pending"].items()}
+        self.done_count = dict(checkpoint["done_count"])
+        self.jobid_to_rule = dict(checkpoint["jobid_to_rule"])
+        self.last_rule = checkpoint["last_rule"]
+        self._dirty = None
+
+    def job_for_jobid(self, jid: str):
+        """Return ``(rule, job_key)`` of a running job given its snakemake jobid, or None."""
+        rule = self.jobid_to_rule.get(jid)
+        if rule is None:
+            return None
+        for _start, sample_val, entry_jid in self.pending.get(rule, []):
+            if entry_jid == jid and sample_val:
+                return rule, f"sample={sample_val}"
+        return rule, f"job_{jid}"
+
+    def _build_state(self) -> dict:
+        state = self._state
+        dirty = self._dirty
+        if dirty is None:
+            # first call, or the parsing state was reset: every rule
+            state.clear()
+            self._running = {}
+            self._new = {rule: list(jobs) for rule, jobs in self.finished.items()}
+            dirty = self.finished.keys() | self.pending.keys()
+        for rule in dirty:
+            jobs = state.setdefault(rule, OrderedDict())
+            for key in self._running.pop(rule, ()):
+                del jobs[key]
+            finished = self.finished.get(rule, {})
+            for key in self._new.pop(rule, ()):
+                jobs[key] = finished[key]
+            # anything still pending → RUNNING, after the finished jobs
+            running = []
+            for i, (start_ts, sample_val, _jid) in enumerate(self.pending.get(rule, ())):
+                job_key = f"sample={sample_val}" if sample_val else f"job_{len(finished) + i + 1}"
+                if job_key not in jobs:
+                    jobs[job_key] = _Job(RUNNING, start_ts or time.time())
+                    running.append(job_key)
+            if running:
+                self._running[rule] = running
+            if not jobs:
+                del state[rule]
+        self._dirty = set()
+        return state
+
+
+def _scan_snakemake_log(snakelog: Path, prev: dict, parser: _SnakemakeLogParser | None = None) -> dict:
+    """Parse snakemake's own log to track per-rule job progress.
+
+    This is the primary tracker for pipelines whose rules have no ``log:``
+    directive (e.g. slicer).  For rules that *do* produce log files,
+    ``_scan_logs`` provides richer sample-name information and takes
+    precedence.
+
+    Returns the same ``{rule: {job_key: {state, start, end}}}`` structure
+    as ``_scan_logs``.  Job keys are ``sample=<value>`` when a wildcard
+    sample can be inferred, otherwise ``job_<n>``.
+
+    Without ``parser`` the whole log is parsed (DONE and FAILED entries of
+    ``prev`` are preserved).  With a :class:`_SnakemakeLogParser`, only the
+    bytes appended since the previous call are processed and ``prev`` is
+    ignored since the parser carries the state itself.
+    """
+    if not snakelog.exists():
+        return {}
+
+    if parser is not None:
+        return parser.update()
+    return _SnakemakeLogParser(snakelog, prev).update(final=True)
+
+
+def _merge_states(current: dict, sm_current: dict, prev_merged: dict, transitions: list | None = None):
+    """Merge the log-file state with the snakemake-log state.
+
+    Log-file entries take precedence, but snakemake-log RUNNING state prevents
+    premature DONE from a stale log-file mtime (e.g. a tool like flye that
+    writes nothing to stdout/stderr during its main work).  Timing is captured
+    at the RUNNING→DONE transition in merged state so that the elapsed time
+    reflects the true wall-clock duration seen by the monitor.
+
+    ``prev_merged`` holds a copy of the merged job records of the previous
+    call; it is updated in place, only the records that changed being
+    touched, so that no full copy of the state is made at each cycle.
+    Returns ``(merged, prev_merged)``.
+
+    The changes found are appended to ``transitions`` (if given), for
+    :meth:`_RuleCounters.update`: ``(rule, job_key, job)`` for the jobs that
+    are new or changed state, ``(rule, job_key, None)`` for the jobs and
+    ``(rule, None, None)`` for the rules no longer in the merged state.
+    """
+    merged = dict(sm_current)  # start with snakemake-log state
+    for rule, jobs in current.items():
+        # If snakemake-log still shows RUNNING jobs for this rule, don't let
+        # a stale log-file mtime mark any job as DONE prematurely.  Jobs
+        # already seen DONE are kept as such.
+        held = None
+        if any(j.state == RUNNING for j in sm_current.get(rule, {}).values()):
+            prev_jobs = prev_merged.get(rule, {})
+            held = {
+                s: _Job(RUNNING, j.start)
+                for s, j in jobs.items()
+                if j.state == DONE and (s not in prev_jobs or prev_jobs[s].state != DONE)
             }
-            done_count[rule] = n + 1
-
-    # anything still pending → RUNNING
-    for rule, starts in pending.items():
-        already = len(state.get(rule, {}))
-        for i, (start_ts, sample_val, _jid) in enumerate(starts):
-            job_key = f"sample={sample_val}" if sample_val else f"job_{already + i + 1}"
-            if job_key not in state.get(rule, {}):
-                state.setdefault(rule, OrderedDict())[job_key] = {
-                    "state": RUNNING,
-                    "start": start_ts or datetime.now(),
-                    "end": None,
-                }
+        merged[rule] = {**jobs, **held} if held else jobs
 
-    return state
+    # Fix timing: when a job transitions RUNNING→DONE in the merged view,
+    # stamp end=now and carry forward the start from the RUNNING entry.
+    # This avoids using filesystem mtime/ctime which are unreliable on Linux
+    # (ctime≈mtime, so end-start≈0 when derived from log-file metadata alone).
+    now = time.time()
+    for rule in prev_merged.keys() - merged.keys():
+        del prev_merged[rule]
+        if transitions is not None:
+            transitions.append((rule, None, None))
+    for rule, jobs in merged.items():
+        prev_jobs = prev_merged.setdefault(rule, {})
+        for sample, job in jobs.items():
+            prev_job = prev_jobs.get(sample)
+            if prev_job is None:
+                prev_jobs[sample] = job.copy()
+                if transitions is not None:
+                    transitions.append((rule, sample, job))
+                continue
+            if job.state == DONE:
+                if prev_job.state == RUNNING:
+                    # First cycle where this job appears DONE: lock in timing now
+                    job.end = now
+                    job.start = prev_job.start
+                elif prev_job.state == DONE and prev_job.end:
+                    # Already had a locked end time: preserve it
+                    job.end = prev_job.end
+                    job.start = prev_job.start
+            if prev_job.state != job.state and transitions is not None:
+                transitions.append((rule, sample, job))
+            if prev_job.state != job.state or prev_job.end != job.end:
+                prev_job.state, prev_job.start, prev_job.end = job.state, job.start, job.end
+        if len(prev_jobs) > len(jobs):
+            # jobs dropped (e.g. snakemake-log entries superseded by log files)
+            for sample in [s for s in prev_jobs if s not in jobs]:
+                del prev_jobs[sample]
+                if transitions is not None:
+                    transitions.append((rule, sample, None))
+    return merged, prev_merged
 
 
 def _mark_remaining_failed(current: dict) -> dict:
     """Mark any still-RUNNING job as FAILED (called when snakemake exits non-zero)."""
     for rule_jobs in current.values():
         for job in rule_jobs.values():
-            if job["state"] == RUNNING:
-                job["state"] = FAILED
-                job["end"] = datetime.now()
+            if job.state == RUNNING:
+                job.state = FAILED
+                job.end = time.time()
     return current
 
 
@@ -428,25 +1349,949 @@ def _mark_remaining_done(current: dict, expected: dict | None = None) -> dict:
     but produced no tracked log files (e.g. ``md5sum``, ``rulegraph``).
     This ensures the final table shows them as Done rather than Waiting.
     """
-    now = datetime.now()
+    now = time.time()
     for rule_jobs in current.values():
         for job in rule_jobs.values():
-            if job["state"] == RUNNING:
-                job["state"] = DONE
-                job["end"] = now
+            if job.state == RUNNING:
+                job.state = DONE
+                job.end = now
     if expected:
         for rule, count in expected.items():
             if rule not in current:
                 # Rule produced no tracked log files at all
-                current[rule] = {f"_job_{i + 1}": {"state": DONE, "start": now, "end": now} for i in range(count)}
+                current[rule] = {f"_job_{i + 1}": _Job(DONE, now, now) for i in range(count)}
             else:
                 # Rule is tracked but has fewer jobs than expected (some produced no log)
                 existing = len(current[rule])
                 for i in range(existing, count):
-                    current[rule][f"_job_{i + 1}"] = {"state": DONE, "start": now, "end": now}
+                    current[rule][f"_job_{i + 1}"] = _Job(DONE, now, now)
     return current
 
 
+# ── per-job resources ────────────────────────────────────────────────────────
+#
+# Snakemake runs each local job in its own process (``bash -c`` for shell
+# rules, a jobscript or a ``--target-jobs`` sub-snakemake otherwise).  The job
+# a process belongs to is inferred from its command line: snakemake jobscript
+# name (``snakejob.<rule>.<jobid>.sh``), ``--target-jobs rule:sample=…`` or a
+# log file known from the dry run (``… > logs/fastqc/A.log``).  Descendants
+# inherit the job of their closest attributed ancestor.  Jobs submitted to a
+# cluster run on other hosts and cannot be sampled here (see SlurmStats).
+
+_JOBSCRIPT_RE = re.compile(r"snakejob\.(\w+)\.(\d+)\.sh")
+_TARGET_JOBS_RE = re.compile(r"--target-jobs\s+['\"]?(\w+):(\S*?)['\"]?(?:\s|$)")
+_LOG_TOKEN_RE = re.compile(r"[^\s'\"<>|;&=]+\.log\b")
+
+
+def _job_from_cmdline(cmdline: str, log_to_job: dict, workdir: str = "", jobid_to_job=None):
+    """Return the ``(rule, job_key)`` a process belongs to, or None.
+
+    ``log_to_job`` comes from the dry run (relative log path → (rule, sample));
+    ``jobid_to_job`` is an optional callable mapping a snakemake jobid to
+    ``(rule, job_key)`` (see :meth:`_SnakemakeLogParser.job_for_jobid`).
+    """
+    m = _JOBSCRIPT_RE.search(cmdline)
+    if m:
+        rule, jid = m.groups()
+        job = jobid_to_job(jid) if jobid_to_job else None
+        return job or (rule, f"job_{jid}")
+
+    m = _TARGET_JOBS_RE.search(cmdline)
+    if m:
+        rule, wildcards = m.groups()
+        for part in wildcards.split(","):
+            if part.startswith("sample="):
+                return rule, part[7:]
+        return rule, wildcards or rule
+
+    if log_to_job:
+        prefix = workdir.rstrip(os.sep) + os.sep if workdir else None
+        for token in _LOG_TOKEN_RE.findall(cmdline):
+            if prefix and token.startswith(prefix):
+                token = token[len(prefix) :]
+            elif token.startswith("./"):
+                token = token[2:]
+            if token in log_to_job:
+                return log_to_job[token]
+    return None
+
+
+class _JobResources:
+    """Per-job peak RSS and CPU time, sampled from snakemake's process tree.
+
+    Each call to :meth:`sample` walks the tree once, attributes every process
+    to a job and records, for each job, its peak RSS (sum over the job's
+    processes), its CPU time (user + system, including reaped children) and
+    the time it was first and last seen.
+    """
+
+    def __init__(self, log_to_job: dict | None = None, workdir: str = "", jobid_to_job=None):
+        self.log_to_job = log_to_job or {}
+        self.workdir = str(workdir)
+        self.jobid_to_job = jobid_to_job
+        # (rule, job_key) → {"rss": peak bytes, "cpu": seconds, "first": t, "last": t}
+        self.jobs: dict = {}
+        self.ended: list = []  # jobs seen by the previous sample but not by the last one
+        self._seen: set = set()
+        self._cmd_cache: dict = {}  # (pid, create_time) → job or None
+
+    def _job_of(self, proc):
+        key = (proc.pid, proc.create_time())
+        if key not in self._cmd_cache:
+            try:
+                cmdline = " ".join(proc.cmdline())
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                cmdline = ""
+            self._cmd_cache[key] = _job_from_cmdline(cmdline, self.log_to_job, self.workdir, self.jobid_to_job)
+        return self._cmd_cache[key]
+
+    def sample(self, pid: int) -> float:
+        """Sample the process tree of *pid*; return its total RSS in GB."""
+        if not _HAS_PSUTIL or not pid:
+            return 0.0
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 0.0
+
+        parents: dict = {}
+        own: dict = {}  # pid → (job or None, rss, cpu)
+        total = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    parents[proc.pid] = proc.ppid()
+                    rss = proc.memory_info().rss
+                    t = proc.cpu_times()
+                    cpu = t.user + t.system + t.children_user + t.children_system
+                    job = self._job_of(proc) if proc.pid != pid else None
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            own[proc.pid] = (job, rss, cpu)
+            total += rss
+
+        def resolve(p):
+            # closest attributed ancestor (below the snakemake process itself)
+            seen = 0
+            while p in own and p != pid and seen < 64:
+                if own[p][0] is not None:
+                    return own[p][0]
+                p = parents.get(p)
+                seen += 1
+            return None
+
+        usage: dict = {}
+        for p, (_job, rss, cpu) in own.items():
+            job = resolve(p)
+            if job is not None:
+                rss_sum, cpu_sum = usage.get(job, (0, 0.0))
+                usage[job] = (rss_sum + rss, cpu_sum + cpu)
+
+        now = time.time()
+        for job, (rss, cpu) in usage.items():
+            rec = self.jobs.get(job)
+            if rec is None:
+                self.jobs[job] = {"rss": rss, "cpu": cpu, "first": now, "last": now}
+            else:
+                rec["rss"] = max(rec["rss"], rss)
+                rec["cpu"] = max(rec["cpu"], cpu)
+                rec["last"] = now
+        self.ended = [job for job in self._seen if job not in usage]
+        self._seen = set(usage)
+
+        # forget exited processes
+        if len(self._cmd_cache) > 4 * len(own) + 100:
+            alive = {(p.pid, p.create_time()) for p in procs if p.pid in own}
+            self._cmd_cache = {k: v for k, v in self._cmd_cache.items() if k in alive}
+        return total / 1024**3
+
+    def rule_peaks(self) -> dict:
+        """Return ``{rule: largest per-job peak RSS in GB}``."""
+        peaks: dict = {}
+        for (rule, _key), rec in self.jobs.items():
+            peaks[rule] = max(peaks.get(rule, 0.0), rec["rss"] / 1024**3)
+        return peaks
+
+    def rule_table(self) -> list:
+        """Return one row per rule summarising its jobs' resources.
+
+        Columns: rule, jobs, max_rss_gb, mean_rss_gb, max_cpu_s, mean_cpu_s,
+        max_cores and mean_cores (CPU time over wall time seen by the
+        monitor, i.e. how many threads the jobs actually used).
+        """
+        by_rule: dict = {}
+        for (rule, _key), rec in self.jobs.items():
+            by_rule.setdefault(rule, []).append(rec)
+
+        rows = []
+        for rule, recs in by_rule.items():
+            rss = [r["rss"] / 1024**3 for r in recs]
+            cpu = [r["cpu"] for r in recs]
+            cores = [r["cpu"] / (r["last"] - r["first"]) for r in recs if r["last"] - r["first"] > 0]
+            rows.append(
+                {
+                    "rule": rule,
+                    "jobs": len(recs),
+                    "max_rss_gb": max(rss),
+                    "mean_rss_gb": sum(rss) / len(rss),
+                    "max_cpu_s": max(cpu),
+                    "mean_cpu_s": sum(cpu) / len(cpu),
+                    "max_cores": max(cores) if cores else 0.0,
+                    "mean_cores": sum(cores) / len(cores) if cores else 0.0,
+                }
+            )
+        return rows
+
+    def to_tsv(self, rule_file: Path, job_file: Path | None = None) -> None:
+        """Write the per-rule table (and optionally the per-job records) as TSV."""
+        rows = self.rule_table()
+        if not rows:
+            return
+        with open(rule_file, "w") as fout:
+            fout.write("\t".join(rows[0]) + "\n")
+            for row in rows:
+                fout.write("\t".join(f"{v:.3f}" if isinstance(v, float) else str(v) for v in row.values()) + "\n")
+        if job_file:
+            with open(job_file, "w") as fout:
+                fout.write("rule\tjob\tpeak_rss_gb\tcpu_s\twall_s\n")
+                for (rule, key), rec in self.jobs.items():
+                    wall = rec["last"] - rec["first"]
+                    fout.write(f"{rule}\t{key}\t{rec['rss'] / 1024**3:.3f}\t{rec['cpu']:.1f}\t{wall:.1f}\n")
+
+
+# ── journal ──────────────────────────────────────────────────────────────────
+#
+# The monitor keeps an append-only journal of the run in
+# ``.sequana/monitor.journal`` so that a restarted monitor (or one attached to
+# a snakemake it did not start) rebuilds its state without re-reading the
+# whole snakemake log.  Each line is a JSON object with a single key, the
+# record type:
+#
+#   {"start": {"pid": …, "time": …, "pipeline": …, "version": …}}
+#   {"job": [rule, job_key, state, start, end, source]}       source: log | sm
+#   {"resources": [rule, job_key, peak_rss_bytes, cpu_s, first, last]}
+#   {"parser": {…}}                   see _SnakemakeLogParser.checkpoint
+#   {"end": {"returncode": …, "time": …}}
+#
+# Times are epoch seconds.  When the journal is read back, the last record of
+# a given job (or of a given type) wins.
+
+_JOURNAL_NAME = "monitor.journal"
+_CHECKPOINT_INTERVAL = 10.0  # seconds between two snakemake-log parser checkpoints
+
+
+def _load_journal(path: Path) -> dict | None:
+    """Read a journal back; return None if there is none.
+
+    Returns a dict with the keys ``start``, ``parser`` and
+    ``end`` (last record of each type, or None), ``jobs`` (``{(rule,
+    job_key): [state, start, end, source]}``) and ``resources``
+    (``{(rule, job_key): {rss, cpu, first, last}}``).  Lines that cannot be
+    decoded (e.g. the last one, if the monitor was killed while writing it)
+    are ignored.
+    """
+    try:
+        fh = open(path)
+    except OSError:
+        return None
+
+    data: dict = {"start": None, "parser": None, "end": None, "jobs": {}, "resources": {}}
+    jobs = data["jobs"]
+    resources = data["resources"]
+    with fh:
+        for line in fh:
+            try:
+                ((kind, payload),) = json.loads(line).items()
+                if kind == "job":
+                    rule, key, state, start, end, source = payload
+                    jobs[(rule, key)] = [state, start, end, source]
+                elif kind == "resources":
+                    rule, key, rss, cpu, first, last = payload
+                    resources[(rule, key)] = {"rss": rss, "cpu": cpu, "first": first, "last": last}
+                elif kind in data:
+                    data[kind] = payload
+            except (ValueError, TypeError, AttributeError):
+                continue
+    return data
+
+
+def _journal_states(data: dict, running: bool = False):
+    """Split the jobs of a loaded journal into ``(log_state, sm_state)``.
+
+    ``log_state`` holds the jobs tracked through their log file (to seed
+    :func:`_scan_logs`), ``sm_state`` those tracked through the snakemake log
+    (to seed :class:`_SnakemakeLogParser`).  Only DONE jobs are kept, unless
+    ``running`` is True (attaching to the same snakemake run), in which case
+    RUNNING and FAILED jobs are kept as well.
+    """
+    keep = ("done", "running", "failed") if running else ("done",)
+    log_state: dict = {}
+    sm_state: dict = {}
+    for (rule, key), (state, start, end, source) in data["jobs"].items():
+        if state not in keep:
+            continue
+        target = log_state if source == "log" else sm_state
+        target.setdefault(rule, OrderedDict())[key] = _Job(_STATE_CODES[state], start, end)
+    return log_state, sm_state
+
+
+class _Journal:
+    """Append-only writer of the monitor journal (see :func:`_load_journal`).
+
+    Only job state transitions are written: the journal remembers the last
+    state written for each job.  With ``data`` (a loaded journal) and
+    ``compact`` True, the file is first rewritten with one record per job,
+    which keeps its size bounded across restarts.
+    """
+
+    def __init__(self, path: Path, data: dict | None = None, compact: bool = False):
+        self.path = Path(path)
+        self.states: dict = {}  # (rule, job_key) → state last written
+        self._resources: set = set()  # jobs whose resources were written
+        self._checkpoint_at = 0.0
+        self._checkpoint_offset = None
+        if data:
+            self.states = {job: rec[0] for job, rec in data["jobs"].items()}
+            self._resources = set(data["resources"])
+
+        if data and compact:
+            tmp = self.path.with_suffix(".tmp")
+            self._fh = open(tmp, "w")
+            if data["start"] is not None:
+                self.write("start", data["start"])
+            for (rule, key), rec in data["jobs"].items():
+                self.write("job", [rule, key, *rec])
+            for (rule, key), rec in data["resources"].items():
+                self.write("resources", [rule, key, rec["rss"], rec["cpu"], rec["first"], rec["last"]])
+            self._fh.close()
+            os.replace(tmp, self.path)
+        elif not data:
+            open(self.path, "w").close()
+        # always appended to (O_APPEND), so that the lines of an attached monitor
+        # are not overwritten; line buffered: a killed monitor loses at most the
+        # line being written
+        self._fh = open(self.path, "a", buffering=1)
+
+    def write(self, kind: str, payload) -> None:
+        self._fh.write(json.dumps({kind: payload}, separators=(",", ":")) + "\n")
+
+    def record_jobs(self, merged: dict, log_state: dict) -> None:
+        """Write the jobs of ``merged`` whose state changed since the last call."""
+        states = self.states
+        for rule, jobs in merged.items():
+            log_jobs = log_state.get(rule, {})
+            for key, job in jobs.items():
+                if states.get((rule, key)) != job.state:
+                    states[(rule, key)] = job.state
+                    source = "log" if key in log_jobs else "sm"
+                    end = None if job.end is None else round(job.end, 3)
+                    self.write("job", [rule, key, _STATE_NAMES[job.state], round(job.start, 3), end, source])
+
+    def record_resources(self, resources: _JobResources, jobs=None) -> None:
+        """Write the resources of ``jobs`` (default: all jobs not written yet)."""
+        for job in resources.jobs if jobs is None else jobs:
+            rec = resources.jobs.get(job)
+            if rec is None or (jobs is None and job in self._resources):
+                continue
+            self._resources.add(job)
+            self.write(
+                "resources", [*job, rec["rss"], round(rec["cpu"], 2), round(rec["first"], 3), round(rec["last"], 3)]
+            )
+
+    def checkpoint(self, parser: _SnakemakeLogParser, now: float, force: bool = False) -> None:
+        """Save the snakemake-log parser state, at most every few seconds."""
+        if parser.offset == self._checkpoint_offset:
+            return
+        if force or now - self._checkpoint_at >= _CHECKPOINT_INTERVAL:
+            self.write("parser", parser.checkpoint())
+            self._checkpoint_at = now
+            self._checkpoint_offset = parser.offset
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+# ── attaching to a running snakemake ─────────────────────────────────────────
+
+_RUN_FAILED_RE = re.compile(
+    r"Exiting because a job execution failed|^Error in (?:rule|checkpoint) |WorkflowError|LockException", re.M
+)
+
+
+def _is_snakemake(cmdline: list) -> bool:
+    """Return True for a main snakemake process (not a dry run nor a job sub-process)."""
+    if not any(os.path.basename(arg) == "snakemake" for arg in cmdline[:3]):
+        return False
+    return not any(arg in ("-n", "--dryrun", "--dry-run", "--target-jobs") for arg in cmdline)
+
+
+def _find_snakemake(workdir: Path, pid: int | None = None) -> int | None:
+    """Return the pid of the snakemake process running in *workdir*, or None.
+
+    ``pid`` (e.g. read from the journal) is returned if it is still a running
+    snakemake.  Otherwise the oldest snakemake process whose working directory
+    is *workdir* is returned.
+    """
+    if not _HAS_PSUTIL:
+        if pid:
+            try:
+                os.kill(pid, 0)
+                return pid
+            except OSError:
+                pass
+        return None
+
+    if pid:
+        try:
+            proc = psutil.Process(pid)
+            if _is_snakemake(proc.cmdline()) and proc.status() != psutil.STATUS_ZOMBIE:
+                return pid
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+
+    return _find_snakemakes([workdir]).get(workdir)
+
+
+def _find_snakemakes(workdirs) -> dict:
+    """Return ``{workdir: pid}`` of the oldest snakemake process running in each of *workdirs*.
+
+    The processes are listed only once, whatever the number of directories.
+    """
+    if not _HAS_PSUTIL:
+        return {}
+    wanted = {str(workdir): workdir for workdir in workdirs}
+    found: dict = {}
+    for proc in psutil.process_iter(["pid", "cmdline", "cwd", "create_time"]):
+        info = proc.info
+        if info["cwd"] in wanted and _is_snakemake(info["cmdline"] or []):
+            candidate = (info["create_time"], info["pid"])
+            found[info["cwd"]] = min(found.get(info["cwd"], candidate), candidate)
+    return {wanted[cwd]: pid for cwd, (_, pid) in found.items()}
+
+
+def _returncode_from_log(snakelog: Path) -> int:
+    """Guess the exit code of a snakemake process we did not start from the end of its log."""
+    try:
+        with open(snakelog, "rb") as fh:
+            fh.seek(max(0, fh.seek(0, os.SEEK_END) - 65536))
+            tail = fh.read().decode(errors="replace")
+    except OSError:
+        return 1
+    return 1 if _RUN_FAILED_RE.search(tail) else 0
+
+
+def _process_start(pid: int) -> float | None:
+    """Return the start time of process *pid*, or None (no psutil, or the process already exited)."""
+    if not _HAS_PSUTIL:
+        return None
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.Error:
+        return None
+
+
+def _latest_snakemake_log(workdir: Path, since: float = 0) -> Path | None:
+    """Return the most recent ``.snakemake/log/*.snakemake.log`` written after *since*, or None."""
+    logs = []
+    for log in (workdir / ".snakemake" / "log").glob("*.snakemake.log"):
+        try:
+            logs.append((log.stat().st_mtime, log))
+        except OSError:
+            continue
+    if not logs:
+        return None
+    mtime, log = max(logs)
+    return log if mtime >= since else None
+
+
+class _AttachedProcess:
+    """Minimal :class:`subprocess.Popen` look-alike for a snakemake we did not start.
+
+    Its exit code cannot be collected, so it is inferred from the snakemake
+    log.  Signals are not forwarded: interrupting an attached monitor leaves
+    the pipeline running.
+    """
+
+    def __init__(self, pid: int, snakelog: Path):
+        self.pid = pid
+        self.snakelog = snakelog
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None and not self._alive():
+            self.returncode = _returncode_from_log(self.snakelog)
+        return self.returncode
+
+    def _alive(self) -> bool:
+        if _HAS_PSUTIL:
+            try:
+                return psutil.Process(self.pid).status() != psutil.STATUS_ZOMBIE
+            except psutil.NoSuchProcess:
+                return False
+        try:
+            os.kill(self.pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+
+    def send_signal(self, sig) -> None:
+        pass
+
+
+# ── machine-readable output ──────────────────────────────────────────────────
+
+_JOB_EVENTS = {RUNNING: "job_started", DONE: "job_finished", FAILED: "job_failed"}
+
+
+class _EventStream:
+    """Writer of progress events as JSON lines, for dashboards and headless runs.
+
+    Each line is an object with ``time`` (epoch), ``event``, ``pipeline``,
+    ``workdir`` and event specific fields:
+
+    - ``start``: ``pid``, ``version``, ``expected`` (total number of jobs)
+    - ``job_started``, ``job_finished``, ``job_failed``: ``rule``, ``job``,
+      ``start``, ``end`` and ``duration`` (seconds, once finished)
+    - ``progress``: ``totals`` and ``rules`` (per-rule ``expected``, ``done``,
+      ``running`` and ``failed`` job counts), ``ram_gb`` and ``eta`` (estimated
+      remaining seconds, or null)
+    - ``job_straggler``, ``job_stalled``, ``job_resumed``: ``rule``, ``job``,
+      ``runtime`` and ``median`` (stragglers) or ``idle`` (stalled jobs), in
+      seconds (see :class:`_JobHealth`)
+    - ``end``: ``returncode``, ``elapsed``, ``done``
+
+    ``path`` is appended to (``-`` is stdout); it may also be a file object
+    shared by several streams, which is then not closed.  The jobs of
+    ``seed`` (e.g. the state restored from the journal) are known already: no
+    event is written for them until their state changes.
+    """
+
+    def __init__(self, path, pipeline: str, workdir: Path, seed: dict | None = None):
+        if hasattr(path, "write"):
+            self._fh = path
+        else:
+            self._fh = sys.stdout if path == "-" else open(path, "a", buffering=1)
+        self._owned = self._fh is not path and self._fh is not sys.stdout
+        self._base = {"pipeline": pipeline, "workdir": str(workdir)}
+        self.states: dict = {}  # (rule, job_key) → last state written
+        for rule, jobs in (seed or {}).items():
+            for key, job in jobs.items():
+                self.states[(rule, key)] = job.state
+        self._signature = None
+
+    def emit(self, event: str, **fields) -> None:
+        record = {"time": round(time.time(), 3), "event": event, **self._base, **fields}
+        self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._fh.flush()
+
+    def record_jobs(self, merged: dict) -> None:
+        """Write an event for each job of ``merged`` whose state changed."""
+        states = self.states
+        for rule, jobs in merged.items():
+            for key, job in jobs.items():
+                if states.get((rule, key)) != job.state and job.state in _JOB_EVENTS:
+                    states[(rule, key)] = job.state
+                    fields = {"rule": rule, "job": key, "start": round(job.start, 3)}
+                    if job.end is not None:
+                        fields.update(end=round(job.end, 3), duration=round(job.end - job.start, 3))
+                    self.emit(_JOB_EVENTS[job.state], **fields)
+
+    def record_health(self, changes: list) -> None:
+        """Write the straggler and stalled jobs found by :meth:`_JobHealth.check`."""
+        for event, rule, key, fields in changes:
+            self.emit(event, rule=rule, job=key, **fields)
+
+    def progress(
+        self, counters: "_RuleCounters", expected: dict, ram: float = 0.0, eta: float | None = None, force: bool = False
+    ) -> None:
+        """Write the per-rule job counts, if they changed since the last call."""
+        signature = (tuple(counters.totals.values()), tuple(expected.items()))
+        if signature == self._signature and not force:
+            return
+        self._signature = signature
+        rules = {}
+        for rule in dict.fromkeys([*expected, *counters.rules]):
+            rc = counters.rules.get(rule)
+            counts = rc.counts if rc else {}
+            rules[rule] = {
+                "expected": expected.get(rule, 0),
+                **{_STATE_NAMES[state]: counts.get(state, 0) for state in (DONE, RUNNING, FAILED)},
+            }
+        totals = {_STATE_NAMES[state]: counters.totals[state] for state in (DONE, RUNNING, FAILED)}
+        totals["expected"] = sum(expected.values())
+        eta = None if eta is None else round(eta)
+        self.emit("progress", totals=totals, rules=rules, ram_gb=round(ram, 2), eta=eta)
+
+    def close(self) -> None:
+        if self._owned:
+            self._fh.close()
+
+
+def _prom_labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+_PROM_METRICS = (
+    ("jobs", "Number of jobs per rule and state."),
+    ("jobs_expected", "Number of jobs expected per rule."),
+    ("rule_peak_rss_bytes", "Largest resident memory of a job of the rule."),
+    ("ram_bytes", "Resident memory of the whole run."),
+    ("start_time_seconds", "Start time of the run (epoch)."),
+    ("last_update_seconds", "Time of the last update of this file (epoch)."),
+    ("running", "1 while snakemake runs, 0 once it exited."),
+    ("exit_code", "Exit code of snakemake."),
+    ("eta_seconds", "Estimated remaining time of the run."),
+)
+
+
+def _prometheus_samples(
+    pipeline: str,
+    workdir: Path,
+    counters: "_RuleCounters",
+    expected: dict,
+    start_time: float,
+    memory_peaks: dict | None = None,
+    ram: float = 0.0,
+    returncode: int | None = None,
+    eta: float | None = None,
+) -> dict:
+    """Return the samples of one run as ``{metric: [(labels, value), …]}`` (see :data:`_PROM_METRICS`)."""
+    rules = list(dict.fromkeys([*expected, *counters.rules]))
+    samples = {
+        "jobs": [
+            ({"rule": rule, "state": _STATE_NAMES[state]}, counters.rules[rule].counts[state])
+            for rule in rules
+            if rule in counters.rules
+            for state in (DONE, RUNNING, FAILED)
+        ],
+        "jobs_expected": [({"rule": rule}, expected.get(rule, 0)) for rule in rules],
+        "rule_peak_rss_bytes": [({"rule": rule}, int(gb * 1024**3)) for rule, gb in (memory_peaks or {}).items()],
+        "ram_bytes": [({}, int(ram * 1024**3))],
+        "start_time_seconds": [({}, round(start_time, 3))],
+        "last_update_seconds": [({}, round(time.time(), 3))],
+        "running": [({}, int(returncode is None))],
+        "exit_code": [] if returncode is None else [({}, returncode)],
+        "eta_seconds": [] if eta is None else [({}, round(eta))],
+    }
+    run = {"pipeline": pipeline, "workdir": str(workdir)}
+    return {name: [({**run, **labels}, value) for labels, value in values] for name, values in samples.items()}
+
+
+def _write_prometheus_runs(path: Path, runs: list) -> None:
+    """Write the samples of several runs (see :func:`_prometheus_samples`) in the Prometheus text format."""
+    lines = []
+    for name, doc in _PROM_METRICS:
+        values = [sample for samples in runs for sample in samples[name]]
+        if not values:
+            continue
+        lines.append(f"# HELP sequana_monitor_{name} {doc}")
+        lines.append(f"# TYPE sequana_monitor_{name} gauge")
+        lines.extend(f"sequana_monitor_{name}{_prom_labels(**labels)} {value}" for labels, value in values)
+
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+def _write_prometheus(path: Path, *args, **kwargs) -> None:
+    """Write the progress of the run in the Prometheus text format.
+
+    Meant for the textfile collector of node_exporter (``path`` should end
+    with ``.prom``); the file is replaced atomically.  Runs are told apart by
+    their ``pipeline`` and ``workdir`` labels.  The arguments are those of
+    :func:`_prometheus_samples`.
+    """
+    _write_prometheus_runs(path, [_prometheus_samples(*args, **kwargs)])
+
+
+# ── run-time estimates ───────────────────────────────────────────────────────
+
+_HISTORY_NAME = "monitor_durations.json"
+_HISTORY_SAMPLES = 200  # job durations kept per rule
+
+
+def _history_path() -> Path:
+    """Return the default location of the duration history (sequana's user config directory)."""
+    from easydev import CustomConfig
+
+    return Path(CustomConfig("sequana", verbose=False).user_config_dir) / _HISTORY_NAME
+
+
+class _DurationHistory:
+    """Job durations of past runs, per pipeline and rule, stored as JSON.
+
+    For each rule, the last :data:`_HISTORY_SAMPLES` job durations are kept,
+    in seconds (``durations``) and, when the size of the input files of the
+    run is known, in seconds per GB of input file (``per_gb``), so that a run
+    on larger files gets longer estimates.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            self.data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.data = {}
+
+    def record(self, pipeline: str, counters: "_RuleCounters", input_gb: float | None = None) -> None:
+        """Add the durations of the jobs done in a run (see :class:`_RuleCount`) and save.
+
+        The file is read again and updated under a lock, so that monitors
+        finishing at the same time do not overwrite each other's durations.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock():
+            try:
+                self.data = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                pass
+            rules = self.data.setdefault(pipeline, {})
+            for rule, rc in counters.rules.items():
+                if not rc.durations:
+                    continue
+                entry = rules.setdefault(rule, {"durations": [], "per_gb": []})
+                entry["durations"] = (entry["durations"] + [round(d, 1) for d in rc.durations])[-_HISTORY_SAMPLES:]
+                if input_gb:
+                    per_gb = [round(d / input_gb, 3) for d in rc.durations]
+                    entry["per_gb"] = (entry["per_gb"] + per_gb)[-_HISTORY_SAMPLES:]
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self.data, separators=(",", ":")))
+            os.replace(tmp, self.path)
+
+    @contextmanager
+    def _lock(self):
+        """Hold an exclusive lock on a file next to the history (no lock without fcntl)"""
+        try:
+            import fcntl
+        except ImportError:  # pragma: no cover
+            yield
+            return
+        with open(self.path.with_name(f".{self.path.name}.lock"), "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def estimates(self, pipeline: str, input_gb: float | None = None) -> dict:
+        """Return the expected duration of a job of each rule (median of past runs), in seconds."""
+        result = {}
+        for rule, entry in self.data.get(pipeline, {}).items():
+            if input_gb and entry.get("per_gb"):
+                result[rule] = statistics.median(entry["per_gb"]) * input_gb
+            elif entry.get("durations"):
+                result[rule] = statistics.median(entry["durations"])
+        return result
+
+
+def _profile_parallelism(workdir: Path, profile: str) -> int | None:
+    """Return the number of jobs snakemake may run at once (``jobs``/``cores`` of the profile), or None."""
+    try:
+        import yaml
+
+        config = yaml.safe_load((workdir / profile / "config.yaml").read_text())
+    except Exception:
+        return None
+    if isinstance(config, dict):
+        for key in ("jobs", "cores"):
+            if isinstance(config.get(key), int) and config[key] > 0:
+                return config[key]
+    return None
+
+
+class _EtaModel:
+    """Critical-path estimate of the remaining time of a run.
+
+    The duration of a job of a rule is the median of the jobs of that rule
+    already done in this run, else the estimate from past runs (see
+    :class:`_DurationHistory`), else the median of all the jobs done so far.
+    The remaining time is the longest chain of unfinished rules through the
+    rule DAG of the dry run (``deps``), or the remaining work divided by the
+    number of jobs that can run at once, whichever is longer.
+    """
+
+    def __init__(self, deps: dict | None = None, history: dict | None = None, parallelism: int | None = None):
+        self.deps = deps or {}
+        self.history = history or {}
+        self.parallelism = parallelism
+        self._medians: dict = {}  # rule → (number of durations, median)
+        self._fallback = (0, None)  # (number of durations, median) of all the rules
+
+    def _median(self, rule: str, durations: list) -> float:
+        n, median = self._medians.get(rule, (0, 0.0))
+        if n != len(durations):
+            median = statistics.median(durations)
+            self._medians[rule] = (len(durations), median)
+        return median
+
+    def _median_all(self, rules: dict) -> float | None:
+        n = sum(len(rc.durations) for rc in rules.values())
+        if n != self._fallback[0]:
+            self._fallback = (n, statistics.median(d for rc in rules.values() for d in rc.durations) if n else None)
+        return self._fallback[1]
+
+    def remaining(self, counters: "_RuleCounters", expected: dict, now: float | None = None) -> float | None:
+        """Return the estimated remaining time in seconds, or None without any duration to go by."""
+        now = time.time() if now is None else now
+        rules = counters.rules
+        fallback = self._median_all(rules)
+
+        own: dict = {}  # rule → time to finish its own jobs once its inputs are ready
+        work = 0.0
+        for rule in dict.fromkeys([*expected, *rules]):
+            rc = rules.get(rule)
+            if rc is not None and rc.durations:
+                duration = self._median(rule, rc.durations)
+            else:
+                duration = self.history.get(rule, fallback)
+            n_total = max(expected.get(rule, 0), len(rc.states) if rc else 0)
+            finished = rc.counts[DONE] + rc.counts[FAILED] if rc else 0
+            running = list(rc.running.values()) if rc else []
+            waiting = max(0, n_total - finished - len(running))
+            if duration is None:
+                if waiting or running:
+                    return None
+                continue
+            left = [max(0.0, duration - (now - start)) for start in running]
+            work += waiting * duration + sum(left)
+            own[rule] = duration if waiting else max(left, default=0.0)
+
+        finish: dict = {}
+
+        def _finish(rule, depth=0):
+            if rule not in finish:
+                finish[rule] = 0.0  # guards against cycles
+                upstream = [_finish(u, depth + 1) for u in self.deps.get(rule, ()) if depth < 500]
+                finish[rule] = own.get(rule, 0.0) + max(upstream, default=0.0)
+            return finish[rule]
+
+        critical = max((_finish(rule) for rule in own), default=0.0)
+        parallelism = self.parallelism or max(counters.peak_running, 1)
+        return max(critical, work / parallelism)
+
+
+# ── stragglers and stalls ────────────────────────────────────────────────────
+
+_STALL_AFTER = 30 * 60.0  # seconds without log growth nor CPU use before a job is stalled
+_STALL_CPU = 1.0  # CPU seconds used since the last activity that count as activity
+_STRAGGLER_FACTOR = 3.0  # runtime, in medians of the rule's jobs, of a straggler
+_STRAGGLER_MIN_DONE = 3  # jobs of the rule done before its median is trusted
+_STRAGGLER_MIN_TIME = 60.0  # jobs running for less are never stragglers
+
+
+class _JobHealth:
+    """Detection of straggler and stalled jobs.
+
+    A running job is a straggler when it has been running ``straggler_factor``
+    times longer than the median duration of the jobs of its rule done in this
+    run.  It is stalled when, for ``stall_after`` seconds, none of its log
+    files (known from the dry run) grew and its processes used no CPU (as
+    sampled by :class:`_JobResources`; jobs running on a cluster are judged
+    on their logs only).  Jobs with neither log files nor sampled processes
+    are never considered stalled.
+    """
+
+    def __init__(
+        self,
+        workdir: Path,
+        log_to_job: dict | None = None,
+        resources: "_JobResources | None" = None,
+        stall_after: float = _STALL_AFTER,
+        straggler_factor: float = _STRAGGLER_FACTOR,
+    ):
+        self.workdir = Path(workdir)
+        self.resources = resources
+        self.stall_after = stall_after
+        self.straggler_factor = straggler_factor
+        self.stragglers: dict = {}  # (rule, job_key) → median duration of the rule when flagged
+        self.stalled: dict = {}  # (rule, job_key) → time of the last activity
+        self._activity: dict = {}  # (rule, job_key) → [time of the last activity, CPU time then]
+        self._medians: dict = {}  # rule → (number of durations, median)
+        self.set_logs(log_to_job)
+
+    def set_logs(self, log_to_job: dict | None) -> None:
+        """Set the log files of the jobs (relative path → ``(rule, job_key)``, see :func:`_parse_dryrun`)."""
+        self._logs: dict = {}
+        for rel, job in (log_to_job or {}).items():
+            self._logs.setdefault(tuple(job), []).append(rel)
+
+    def flags(self, rule: str, key: str) -> str:
+        """Return a short label of the problems of a job (empty if none)."""
+        job = (rule, key)
+        return " ".join(label for label, jobs in (("stalled", self.stalled), ("slow", self.stragglers)) if job in jobs)
+
+    def _last_activity(self, job: tuple, start: float) -> float | None:
+        rec = self._activity.get(job)
+        if rec is None:
+            rec = self._activity[job] = [start, 0.0]
+        known = False
+        for rel in self._logs.get(job, ()):
+            try:
+                rec[0] = max(rec[0], os.stat(self.workdir / rel).st_mtime)
+            except OSError:
+                continue
+            known = True
+        usage = self.resources.jobs.get(job) if self.resources else None
+        if usage is not None:
+            known = True
+            if usage["cpu"] - rec[1] >= _STALL_CPU:
+                rec[0] = max(rec[0], usage["last"])
+                rec[1] = usage["cpu"]
+        return rec[0] if known else None
+
+    def check(self, counters: "_RuleCounters", now: float | None = None) -> list:
+        """Update :attr:`stragglers` and :attr:`stalled` from the running jobs of ``counters``.
+
+        Return the changes as ``(event, rule, job_key, fields)`` tuples, the
+        events being ``job_straggler``, ``job_stalled`` and ``job_resumed``
+        (a stalled job that became active again).
+        """
+        now = time.time() if now is None else now
+        changes = []
+        running = set()
+        for rule, rc in counters.rules.items():
+            if not rc.running:
+                continue
+            median = None
+            if len(rc.durations) >= _STRAGGLER_MIN_DONE:
+                n, median = self._medians.get(rule, (0, 0.0))
+                if n != len(rc.durations):
+                    median = statistics.median(rc.durations)
+                    self._medians[rule] = (len(rc.durations), median)
+            for key, start in rc.running.items():
+                job = (rule, key)
+                running.add(job)
+                runtime = now - start
+                threshold = max(self.straggler_factor * median, _STRAGGLER_MIN_TIME) if median else None
+                if threshold and runtime > threshold and job not in self.stragglers:
+                    self.stragglers[job] = median
+                    changes.append(
+                        ("job_straggler", rule, key, {"runtime": round(runtime), "median": round(median, 1)})
+                    )
+                last = self._last_activity(job, start)
+                if last is not None and now - last > self.stall_after:
+                    if job not in self.stalled:
+                        self.stalled[job] = last
+                        changes.append(
+                            ("job_stalled", rule, key, {"runtime": round(runtime), "idle": round(now - last)})
+                        )
+                elif job in self.stalled:
+                    del self.stalled[job]
+                    changes.append(("job_resumed", rule, key, {"runtime": round(runtime)}))
+        # forget the jobs that are no longer running
+        for records in (self._activity, self.stalled, self.stragglers):
+            for job in [job for job in records if job not in running]:
+                del records[job]
+        return changes
+
+
 # ── rich rendering ────────────────────────────────────────────────────────────
 
 _STATUS_ICON = {
@@ -464,6 +2309,127 @@ _SAMPLE_ICON = {
 }
 
 
+_MAX_SAMPLE_ROWS = 20  # per-sample sub-rows shown for an active rule
+
+
+class _RuleCount:
+    """Job counters of one rule (see :class:`_RuleCounters`)."""
+
+    __slots__ = ("counts", "states", "running", "failed", "max_done", "durations")
+
+    def __init__(self):
+        self.counts = {DONE: 0, RUNNING: 0, FAILED: 0, WAITING: 0}
+        self.states: dict = {}  # job_key → state counted
+        self.running: dict = {}  # job_key → start of the RUNNING jobs
+        self.failed: dict = {}  # job_key → job of the FAILED jobs
+        self.max_done = 0.0  # longest DONE job (seconds), placeholders excluded
+        self.durations: list = []  # durations of the DONE jobs (seconds), placeholders excluded
+
+
+class _RuleCounters:
+    """Per-rule job counters, updated incrementally from the merged state.
+
+    Given the transitions found by :func:`_merge_states`, :meth:`update` only
+    counts the jobs that changed state, so that neither the scans nor
+    :func:`_build_display` go through every job of every rule.
+    """
+
+    def __init__(self, start_time: float = 0.0):
+        self.start_time = start_time
+        self.rules: dict = {}  # rule → _RuleCount
+        self.totals = {DONE: 0, RUNNING: 0, FAILED: 0, WAITING: 0}
+        self.peak_running = 0  # largest number of jobs seen running at once
+
+    def update(self, state: dict, transitions: list | None = None) -> "_RuleCounters":
+        """Count the jobs of the merged *state*.
+
+        With the *transitions* of the :func:`_merge_states` call that returned
+        *state*, only the jobs listed are counted again.  Otherwise every job
+        of *state* is compared with the state it was counted with (first
+        update, or a state changed outside of :func:`_merge_states`).
+        """
+        if transitions is None:
+            for rule, jobs in state.items():
+                rc = self.rules.get(rule)
+                if rc is None:
+                    rc = self.rules[rule] = _RuleCount()
+                seen = rc.states
+                for key, job in jobs.items():
+                    if seen.get(key) != job.state:
+                        self._count(rc, key, job)
+                if len(seen) > len(jobs):
+                    # jobs were dropped (e.g. snakemake-log entries superseded
+                    # by log files)
+                    self._recount(rule, jobs)
+            if len(self.rules) > len(state):
+                for rule in [r for r in self.rules if r not in state]:
+                    self._uncount(rule)
+        else:
+            recount = set()
+            for rule, key, job in transitions:
+                if key is None:
+                    if rule in self.rules:
+                        self._uncount(rule)
+                elif job is None:
+                    recount.add(rule)
+                else:
+                    rc = self.rules.get(rule)
+                    if rc is None:
+                        rc = self.rules[rule] = _RuleCount()
+                    if rc.states.get(key) != job.state:
+                        self._count(rc, key, job)
+            for rule in recount:
+                if rule in state:
+                    self._recount(rule, state[rule])
+        self.peak_running = max(self.peak_running, self.totals[RUNNING])
+        return self
+
+    def _count(self, rc: _RuleCount, key: str, job: _Job) -> None:
+        old = rc.states.get(key)
+        if old is not None:
+            rc.counts[old] -= 1
+            self.totals[old] -= 1
+            rc.running.pop(key, None)
+            rc.failed.pop(key, None)
+        new = job.state
+        rc.states[key] = new
+        rc.counts[new] += 1
+        self.totals[new] += 1
+        if new == RUNNING:
+            rc.running[key] = job.start
+        elif new == FAILED:
+            rc.failed[key] = job
+        elif new == DONE and job.end and job.start >= self.start_time and not key.startswith("_job_"):
+            rc.max_done = max(rc.max_done, job.end - job.start)
+            rc.durations.append(job.end - job.start)
+
+    def _uncount(self, rule: str) -> None:
+        rc = self.rules.pop(rule)
+        for state, n in rc.counts.items():
+            self.totals[state] -= n
+
+    def _recount(self, rule: str, jobs: dict) -> None:
+        # count the jobs of this rule again, from scratch
+        self._uncount(rule)
+        rc = self.rules[rule] = _RuleCount()
+        for key, job in jobs.items():
+            self._count(rc, key, job)
+
+
+def _rule_status(rc: "_RuleCount | None", n_total: int) -> str:
+    if rc is None:
+        return WAITING
+    if rc.counts[FAILED]:
+        return FAILED
+    if rc.counts[RUNNING]:
+        return RUNNING
+    if rc.counts[DONE] == n_total and n_total > 0:
+        return DONE
+    if rc.counts[DONE]:
+        return RUNNING  # partial progress: some done, next batch not yet started
+    return WAITING
+
+
 def _build_display(
     pipeline_name: str,
     version: str,
@@ -472,15 +2438,34 @@ def _build_display(
     start_time: float,
     pid: int,
     memory_peaks: "dict | None" = None,
+    ram: "float | None" = None,
+    counters: "_RuleCounters | None" = None,
+    collapse_done: bool = False,
+    top: int = 0,
+    eta_model: "_EtaModel | None" = None,
+    health: "_JobHealth | None" = None,
 ) -> Group:
+    """Build the live display.
+
+    ``counters`` are the :class:`_RuleCounters` of ``current``, kept up to
+    date by the caller (they are computed here if not given).  With
+    ``collapse_done``, finished rules are summarised on a single row; with
+    ``top`` > 0, only the ``top`` active rules with the most running jobs are
+    listed.  The ETA is estimated by ``eta_model`` (see :class:`_EtaModel`)
+    if given, from the rate of jobs done so far otherwise.  The straggler and
+    stalled jobs found by ``health`` (see :class:`_JobHealth`) are flagged.
+    """
     now = time.time()
     elapsed = now - start_time
+    if counters is None:
+        counters = _RuleCounters(start_time).update(current)
+    rules = counters.rules
 
     # ── totals ───────────────────────────────────────────────────────────────
-    total_expected = sum(expected.values()) if expected else max(sum(len(v) for v in current.values()), 1)
-    total_done = sum(1 for rv in current.values() for j in rv.values() if j["state"] == DONE)
-    total_running = sum(1 for rv in current.values() for j in rv.values() if j["state"] == RUNNING)
-    total_failed = sum(1 for rv in current.values() for j in rv.values() if j["state"] == FAILED)
+    total_expected = sum(expected.values()) if expected else max(sum(len(rc.states) for rc in rules.values()), 1)
+    total_done = counters.totals[DONE]
+    total_running = counters.totals[RUNNING]
+    total_failed = counters.totals[FAILED]
 
     # cap at 100%: dryrun counts may diverge slightly from actual tracked jobs
     pct = min(100, int(100 * total_done / total_expected)) if total_expected else 0
@@ -488,12 +2473,11 @@ def _build_display(
     bar_filled = int(18 * pct / 100)
     bar_str = "█" * bar_filled + "░" * (18 - bar_filled)
 
-    ram = _ram_gb(pid) if pid else 0.0
+    if ram is None:
+        ram = _ram_gb(pid) if pid else 0.0
 
-    eta_str = "—"
-    if 0 < total_done < total_expected and elapsed > 0:
-        rate = total_done / elapsed
-        eta_str = f"~{_elapsed_str((total_expected - total_done) / rate)}"
+    remaining = eta_model.remaining(counters, expected, now) if eta_model and total_done < total_expected else None
+    eta_str = f"~{_elapsed_str(remaining)}" if remaining else _eta_str(total_done, total_expected, elapsed)
 
     # ── header ───────────────────────────────────────────────────────────────
     hdr = Text()
@@ -510,6 +2494,14 @@ def _build_display(
     if ram > 0:
         hdr.append(f"  │  Peak RAM: {ram:.1f} GB")
     hdr.append("\n")
+    if health and (health.stalled or health.stragglers):
+        hdr.append(" ⚠  ")
+        if health.stalled:
+            hdr.append(f"Stalled: {len(health.stalled)} jobs", style="bold red")
+            hdr.append("  │  " if health.stragglers else "")
+        if health.stragglers:
+            hdr.append(f"Stragglers: {len(health.stragglers)} jobs", style="bold yellow")
+        hdr.append("\n")
 
     # ── table ────────────────────────────────────────────────────────────────
     show_mem = _HAS_PSUTIL and memory_peaks is not None
@@ -520,33 +2512,42 @@ def _build_display(
     tbl.add_column("Time", justify="right", min_width=10)
     if show_mem:
         tbl.add_column("Mem Peak", justify="right", min_width=9)
+    extra = [""] if show_mem else []
 
     # merge expected (which may include rules not yet started) with observed
     all_rules = list(expected.keys()) if expected else []
-    for rule in current:
+    for rule in rules:
         if rule not in all_rules:
             all_rules.append(rule)
 
+    # (index, rule, rule_count, n_total, status)
+    rows = []
     for i, rule in enumerate(all_rules):
-        rule_jobs = current.get(rule, {})
-        rule_expected_n = expected.get(rule, len(rule_jobs))
-        n_done = sum(1 for j in rule_jobs.values() if j["state"] == DONE)
-        n_fail = sum(1 for j in rule_jobs.values() if j["state"] == FAILED)
-        n_run = sum(1 for j in rule_jobs.values() if j["state"] == RUNNING)
-        n_total = max(len(rule_jobs), rule_expected_n)
-
-        # rule-level status
-        if n_fail > 0:
-            rule_status_key = FAILED
-        elif n_run > 0:
-            rule_status_key = RUNNING
-        elif n_done == n_total and n_total > 0:
-            rule_status_key = DONE
-        elif n_done > 0:
-            rule_status_key = RUNNING  # partial progress: some done, next batch not yet started
-        else:
-            rule_status_key = WAITING
-
+        rc = rules.get(rule)
+        n_jobs = len(rc.states) if rc else 0
+        n_total = max(n_jobs, expected.get(rule, n_jobs))
+        rows.append((i, rule, rc, n_total, _rule_status(rc, n_total)))
+
+    hidden: dict = {}  # status → number of rules not listed
+    if collapse_done:
+        done_rows = [r for r in rows if r[4] == DONE]
+        if done_rows:
+            n_jobs = sum(r[3] for r in done_rows)
+            label = f"  ✔ {len(done_rows)} finished step{'s' if len(done_rows) > 1 else ''}"
+            status_label, status_style = _STATUS_ICON[DONE]
+            tbl.add_row(label, f"{n_jobs}/{n_jobs}", Text(status_label, style=status_style), "", *extra, style="dim")
+        rows = [r for r in rows if r[4] != DONE]
+    if top > 0:
+        active = [r for r in rows if r[4] in (RUNNING, FAILED)]
+        active.sort(key=lambda r: (r[4] != FAILED, -r[2].counts[RUNNING]))
+        shown = {r[0] for r in active[:top]}
+        for r in rows:
+            if r[0] not in shown:
+                hidden[r[4]] = hidden.get(r[4], 0) + 1
+        rows = [r for r in rows if r[0] in shown]
+
+    for i, rule, rc, n_total, rule_status_key in rows:
+        n_done = rc.counts[DONE] if rc else 0
         status_label, status_style = _STATUS_ICON[rule_status_key]
         status_text = Text(status_label, style=status_style)
 
@@ -557,19 +2558,10 @@ def _build_display(
         sample_str = f"{n_done}/{n_total}  {s_bar}"
 
         # rule timing — show the slowest sample; exclude synthetic _job_N placeholders
-        monitor_start_dt = datetime.fromtimestamp(start_time)
-        durations = [
-            (j["end"] - j["start"]).total_seconds()
-            for s, j in rule_jobs.items()
-            if j["state"] == DONE and j["end"] and j["start"] >= monitor_start_dt and not s.startswith("_job_")
-        ]
-        if durations:
-            time_str = _elapsed_str(max(durations))
-        elif n_run > 0:
-            running_s = [
-                (datetime.now() - j["start"]).total_seconds() for j in rule_jobs.values() if j["state"] == RUNNING
-            ]
-            time_str = (_elapsed_str(max(running_s)) + "...") if running_s else "—"
+        if rc and rc.max_done:
+            time_str = _elapsed_str(rc.max_done)
+        elif rc and rc.running:
+            time_str = _elapsed_str(now - min(rc.running.values())) + "..."
         else:
             time_str = "—"
 
@@ -582,30 +2574,50 @@ def _build_display(
 
         # per-sample sub-rows only while the rule is active or failed
         # (collapse once all samples are done)
-        # Exclude synthetic placeholder entries added for untracked rules
-        visible_samples = [(s, j) for s, j in rule_jobs.items() if not s.startswith("_job_")]
-        if rule_status_key in (RUNNING, FAILED):
-            samples = visible_samples
-            # also add queued placeholders up to expected count
-            queued_n = rule_expected_n - len(samples)
-            for sample, job in samples:
-                icon = _SAMPLE_ICON[job["state"]]
-                if job["state"] == DONE and job["end"]:
-                    s_time = _elapsed_str((job["end"] - job["start"]).total_seconds())
-                elif job["state"] == RUNNING:
-                    s_time = _elapsed_str((datetime.now() - job["start"]).total_seconds()) + "..."
-                elif job["state"] == FAILED:
-                    s_time = "failed"
-                else:
-                    s_time = "queued"
-                prefix = "└─" if (sample == samples[-1][0] and queued_n == 0) else "├─"
-                sub_row = [f"     {prefix} {sample}", "", icon, s_time]
-                if show_mem:
-                    sub_row.append("")
-                tbl.add_row(*sub_row, style="dim" if job["state"] == DONE else None)
-            for _ in range(min(queued_n, 3)):
-                extra = [""] if show_mem else []
-                tbl.add_row("     ├─ …", "", "⏳", "queued", *extra, style="dim")
+        if rule_status_key not in (RUNNING, FAILED):
+            continue
+        rule_jobs = current.get(rule, {})
+        if len(rule_jobs) <= _MAX_SAMPLE_ROWS:
+            # Exclude synthetic placeholder entries added for untracked rules
+            samples = [(s, j) for s, j in rule_jobs.items() if not s.startswith("_job_")]
+            more = 0
+        else:
+            # large rule: list the failed and running samples only
+            samples = [(s, j) for s, j in rc.failed.items() if not s.startswith("_job_")]
+            running = [s for s in rc.running if s in rule_jobs and not s.startswith("_job_")]
+            if health:
+                running.sort(key=lambda s: not health.flags(rule, s))  # flagged jobs first
+            samples += [(s, rule_jobs[s]) for s in running]
+            more = len(samples) - _MAX_SAMPLE_ROWS
+            samples = samples[:_MAX_SAMPLE_ROWS]
+        # also add queued placeholders up to expected count
+        queued_n = n_total - len(rc.states)
+        for sample, job in samples:
+            icon = _SAMPLE_ICON[job.state]
+            if job.state == DONE and job.end:
+                s_time = _elapsed_str(job.end - job.start)
+            elif job.state == RUNNING:
+                s_time = _elapsed_str(now - job.start) + "..."
+                flags = health.flags(rule, sample) if health else ""
+                if flags:
+                    s_time = Text(f"⚠ {flags} {s_time}", style="bold red" if "stalled" in flags else "bold yellow")
+            elif job.state == FAILED:
+                s_time = "failed"
+            else:
+                s_time = "queued"
+            prefix = "└─" if (sample == samples[-1][0] and queued_n == 0 and more <= 0) else "├─"
+            sub_row = [f"     {prefix} {sample}", "", icon, s_time]
+            if show_mem:
+                sub_row.append("")
+            tbl.add_row(*sub_row, style="dim" if job.state == DONE else None)
+        if more > 0:
+            tbl.add_row(f"     ├─ … {more} more", "", "", "", *extra, style="dim")
+        for _ in range(min(queued_n, 3)):
+            tbl.add_row("     ├─ …", "", "⏳", "queued", *extra, style="dim")
+
+    if hidden:
+        detail = ", ".join(f"{n} {_STATE_NAMES[state]}" for state, n in hidden.items())
+        tbl.add_row(f"  … {sum(hidden.values())} more steps ({detail})", "", "", "", *extra, style="dim")
 
     # ── footer ───────────────────────────────────────────────────────────────
     ftr = Text()
@@ -620,6 +2632,281 @@ def _build_display(
     return Group(hdr, tbl, ftr)
 
 
+# ── scheduling ───────────────────────────────────────────────────────────────
+
+
+class _Scheduler:
+    """Run the monitor tasks (scan, memory sampling, rendering) on their own cadence.
+
+    Each task has a base interval.  When a run of a task reports no change,
+    its interval is multiplied by ``backoff`` up to ``max_interval``; any
+    change resets it to the base interval.  During a long idle phase (e.g. a
+    10-hour index build), the monitor therefore wakes up less and less often
+    and uses almost no CPU.
+
+    ::
+
+        sched = _Scheduler({"scan": 0.5, "render": 1.0}, max_interval=10)
+        while running:
+            now = time.monotonic()
+            if sched.due("scan", now):
+                sched.done("scan", now, changed=scan())
+            time.sleep(sched.wait(time.monotonic()))
+    """
+
+    def __init__(self, intervals: dict, max_interval: float = 10.0, backoff: float = 2.0):
+        now = time.monotonic()
+        self.base = dict(intervals)
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = dict(intervals)
+        self.next_run = {name: now for name in intervals}  # every task is due at start
+
+    def due(self, name: str, now: float) -> bool:
+        return now >= self.next_run[name]
+
+    def done(self, name: str, now: float, changed: bool = True) -> None:
+        """Record a run of *name* and schedule the next one."""
+        if changed:
+            self.interval[name] = self.base[name]
+        else:
+            self.interval[name] = min(self.interval[name] * self.backoff, max(self.max_interval, self.base[name]))
+        self.next_run[name] = now + self.interval[name]
+
+    def wake(self, name: str, now: float) -> None:
+        """Make *name* due now and reset its interval (e.g. render after a change)."""
+        self.interval[name] = self.base[name]
+        self.next_run[name] = min(self.next_run[name], now)
+
+    def wait(self, now: float) -> float:
+        """Seconds until the next task is due."""
+        return max(0.0, min(self.next_run.values()) - now)
+
+
+# ── aggregate monitor ────────────────────────────────────────────────────────
+
+
+def _expand_runs(patterns) -> list:
+    """Return the working directories matching *patterns* (paths or glob patterns), sorted.
+
+    Only directories that look like a pipeline working directory (with a
+    ``.sequana`` or ``.snakemake`` sub-directory) are kept.
+    """
+    import glob
+
+    found = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.expanduser(pattern)):
+            path = Path(path).resolve()
+            if (path / ".sequana").is_dir() or (path / ".snakemake").is_dir():
+                found.add(path)
+    return sorted(found)
+
+
+class _RunTracker:
+    """Progress of one of the runs followed by :func:`run_aggregate`.
+
+    The pipeline name, version and start time are read from the monitor
+    journal when there is one, the expected jobs from the cached dry run (see
+    :func:`_load_dryrun_cache`).  A run whose snakemake (``pid``) is not
+    running is read once and considered finished.  ``health`` holds keyword
+    arguments of :class:`_JobHealth`.
+    """
+
+    def __init__(self, workdir: Path, pid: int | None, group: _LogWatcherGroup, events=None, health=None):
+        self.workdir = workdir
+        journal = _load_journal(workdir / ".sequana" / _JOURNAL_NAME) or {}
+        start = journal.get("start") or {}
+        end = journal.get("end") or {}
+        # sequana working directories hold the pipeline's <name>.rules
+        rules = next(workdir.glob("*.rules"), None)
+        self.pipeline = start.get("pipeline") or (rules.stem if rules else workdir.name)
+        self.version = start.get("version", "")
+        dryrun = _load_dryrun_cache(workdir)
+        self.expected, self.log_to_job, deps = dryrun if dryrun else (OrderedDict(), {}, {})
+        self.eta_model = _EtaModel(deps)
+        self.health = _JobHealth(workdir, self.log_to_job, **(health or {}))
+
+        self.snakelog = workdir / ".sequana" / "snakemake.log"
+        if pid is not None and pid != start.get("pid"):
+            # not started by a monitor: follow snakemake's own log
+            started = _process_start(pid)
+            self.snakelog = _latest_snakemake_log(workdir, started or 0) or self.snakelog
+            self.start_time = started or time.time()
+        elif pid is None and not self.snakelog.exists():
+            self.snakelog = _latest_snakemake_log(workdir) or self.snakelog
+            self.start_time = start.get("time")
+        else:
+            self.start_time = start.get("time")
+
+        self.current: dict = {}
+        self.merged: dict = {}
+        self.prev_merged: dict = {}
+        self.ram = 0.0
+        self.end_time = None
+        self.returncode = None
+        self.proc = None
+        self.watcher = None
+        self.parser = _SnakemakeLogParser(self.snakelog)
+        self._signature = None
+
+        if pid is None:
+            # finished (or never started): read it once
+            if journal.get("jobs") and end:
+                self.current, sm_state = _journal_states(journal, running=True)
+                self.merged, _ = _merge_states(self.current, sm_state, {})
+                self.returncode = end.get("returncode", 1)
+                self.end_time = end.get("time")
+            else:
+                self.current = _scan_logs(workdir, {}, self.log_to_job)
+                self.merged, _ = _merge_states(self.current, self.parser.update(final=True), {})
+                self.returncode = _returncode_from_log(self.snakelog) if self.snakelog.exists() else 1
+                self.end_time = self.snakelog.stat().st_mtime if self.snakelog.exists() else None
+        else:
+            self.proc = _AttachedProcess(pid, self.snakelog)
+            self.watcher = group.add(workdir)
+        if self.start_time is None:
+            starts = [job.start for jobs in self.merged.values() for job in jobs.values()]
+            self.start_time = min(starts) if starts else time.time()
+        self.counters = _RuleCounters(self.start_time).update(self.merged)
+
+        self.events = None
+        if events is not None:
+            self.events = _EventStream(events, self.pipeline, workdir, seed=self.merged)
+            self.events.emit("start", pid=pid, version=self.version, expected=sum(self.expected.values()))
+            if self.finished:
+                self._end_event()
+
+    @property
+    def finished(self) -> bool:
+        return self.returncode is not None
+
+    def scan(self) -> bool:
+        """Update the state of a running run; return True if it changed."""
+        if self.finished:
+            return False
+        returncode = self.proc.poll()
+        final = returncode is not None
+        self.current = _scan_logs(self.workdir, self.current, self.log_to_job, watcher=self.watcher)
+        sm_state = self.parser.update(final=final)
+        watcher = self.watcher
+        signature = watcher.n_reported, len(watcher.active), self.parser.offset, self.parser._inode
+        if signature == self._signature and not final:
+            return False
+        self._signature = signature
+        transitions: list = []
+        self.merged, self.prev_merged = _merge_states(self.current, sm_state, self.prev_merged, transitions)
+        if final:
+            if returncode != 0:
+                _mark_remaining_failed(self.merged)
+            else:
+                _mark_remaining_done(self.merged, self.expected)
+            self.returncode = returncode
+            self.end_time = time.time()
+            self.watcher.close()
+        # the jobs left running were marked at the end: count them all again
+        self.counters.update(self.merged, None if final else transitions)
+        if self.events:
+            self.events.record_jobs(self.merged)
+            if final:
+                self._end_event()
+        return True
+
+    def sample_memory(self) -> bool:
+        """Sample the RSS of the run and look for stalled jobs; return True if either changed noticeably."""
+        ram_prev = self.ram
+        self.ram = 0.0 if self.finished else _ram_gb(self.proc.pid)
+        changes = self.health.check(self.counters) if not self.finished else []
+        if self.events and changes:
+            self.events.record_health(changes)
+        return abs(self.ram - ram_prev) > 0.05 * max(ram_prev, 0.1) or bool(changes)
+
+    def _end_event(self) -> None:
+        self.events.progress(self.counters, self.expected, force=True)
+        self.events.emit(
+            "end",
+            returncode=self.returncode,
+            elapsed=round(self.elapsed, 3),
+            done=self.counters.totals[DONE],
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return (self.end_time or time.time()) - self.start_time
+
+    def totals(self) -> tuple:
+        """Return ``(done, expected, running, failed)``."""
+        totals = self.counters.totals
+        expected = sum(self.expected.values()) or sum(len(rc.states) for rc in self.counters.rules.values())
+        return totals[DONE], expected, totals[RUNNING], totals[FAILED]
+
+    def prometheus_samples(self) -> dict:
+        return _prometheus_samples(
+            self.pipeline,
+            self.workdir,
+            self.counters,
+            self.expected,
+            self.start_time,
+            ram=self.ram,
+            returncode=self.returncode,
+        )
+
+
+def _build_aggregate_display(trackers: list, start_time: float) -> Group:
+    """Build the live display of :func:`run_aggregate`: one row per run."""
+    tbl = Table(box=box.ROUNDED, show_header=True, header_style="bold blue", expand=True)
+    tbl.add_column("  Run", no_wrap=True, min_width=12)
+    tbl.add_column("Pipeline", no_wrap=True)
+    tbl.add_column("Progress", no_wrap=True, min_width=26)
+    tbl.add_column("Running", justify="right", min_width=7)
+    tbl.add_column("Failed", justify="right", min_width=6)
+    tbl.add_column("Elapsed", justify="right", min_width=11)
+    tbl.add_column("ETA", justify="right", min_width=11)
+    tbl.add_column("Status", justify="center", min_width=10)
+
+    n_status = {RUNNING: 0, DONE: 0, FAILED: 0}
+    for tracker in trackers:
+        done, expected, running, failed = tracker.totals()
+        pct = min(100, int(100 * done / expected)) if expected else 0
+        bar_filled = int(10 * pct / 100)
+        progress = f"{pct:>3d}% " + "█" * bar_filled + "░" * (10 - bar_filled) + f" {min(done, expected)}/{expected}"
+        if tracker.finished:
+            status = DONE if tracker.returncode == 0 else FAILED
+            eta = "—"
+        else:
+            status = RUNNING
+            remaining = tracker.eta_model.remaining(tracker.counters, tracker.expected) if done < expected else None
+            eta = f"~{_elapsed_str(remaining)}" if remaining else _eta_str(done, expected, tracker.elapsed)
+        n_status[status] += 1
+        status_label, status_style = _STATUS_ICON[status]
+        status_text = Text(status_label, style=status_style)
+        health = tracker.health
+        if status == RUNNING and health.stalled:
+            status_text = Text(f"⚠ {len(health.stalled)} stalled", style="bold red")
+        elif status == RUNNING and health.stragglers:
+            status_text = Text(f"⚠ {len(health.stragglers)} slow", style="bold yellow")
+        tbl.add_row(
+            f"  {tracker.workdir.name}",
+            f"{tracker.pipeline}" + (f" v{tracker.version}" if tracker.version else ""),
+            progress,
+            str(running) if running else "",
+            Text(str(failed), style="bold red") if failed else "",
+            _elapsed_str(tracker.elapsed),
+            eta,
+            status_text,
+        )
+
+    hdr = Text()
+    hdr.append("\n 🧬 Sequana runs", style="bold cyan")
+    hdr.append("\n ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
+    hdr.append(f"\n 📊 {len(trackers)} runs: ")
+    hdr.append(f"{n_status[RUNNING]} running", style="bold yellow")
+    hdr.append(f"  │  {n_status[DONE]} completed", style="bold green")
+    hdr.append(f"  │  {n_status[FAILED]} failed", style="bold red" if n_status[FAILED] else None)
+    hdr.append(f"\n ⏱  Monitoring for {_elapsed_str(time.time() - start_time)}\n")
+    return Group(hdr, tbl)
+
+
 # ── public entry point ────────────────────────────────────────────────────────
 
 
@@ -629,108 +2916,390 @@ def run_monitor(
     pipeline_name: str = "Pipeline",
     version: str = "",
     workdir: str = ".",
+    watcher: str = "auto",
+    scan_interval: float = 0.5,
+    memory_interval: float = 2.0,
+    render_interval: float = 0.5,
+    max_interval: float = 10.0,
+    attach: bool = False,
+    resume: bool = True,
+    background_dryrun: bool = False,
+    collapse_done: bool = False,
+    top: int = 0,
+    events: str | None = None,
+    metrics: str | None = None,
+    history: str | bool = True,
+    stall_after: float = _STALL_AFTER,
+    straggler_factor: float = _STRAGGLER_FACTOR,
 ) -> int:
     """Run snakemake with a rich live progress display.
 
+    ``watcher`` selects how log files are discovered between two scans:
+    ``auto`` (inotify on local Linux file systems, polling otherwise),
+    ``inotify`` or ``polling``.
+
+    The dry run giving the expected jobs is cached in
+    ``.sequana/dryrun_cache.json`` and only repeated when the snakefile,
+    ``config.yaml``, the ``rules/`` directory or the input files change.  With
+    ``background_dryrun``, a dry run that is not cached runs in the
+    background: the display starts right away and the expected job counts
+    appear once it is done.
+
+    With ``collapse_done``, finished rules are summarised on a single row of
+    the display; with ``top`` > 0, only the ``top`` most active rules are
+    listed.
+
+    With ``events``, progress events (see :class:`_EventStream`) are appended
+    as JSON lines to that file (``-`` for stdout); with ``metrics``, the
+    progress is written to that file in the Prometheus text format (see
+    :func:`_write_prometheus`).
+
+    The ETA is a critical-path estimate over the rule DAG of the dry run (see
+    :class:`_EtaModel`), informed by the job durations of past runs of the
+    pipeline.  These are saved at the end of each run in ``history`` (a path;
+    True for ``monitor_durations.json`` in sequana's user config directory,
+    False to disable).
+
+    Running jobs that take ``straggler_factor`` times longer than the median
+    job of their rule, or whose logs and processes have been idle for
+    ``stall_after`` seconds, are flagged in the display and the events (see
+    :class:`_JobHealth`).
+
+    Log scanning, memory sampling and rendering run on their own intervals
+    (in seconds).  Each interval doubles, up to ``max_interval``, while
+    nothing changes and is reset as soon as something does.
+
+    The state of the run is journaled in ``.sequana/monitor.journal``.  With
+    ``resume`` (default), a monitor restarted after an interrupted or failed
+    run starts from the journal: the jobs already done keep their timings and
+    resource usage.  With ``attach``, no
+    snakemake is started: the monitor watches the snakemake already running
+    in ``workdir`` (e.g. after an SSH disconnection) and Ctrl-C only detaches
+    from it.
+
     Returns snakemake's exit code.
-    Falls back to a plain subprocess exec if stdout is not a TTY.
+    If stdout is not a TTY, the monitor runs headless when ``events`` or
+    ``metrics`` is set: jobs are tracked the same way but nothing is
+    displayed.  Otherwise, it falls back to a plain subprocess exec.
     """
     workdir_path = Path(workdir).resolve()
     snakelog = workdir_path / ".sequana" / "snakemake.log"
     snakelog.parent.mkdir(parents=True, exist_ok=True)
 
-    if not sys.stdout.isatty():
+    headless = not sys.stdout.isatty()
+    if headless and not attach and not (events or metrics):
         # Non-interactive: just run snakemake directly and let it print normally
         cmd = ["snakemake", "-s", snakefile, "--profile", profile]
         return subprocess.run(cmd, cwd=workdir_path).returncode
+    headless = headless and bool(events or metrics)
+
+    # messages go to stderr when headless, stdout being left to the events
+    console = Console(stderr=headless)
+    journal_path = snakelog.parent / _JOURNAL_NAME
+    previous = _load_journal(journal_path) if (resume or attach) else None
+    journal_pid = previous["start"]["pid"] if previous and previous["start"] else None
+
+    same_run = False  # attached to the snakemake recorded in the journal
+    if attach:
+        pid = _find_snakemake(workdir_path, journal_pid)
+        if pid is None:
+            console.print(f"[bold red]No running snakemake found in {workdir_path}.[/bold red]")
+            return 1
+        same_run = pid == journal_pid
+        if not same_run:
+            # not started by the monitor: follow snakemake's own log instead
+            snakelog = _latest_snakemake_log(workdir_path, _process_start(pid) or 0) or snakelog
+
+    if previous and not same_run and previous["end"] and previous["end"]["returncode"] == 0:
+        previous = None  # the previous run completed: start afresh
+
+    # the dry run is cached; without a cached result it may run in the
+    # background while snakemake and the display start
+    dryrun_key = _dryrun_key(snakefile, workdir_path)
+    dryrun = _load_dryrun_cache(workdir_path, dryrun_key)
+    background = None
+    if dryrun is None:
+        background = _BackgroundDryRun(snakefile, profile, workdir_path, dryrun_key)
+        background.start()
+        dryrun = (OrderedDict(), {}, {})
+        if headless and not background_dryrun:
+            background.join()
+            dryrun = background.result
+            background = None
+        elif not background_dryrun:
+            # wait for the dry run, showing the expected jobs as they are parsed
+            with Live(console=console, auto_refresh=False, screen=False) as live:
+                while background.is_alive():
+                    partial = background.parser.partial
+                    live.update(_build_display(pipeline_name, version, partial, {}, time.time(), None), refresh=True)
+                    background.join(render_interval)
+            dryrun = background.result
+            background = None
+    expected, log_to_job, deps = dryrun
+
+    history_store = None
+    if history:
+        try:
+            history_store = _DurationHistory(_history_path() if history is True else history)
+        except Exception as err:  # pragma: no cover
+            logger.debug(f"No duration history: {err}")
+    input_gb = _input_gb(workdir_path)
+    eta_model = _EtaModel(
+        deps,
+        history_store.estimates(pipeline_name, input_gb) if history_store else {},
+        _profile_parallelism(workdir_path, profile),
+    )
+
+    if attach:
+        proc = _AttachedProcess(pid, snakelog)
+        if same_run:
+            start_time = previous["start"]["time"]
+        else:
+            start_time = _process_start(pid) or time.time()
+    else:
+        cmd = ["snakemake", "-s", snakefile, "--profile", profile]
+        with open(snakelog, "w") as log_fh:
+            proc = subprocess.Popen(cmd, cwd=workdir_path, stdout=log_fh, stderr=log_fh)
+        pid = proc.pid
+        # a resumed run is timed from the start of the first one
+        start_time = previous["start"]["time"] if previous and previous["start"] else time.time()
 
-    expected, log_to_job = _parse_dryrun(snakefile, profile, workdir_path)
-
-    cmd = ["snakemake", "-s", snakefile, "--profile", profile]
-    with open(snakelog, "w") as log_fh:
-        proc = subprocess.Popen(cmd, cwd=workdir_path, stdout=log_fh, stderr=log_fh)
-
-    pid = proc.pid
-    start_time = time.time()
     current: dict = {}
     sm_current: dict = {}  # state from snakemake log (fallback for no-log rules)
     prev_merged: dict = {}  # merged state from previous scan, for transition detection
-    memory_peaks: dict = {}  # rule → peak GB seen while any sample was RUNNING
-    console = Console()
+    counters = _RuleCounters(start_time)
+    memory_peaks: dict = {}  # rule → largest per-job peak GB
+    log_watcher = _make_log_watcher(workdir_path, watcher)
+    sm_parser = _SnakemakeLogParser(snakelog)
+    resources = _JobResources(log_to_job, workdir_path, sm_parser.job_for_jobid)
+
+    if previous:
+        current, sm_done = _journal_states(previous, running=same_run)
+        sm_parser = _SnakemakeLogParser(snakelog, sm_done)
+        if same_run and previous["parser"]:
+            sm_parser.restore(previous["parser"])
+        elif not attach:
+            # the new snakemake log starts empty: number new jobs after the old ones
+            sm_parser.done_count = {rule: len(jobs) for rule, jobs in sm_done.items()}
+        resources = _JobResources(log_to_job, workdir_path, sm_parser.job_for_jobid)
+        resources.jobs.update(previous["resources"])
+        memory_peaks = resources.rule_peaks()
+        seed, prev_merged = _merge_states(current, sm_parser.update(), {})
+        counters.update(seed)
+    health = _JobHealth(workdir_path, log_to_job, resources, stall_after, straggler_factor)
+
+    try:
+        # the monitor that started snakemake may still be running and writing
+        # to the journal: when attached to it, only append
+        journal = _Journal(journal_path, previous, compact=not same_run)
+    except OSError as err:  # pragma: no cover
+        logger.warning(f"Could not write the monitor journal: {err}")
+        journal = None
+    if journal and not same_run:
+        journal.write(
+            "start", {"pid": pid, "time": round(start_time, 3), "pipeline": pipeline_name, "version": version}
+        )
+
+    event_stream = None
+    if events:
+        try:
+            event_stream = _EventStream(events, pipeline_name, workdir_path, seed=prev_merged)
+        except OSError as err:
+            logger.warning(f"Could not write the progress events: {err}")
+        else:
+            event_stream.emit("start", pid=pid, version=version, expected=sum(expected.values()))
+
+    def _report(returncode=None, force=False):
+        # machine-readable progress, at the pace of the display
+        eta = eta_model.remaining(counters, expected) if returncode is None else None
+        if event_stream:
+            event_stream.progress(counters, expected, ram_now, eta, force=force)
+        if metrics:
+            try:
+                _write_prometheus(
+                    metrics,
+                    pipeline_name,
+                    workdir_path,
+                    counters,
+                    expected,
+                    start_time,
+                    memory_peaks,
+                    ram=ram_now,
+                    returncode=returncode,
+                    eta=eta,
+                )
+            except OSError as err:  # pragma: no cover
+                logger.warning(f"Could not write the metrics file: {err}")
+
+    detached = False
 
     def _handle_sigint(sig, frame):
-        proc.send_signal(signal.SIGINT)
+        nonlocal detached
+        if attach:
+            detached = True
+        else:
+            proc.send_signal(signal.SIGINT)
 
     signal.signal(signal.SIGINT, _handle_sigint)
 
-    def _merged_scan():
-        """Return merged state: log-file entries take precedence, but snakemake-log
-        RUNNING state prevents premature DONE from a stale log-file mtime (e.g. a
-        tool like flye that writes nothing to stdout/stderr during its main work).
-        Timing is captured at the RUNNING→DONE transition in merged state so that
-        the elapsed time reflects the true wall-clock duration seen by the monitor."""
-        nonlocal current, sm_current, prev_merged
-        current = _scan_logs(workdir_path, current, log_to_job)
-        sm_current = _scan_snakemake_log(snakelog, sm_current)
-        merged = dict(sm_current)  # start with snakemake-log state
-        for rule, jobs in current.items():
-            # If snakemake-log still shows RUNNING jobs for this rule, don't let
-            # a stale log-file mtime mark any job as DONE prematurely.
-            sm_rule_running = any(j["state"] == RUNNING for j in sm_current.get(rule, {}).values())
-            if sm_rule_running:
-                corrected = {
-                    s: ({**j, "state": RUNNING, "end": None} if j["state"] == DONE else j) for s, j in jobs.items()
-                }
-                merged[rule] = corrected
-            else:
-                merged[rule] = jobs
-
-        # Fix timing: when a job transitions RUNNING→DONE in the merged view,
-        # stamp end=now and carry forward the start from the RUNNING entry.
-        # This avoids using filesystem mtime/ctime which are unreliable on Linux
-        # (ctime≈mtime, so end-start≈0 when derived from log-file metadata alone).
-        now_dt = datetime.now()
-        for rule, jobs in merged.items():
-            for sample, job in jobs.items():
-                prev_job = prev_merged.get(rule, {}).get(sample)
-                if job["state"] == DONE:
-                    if prev_job and prev_job["state"] == RUNNING:
-                        # First cycle where this job appears DONE: lock in timing now
-                        job["end"] = now_dt
-                        job["start"] = prev_job["start"]
-                    elif prev_job and prev_job["state"] == DONE and prev_job.get("end"):
-                        # Already had a locked end time: preserve it
-                        job["end"] = prev_job["end"]
-                        job["start"] = prev_job["start"]
-
-        prev_merged = {r: {s: dict(j) for s, j in rj.items()} for r, rj in merged.items()}
-        return merged
-
-    def _update_memory_peaks(display_state: dict, ram_now: float) -> None:
-        """For every rule with at least one RUNNING job, update its peak RAM."""
-        if not _HAS_PSUTIL or ram_now <= 0:
-            return
-        for rule, jobs in display_state.items():
-            if any(j["state"] == RUNNING for j in jobs.values()):
-                memory_peaks[rule] = max(memory_peaks.get(rule, 0.0), ram_now)
-
-    with Live(console=console, refresh_per_second=2, screen=False) as live:
-        while proc.poll() is None:
-            display_state = _merged_scan()
-            ram_now = _ram_gb(pid)
-            _update_memory_peaks(display_state, ram_now)
-            live.update(_build_display(pipeline_name, version, expected, display_state, start_time, pid, memory_peaks))
-            time.sleep(0.1)
+    display_state: dict = {}
+    last_signature = None
+
+    def _merged_scan(final: bool = False) -> bool:
+        """Scan log files and the snakemake log; return True if they changed.
+
+        The states are merged (into ``display_state``, counted in
+        ``counters``) only then: an idle scan keeps the previous state.
+        """
+        nonlocal current, sm_current, prev_merged, display_state, last_signature
+        current = _scan_logs(workdir_path, current, log_to_job, watcher=log_watcher)
+        sm_current = sm_parser.update(final=final)
+        # cheap fingerprint of the inputs of a scan, to detect idle periods
+        signature = log_watcher.n_reported, len(log_watcher.active), sm_parser.offset, sm_parser._inode
+        if signature == last_signature and not final:
+            return False
+        last_signature = signature
+        transitions: list = []
+        display_state, prev_merged = _merge_states(current, sm_current, prev_merged, transitions)
+        counters.update(display_state, transitions)
+        return True
+
+    sched = _Scheduler(
+        {"scan": scan_interval, "memory": memory_interval, "render": render_interval}, max_interval=max_interval
+    )
+    ram_now = 0.0
+
+    # auto_refresh is disabled: the scheduler decides when to render
+    with nullcontext() if headless else Live(console=console, auto_refresh=False, screen=False) as live:
+        while proc.poll() is None and not detached:
+            now = time.monotonic()
+            changed = False
+            if background is not None and not background.is_alive():
+                expected, log_to_job, eta_model.deps = background.result
+                background = None
+                _reclassify_logs(workdir_path, current, log_to_job, log_watcher)
+                last_signature = None  # merge the reclassified jobs at the next scan
+                resources.log_to_job = log_to_job
+                resources._cmd_cache.clear()
+                health.set_logs(log_to_job)
+                changed = True
+            elif background is not None and background.parser.partial is not expected:
+                expected = background.parser.partial
+                changed = True
+            if sched.due("scan", now):
+                scan_changed = _merged_scan()
+                sched.done("scan", now, scan_changed)
+                changed |= scan_changed
+                if journal and scan_changed:
+                    journal.record_jobs(display_state, current)
+                    journal.checkpoint(sm_parser, now)
+                if event_stream and scan_changed:
+                    event_stream.record_jobs(display_state)
+            if sched.due("memory", now):
+                ram_prev, ram_now = ram_now, resources.sample(pid)
+                memory_peaks = resources.rule_peaks()
+                if journal and resources.ended:
+                    journal.record_resources(resources, resources.ended)
+                mem_changed = abs(ram_now - ram_prev) > 0.05 * max(ram_prev, 0.1)
+                health_changes = health.check(counters)
+                if event_stream and health_changes:
+                    event_stream.record_health(health_changes)
+                mem_changed |= bool(health_changes)
+                sched.done("memory", now, mem_changed)
+                changed |= mem_changed
+            if changed:
+                sched.wake("render", now)
+            if sched.due("render", now):
+                _report()
+                if not headless:
+                    live.update(
+                        _build_display(
+                            pipeline_name,
+                            version,
+                            expected,
+                            display_state,
+                            start_time,
+                            pid,
+                            memory_peaks,
+                            ram=ram_now,
+                            counters=counters,
+                            collapse_done=collapse_done,
+                            top=top,
+                            eta_model=eta_model,
+                            health=health,
+                        ),
+                        refresh=True,
+                    )
+                sched.done("render", now, changed)
+            # sleep until the next task is due, but check for snakemake's exit every second
+            time.sleep(min(sched.wait(time.monotonic()), 1.0))
+
+        if detached:
+            _merged_scan()
+            log_watcher.close()
+            if journal:
+                journal.record_jobs(display_state, current)
+                journal.record_resources(resources)
+                journal.checkpoint(sm_parser, time.monotonic(), force=True)
+                journal.close()
+            if event_stream:
+                event_stream.record_jobs(display_state)
+                event_stream.emit("detach", pid=pid)
+                event_stream.close()
+            console.print(f"\n[bold]Detached.[/bold] snakemake (pid {pid}) is still running.")
+            return 0
 
         # final scan after process exits
-        display_state = _merged_scan()
+        _merged_scan(final=True)
+        log_watcher.close()
+        try:
+            resources.to_tsv(snakelog.parent / "rule_resources.tsv", snakelog.parent / "job_resources.tsv")
+        except OSError as err:  # pragma: no cover
+            logger.warning(f"Could not save the resource usage table: {err}")
+        log_state = current
         current = display_state  # keep reference for _mark_remaining_*
         returncode = proc.returncode
         if returncode != 0:
             current = _mark_remaining_failed(current)
         else:
             current = _mark_remaining_done(current, expected)
-        live.update(_build_display(pipeline_name, version, expected, current, start_time, None, memory_peaks))
+        if journal:
+            journal.record_jobs(current, log_state)
+            journal.record_resources(resources)
+            journal.write("end", {"returncode": returncode, "time": round(time.time(), 3)})
+            journal.close()
+        counters.update(current)
+        if history_store and not attach:
+            try:
+                history_store.record(pipeline_name, counters, input_gb)
+            except OSError as err:  # pragma: no cover
+                logger.warning(f"Could not save the job durations: {err}")
+        if event_stream:
+            event_stream.record_jobs(current)
+        _report(returncode, force=True)
+        if event_stream:
+            event_stream.emit(
+                "end",
+                returncode=returncode,
+                elapsed=round(time.time() - start_time, 3),
+                done=counters.totals[DONE],
+            )
+            event_stream.close()
+        if not headless:
+            live.update(
+                _build_display(
+                    pipeline_name,
+                    version,
+                    expected,
+                    current,
+                    start_time,
+                    None,
+                    memory_peaks,
+                    counters=counters,
+                    collapse_done=collapse_done,
+                ),
+                refresh=True,
+            )
 
     if returncode != 0:
         console.print(
@@ -747,7 +3316,7 @@ def run_monitor(
         except Exception:
             pass
     else:
-        total_done = sum(1 for rv in current.values() for j in rv.values() if j["state"] == DONE)
+        total_done = counters.totals[DONE]
         elapsed = time.time() - start_time
         from rich.panel import Panel
 
@@ -770,3 +3339,126 @@ def run_monitor(
             )
 
     return returncode
+
+
+def run_aggregate(
+    patterns,
+    watcher: str = "auto",
+    scan_interval: float = 0.5,
+    memory_interval: float = 2.0,
+    render_interval: float = 0.5,
+    max_interval: float = 10.0,
+    discover_interval: float = 30.0,
+    follow: bool = False,
+    events: str | None = None,
+    metrics: str | None = None,
+    stall_after: float = _STALL_AFTER,
+    straggler_factor: float = _STRAGGLER_FACTOR,
+) -> int:
+    """Follow several pipeline runs in a single process.
+
+    ``patterns`` are working directories or glob patterns (e.g.
+    ``/data/runs/*``), expanded again every ``discover_interval`` seconds so
+    that new runs are picked up.  No snakemake is started: the snakemake
+    processes running in the working directories are watched, as with the
+    ``attach`` option of :func:`run_monitor`, and runs that are not running
+    are shown as finished.  All the runs share the log watchers (see
+    :class:`_LogWatcherGroup`) and one scheduler, so that following 100 runs
+    costs much less than 100 monitors.
+
+    A combined table shows the progress, ETA and failures of each run; with
+    ``events`` and ``metrics``, the same is written as JSON lines and in the
+    Prometheus text format (see :func:`run_monitor`), the runs being told apart
+    by their ``workdir``.  Straggler and stalled jobs are detected as in
+    :func:`run_monitor`, from the log files only (the processes of the jobs
+    are not sampled).  When stdout is not a TTY, nothing is displayed.
+
+    Returns once every run is finished (never with ``follow``, which keeps
+    looking for new runs until interrupted): 1 if a run failed, 0 otherwise.
+    """
+    headless = not sys.stdout.isatty()
+    console = Console(stderr=headless)
+    start_time = time.time()
+    group = _LogWatcherGroup(watcher)
+    trackers: dict = {}  # workdir → _RunTracker
+    health = {"stall_after": stall_after, "straggler_factor": straggler_factor}
+    events_fh = None
+    if events:
+        events_fh = sys.stdout if events == "-" else open(events, "a", buffering=1)
+
+    def _discover() -> bool:
+        new = [workdir for workdir in _expand_runs(patterns) if workdir not in trackers]
+        pids = _find_snakemakes(new) if _HAS_PSUTIL else {w: _find_snakemake(w) for w in new}
+        for workdir in new:
+            try:
+                trackers[workdir] = _RunTracker(workdir, pids.get(workdir), group, events_fh, health)
+            except OSError as err:  # pragma: no cover
+                logger.warning(f"Cannot follow {workdir}: {err}")
+        return bool(new)
+
+    def _report() -> None:
+        if events_fh:
+            for tracker in trackers.values():
+                tracker.events.progress(tracker.counters, tracker.expected, tracker.ram)
+        if metrics:
+            try:
+                _write_prometheus_runs(metrics, [t.prometheus_samples() for t in trackers.values()])
+            except OSError as err:  # pragma: no cover
+                logger.warning(f"Could not write the metrics file: {err}")
+
+    _discover()
+    if not trackers and not follow:
+        console.print(f"[bold red]No pipeline working directory matches {' '.join(patterns)}.[/bold red]")
+        return 1
+
+    sched = _Scheduler(
+        {"scan": scan_interval, "memory": memory_interval, "render": render_interval, "discover": discover_interval},
+        max_interval=max_interval,
+    )
+    sched.done("discover", time.monotonic())
+    try:
+        with nullcontext() if headless else Live(console=console, auto_refresh=False, screen=False) as live:
+            while follow or not all(t.finished for t in trackers.values()):
+                now = time.monotonic()
+                changed = False
+                if sched.due("discover", now):
+                    found = _discover()
+                    sched.done("discover", now, found)
+                    changed |= found
+                if sched.due("scan", now):
+                    group.poll()
+                    scan_changed = False
+                    for tracker in trackers.values():
+                        scan_changed |= tracker.scan()
+                    sched.done("scan", now, scan_changed)
+                    changed |= scan_changed
+                if sched.due("memory", now):
+                    mem_changed = False
+                    for tracker in trackers.values():
+                        if not tracker.finished:
+                            mem_changed |= tracker.sample_memory()
+                    sched.done("memory", now, mem_changed)
+                    changed |= mem_changed
+                if changed:
+                    sched.wake("render", now)
+                if sched.due("render", now):
+                    _report()
+                    if not headless:
+                        live.update(_build_aggregate_display(list(trackers.values()), start_time), refresh=True)
+                    sched.done("render", now, changed)
+                time.sleep(min(sched.wait(time.monotonic()), 1.0))
+
+            _report()
+            if not headless:
+                live.update(_build_aggregate_display(list(trackers.values()), start_time), refresh=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        group.close()
+        if events_fh is not None and events_fh is not sys.stdout:
+            events_fh.close()
+
+    failed = [t.workdir for t in trackers.values() if t.finished and t.returncode != 0]
+    for workdir in failed:
+        console.print(f"[bold red]Failed:[/bold red] {workdir}")
+    return 1 if failed else 0
@@ -351,7 +351,13 @@ class ClickInputOptions:
     group_name = "Data"
     metadata = {
         "name": group_name,
-        "options": ["--input-directory", "--input-pattern", "--input-readtag", "--exclude-pattern"],
+        "options": [
+            "--input-directory",
+            "--input-pattern",
+            "--input-readtag",
+            "--exclude-pattern",
+            "--check-input-integrity",
+        ],
     }
 
     def __init__(
@@ -388,6 +394,16 @@ class ClickInputOptions:
                 show_default=True,
                 help=f"pattern for excluding input files ({exclude_pattern})",
             ),
+            click.option(
+                "--check-input-integrity",
+                "check_input_integrity",
+                is_flag=True,
+                default=False,
+                show_default=True,
+                help="""Read all input files before creating the pipeline to report truncated or
+                corrupted (gzip) files and paired FastQ files with different numbers of reads.
+                Results are cached, so checking the same files again is free.""",
+            ),
         ]
 
         if self.add_input_readtag:
@@ -591,7 +607,7 @@ class ClickSlurmOptions:
     group_name = "Slurm"
     metadata = {
         "name": group_name,
-        "options": ["--profile", "--slurm-queue", "--slurm-memory"],
+        "options": ["--profile", "--slurm-queue", "--slurm-memory", "--slurm-runtime"],
     }
 
     def __init__(self, memory="4G", queue="common", profile=None, caller=None):
@@ -613,7 +629,16 @@ class ClickSlurmOptions:
                 "slurm_memory",
                 default=self.memory,
                 show_default=True,
-                help="""Memory requested per SLURM job (e.g. 4G, 16G).""",
+                help="""Memory requested per SLURM job (e.g. 4G, 16G). It is scaled up for the
+                jobs of the samples with the largest input files.""",
+            ),
+            click.option(
+                "--slurm-runtime",
+                "slurm_runtime",
+                default=None,
+                type=click.INT,
+                help="""Time limit of the SLURM jobs in minutes (none by default). It is scaled up
+                for the jobs of the samples with the largest input files.""",
             ),
             click.option(
                 "--slurm-queue",
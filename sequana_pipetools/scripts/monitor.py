@@ -10,20 +10,168 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 
 @click.command(context_settings=CONTEXT_SETTINGS)
-@click.option("--snakefile", required=True, help="Snakemake rules file (e.g. rnaseq.rules)")
-@click.option("--profile", required=True, help="Snakemake profile directory (e.g. .sequana/profile_local)")
+@click.option("--snakefile", help="Snakemake rules file (e.g. rnaseq.rules). Required unless --runs is used")
+@click.option(
+    "--profile", help="Snakemake profile directory (e.g. .sequana/profile_local). Required unless --runs is used"
+)
 @click.option("--name", default="Pipeline", show_default=True, help="Pipeline name for display")
 @click.option("--version", default="", show_default=True, help="Pipeline version for display")
 @click.option("--workdir", default=".", show_default=True, type=click.Path(), help="Working directory")
-def main(snakefile, profile, name, version, workdir):
+@click.option(
+    "--watcher",
+    default="auto",
+    show_default=True,
+    type=click.Choice(["auto", "inotify", "polling"]),
+    help="How log files are watched. 'auto' uses inotify on local Linux file systems and polling otherwise",
+)
+@click.option("--scan-interval", default=0.5, show_default=True, help="Seconds between two scans of the logs")
+@click.option("--memory-interval", default=2.0, show_default=True, help="Seconds between two memory samplings")
+@click.option("--render-interval", default=0.5, show_default=True, help="Seconds between two refreshes of the display")
+@click.option(
+    "--max-interval",
+    default=10.0,
+    show_default=True,
+    help="Intervals double while nothing changes, up to this value (in seconds)",
+)
+@click.option(
+    "--attach",
+    is_flag=True,
+    help="Do not start snakemake: watch the one already running in the working directory (Ctrl-C detaches)",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=True,
+    show_default=True,
+    help="Resume from the journal of an interrupted or failed run (.sequana/monitor.journal)",
+)
+@click.option(
+    "--background-dryrun",
+    is_flag=True,
+    help="If the dry run is not cached, run it in the background and start the display right away",
+)
+@click.option("--collapse-done", is_flag=True, help="Show finished steps as a single row")
+@click.option(
+    "--top", default=0, show_default=True, help="Only list the N steps with the most running jobs (0: list all steps)"
+)
+@click.option(
+    "--events",
+    type=click.Path(),
+    help="Append progress events (job started/finished/failed, per-rule counts) as JSON lines to this file "
+    "('-' for stdout)",
+)
+@click.option(
+    "--metrics",
+    type=click.Path(),
+    help="Write the progress in the Prometheus text format to this file (e.g. for the node_exporter textfile "
+    "collector)",
+)
+@click.option(
+    "--runs",
+    multiple=True,
+    help="Follow the runs of these working directories or glob patterns (repeatable, e.g. --runs '/data/runs/*') "
+    "in a single combined display, instead of running a pipeline",
+)
+@click.option("--follow", is_flag=True, help="With --runs, keep looking for new runs instead of exiting")
+@click.option(
+    "--history",
+    type=click.Path(),
+    help="File of the job durations of past runs used to estimate the ETA "
+    "(default: monitor_durations.json in sequana's config directory)",
+)
+@click.option("--no-history", is_flag=True, help="Neither use nor save the job durations of past runs")
+@click.option(
+    "--stall-after",
+    default=30.0,
+    show_default=True,
+    help="Minutes without log growth nor CPU use after which a running job is reported as stalled",
+)
+@click.option(
+    "--straggler-factor",
+    default=3.0,
+    show_default=True,
+    help="Report running jobs that take this many times longer than the median job of their step",
+)
+def main(
+    snakefile,
+    profile,
+    name,
+    version,
+    workdir,
+    watcher,
+    scan_interval,
+    memory_interval,
+    render_interval,
+    max_interval,
+    attach,
+    resume,
+    background_dryrun,
+    collapse_done,
+    top,
+    events,
+    metrics,
+    runs,
+    follow,
+    history,
+    no_history,
+    stall_after,
+    straggler_factor,
+):
     """Run a Sequana pipeline with a live rich progress display.
 
     Watches logs/<rule>/<sample>.log files to track per-step progress.
-    Falls back to plain snakemake output when stdout is not a terminal.
+    When stdout is not a terminal, runs headless if --events or --metrics is
+    given, and falls back to plain snakemake output otherwise.
+
+    With --runs, the snakemake processes already running in several working
+    directories are followed at once.
     """
+    if runs:
+        from sequana_pipetools.monitor import run_aggregate
+
+        sys.exit(
+            run_aggregate(
+                runs,
+                watcher=watcher,
+                scan_interval=scan_interval,
+                memory_interval=memory_interval,
+                render_interval=render_interval,
+                max_interval=max_interval,
+                follow=follow,
+                events=events,
+                metrics=metrics,
+                stall_after=stall_after * 60,
+                straggler_factor=straggler_factor,
+            )
+        )
+    if not snakefile or not profile:
+        raise click.UsageError("--snakefile and --profile are required (unless --runs is used)")
+
     from sequana_pipetools.monitor import run_monitor
 
-    sys.exit(run_monitor(snakefile, profile, name, version, workdir))
+    sys.exit(
+        run_monitor(
+            snakefile,
+            profile,
+            name,
+            version,
+            workdir,
+            watcher=watcher,
+            scan_interval=scan_interval,
+            memory_interval=memory_interval,
+            render_interval=render_interval,
+            max_interval=max_interval,
+            attach=attach,
+            resume=resume,
+            background_dryrun=background_dryrun,
+            collapse_done=collapse_done,
+            top=top,
+            events=events,
+            metrics=metrics,
+            history=False if no_history else history or True,
+            stall_after=stall_after * 60,
+            straggler_factor=straggler_factor,
+        )
+    )
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -20,15 +20,13 @@ import sys
 from pathlib import Path
 from types import SimpleNamespace
 
-import aiohttp
 import colorlog
-from easydev import CustomConfig
 
 from sequana_pipetools import get_package_version
 from sequana_pipetools.misc import url2hash
 from sequana_pipetools.snaketools.profile import _is_v8, create_profile
 
-from .misc import Colors
+from .misc import Colors, PipetoolsException
 from .snaketools import Pipeline, SequanaConfig
 
 logger = colorlog.getLogger(__name__)
@@ -261,16 +259,21 @@ class SequanaManager:
         if not hidden_dir.exists():
             hidden_dir.mkdir()
 
-    def check_input_files(self, stop_on_error=True):
-        # Sanity checks
+    def _get_input_files(self):
         cfg = self.config.config
-
         filenames = glob.glob(cfg.input_directory + os.sep + cfg.input_pattern)
 
         # this code is just informative. Actual run is snaketools.pipeline_manager
         exclude_pattern = getattr(cfg, "exclude_pattern", None)
         if exclude_pattern:
             filenames = [x for x in filenames if exclude_pattern not in x.split("/")[-1]]
+        return filenames
+
+    def check_input_files(self, stop_on_error=True):
+        # Sanity checks
+        cfg = self.config.config
+
+        filenames = self._get_input_files()
         logger.info(
             f"\u2705 Found {len(filenames)} files matching your input  pattern ({cfg.input_pattern}) in {cfg.input_directory}"
         )
@@ -283,6 +286,39 @@ class SequanaManager:
                 logger.critical("No wildcard used in your input pattern, please use a * or ? character")
             if stop_on_error:
                 sys.exit(1)
+        elif getattr(self.options, "check_input_integrity", False):
+            self._check_input_integrity(filenames, stop_on_error)
+
+    def _check_input_integrity(self, filenames, stop_on_error=True):
+        # optional pre-flight (--check-input-integrity): read all input files to the end
+        from .integrity import check_integrity
+
+        result = check_integrity(filenames, read_tag=getattr(self.config.config, "input_readtag", None))
+        for filename, error in result["errors"].items():
+            logger.critical(f"\u2757 {filename}: {error}")
+        for file1, reads1, file2, reads2 in result["mismatches"]:
+            logger.critical(
+                f"\u2757 Paired files with different numbers of reads: {file1} ({reads1}) and {file2} ({reads2})"
+            )
+        if result["errors"] or result["mismatches"]:
+            if stop_on_error:
+                sys.exit(1)
+        else:
+            logger.info(f"\u2705 All {len(filenames)} input files could be read")
+
+    def _profile_input_files(self):
+        # size of the inputs of each sample, saved in .sequana/ and used to scale the slurm resources
+        from .input_profile import profile_inputs, save_profile
+
+        cfg = self.config.config
+        kwargs = {key: cfg[key] for key in ("sample_pattern", "extra_prefixes_to_strip") if cfg.get(key)}
+        try:
+            profile = profile_inputs(self._get_input_files(), read_tag=cfg.get("input_readtag"), **kwargs)
+        except (ValueError, OSError, PipetoolsException) as err:
+            logger.warning(f"Could not profile the input files: {err}")
+            return None
+        save_profile(profile, self.workdir)
+        return profile
 
     def teardown(self, check_schema=True, check_input_files=True):
         """Save all files required to run the pipeline and perform sanity checks
@@ -360,6 +396,9 @@ class SequanaManager:
                     "partition": "common",
                     "qos": "normal",
                     "memory": memory_value,
+                    "runtime": getattr(self.options, "slurm_runtime", None),
+                    # only the slurm profile uses the sizes of the inputs
+                    "input_profile": self._profile_input_files() if check_input_files else None,
                 }
             )
             if self.options.slurm_queue != "common":
@@ -502,6 +541,8 @@ class SequanaManager:
                 fout.write("pip not found")
 
         # General information
+        from easydev import CustomConfig
+
         configuration = CustomConfig("sequana", verbose=False)
         sequana_config_path = configuration.user_config_dir
         completion = sequana_config_path + "/pipelines/{}.sh".format(self.name)
@@ -672,6 +713,7 @@ class SequanaManager:
 
 
 def multiple_downloads(files_to_download, timeout=3600):
+    import aiohttp
     from rich.progress import (
         BarColumn,
         DownloadColumn,
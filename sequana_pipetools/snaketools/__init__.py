@@ -1,17 +1,41 @@
-from .dot_parser import DOTParser  # noqa: F401
-from .file_factory import FastQFactory, FileFactory  # noqa: F401
-from .module import Pipeline, modules, pipeline_names  # noqa: F401
-from .module_finder import ModuleFinder  # noqa: F401
-from .pipeline_manager import (  # noqa: F401
-    PipelineManager,
-    PipelineManagerDirectory,
-    get_run,
-    get_shell,
-)
-from .pipeline_utils import (  # noqa: F401
-    Makefile,
-    OnSuccessCleaner,
-    get_pipeline_statistics,
-    message,
-)
-from .sequana_config import SequanaConfig  # noqa: F401
+from importlib import import_module
+
+# The public API is imported when first used (PEP 562), see sequana_pipetools/__init__.py
+_LAZY = {
+    "DOTParser": "dot_parser",
+    "FastQFactory": "file_factory",
+    "FileFactory": "file_factory",
+    "Pipeline": "module",
+    "ModuleFinder": "module_finder",
+    "PipelineManager": "pipeline_manager",
+    "PipelineManagerDirectory": "pipeline_manager",
+    "get_run": "pipeline_manager",
+    "get_shell": "pipeline_manager",
+    "Makefile": "pipeline_utils",
+    "OnSuccessCleaner": "pipeline_utils",
+    "get_pipeline_statistics": "pipeline_utils",
+    "message": "pipeline_utils",
+    "SequanaConfig": "sequana_config",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(f"{__name__}.{_LAZY[name]}"), name)
+        globals()[name] = value
+        return value
+    # the registry of the pipelines is built when first used
+    if name in ("modules", "pipeline_names"):
+        return getattr(import_module(f"{__name__}.module"), name)
+    # submodules (e.g. sequana_pipetools.snaketools.profile)
+    if not name.startswith("__"):
+        try:
+            return import_module(f"{__name__}.{name}")
+        except ModuleNotFoundError as err:
+            if err.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | {"modules", "pipeline_names"})
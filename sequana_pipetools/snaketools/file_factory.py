@@ -10,10 +10,12 @@
 #  Documentation: http://sequana.readthedocs.io
 #  Contributors:  https://github.com/sequana/sequana/graphs/contributors
 ##############################################################################
-import glob
+import bisect
 import os
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import colorlog
 
@@ -21,6 +23,213 @@ from sequana_pipetools.misc import PipetoolsException
 
 logger = colorlog.getLogger(__name__)
 
+# realpath of many files: each one may be a round trip on network filesystems
+_REALPATH_BATCH = 500  # files resolved by a thread
+_REALPATH_THREADS = 16
+
+
+def _realpaths(filenames):
+    """Return the real paths of *filenames* (as :func:`os.path.realpath`)
+
+    The directories are resolved once, so that only the files that are
+    symbolic links need a full resolution. Large lists are processed in
+    batches by a thread pool.
+    """
+    directories = {}
+
+    def resolve(batch):
+        realpaths = []
+        for filename in batch:
+            if os.path.islink(filename):
+                realpaths.append(os.path.realpath(filename))
+                continue
+            head, tail = os.path.split(filename)
+            if head not in directories:
+                directories[head] = os.path.realpath(head)
+            realpaths.append(os.path.join(directories[head], tail))
+        return realpaths
+
+    if len(filenames) <= _REALPATH_BATCH:
+        return resolve(filenames)
+    batches = [filenames[i : i + _REALPATH_BATCH] for i in range(0, len(filenames), _REALPATH_BATCH)]
+    with ThreadPoolExecutor(_REALPATH_THREADS) as executor:
+        return [realpath for realpaths in executor.map(resolve, batches) for realpath in realpaths]
+
+
+# ── file scanner ──────────────────────────────────────────────────────────────
+#
+# glob.glob lists the directories with os.scandir but only returns names, so
+# that telling files from directories afterwards costs a stat per file. The
+# scanner below keeps the type of the DirEntry objects, compiles each glob
+# pattern once into a regular expression and only enters the directories that
+# may hold matching files.
+
+_MAGIC = re.compile(r"[*?[]")
+
+
+def _translate(component):
+    """Return the regular expression of one component of a glob pattern (as glob, ``*`` skips hidden names)"""
+    i, n = 0, len(component)
+    regex = [] if component.startswith(".") else [r"(?!\.)"]
+    while i < n:
+        c = component[i]
+        i += 1
+        if c == "*":
+            regex.append("[^/]*")
+        elif c == "?":
+            regex.append("[^/]")
+        elif c == "[":
+            j = i
+            if j < n and component[j] == "!":
+                j += 1
+            if j < n and component[j] == "]":
+                j += 1
+            while j < n and component[j] != "]":
+                j += 1
+            if j >= n:
+                regex.append(r"\[")
+            else:
+                chars = re.sub(r"([&~|])", r"\\\1", component[i:j].replace("\\", "\\\\"))
+                if chars.startswith("!"):
+                    chars = "^" + chars[1:]
+                elif chars[0] in "^[":
+                    chars = "\\" + chars
+                regex.append(f"[{chars}]")
+                i = j + 1
+        else:
+            regex.append(re.escape(c))
+    return "".join(regex)
+
+
+class _GlobPattern:
+    """A glob pattern compiled for :func:`_scan_files`
+
+    ``root`` is the leading part of the pattern without wildcards (the
+    directory to scan); the rest is compiled into ``regex``, matched against
+    the paths relative to ``root``. ``levels`` are the regular expressions of
+    the directories to enter before the first ``**``, ``hidden`` those of the
+    directory components after it (a hidden directory is only entered if one
+    of them matches it) and ``depth`` the number of directories below ``root``
+    that hold matching files (None with ``**``). As glob, a pattern ending
+    with a separator only matches directories, hence no files.
+    """
+
+    def __init__(self, pattern):
+        parts = pattern.split("/")
+        first = next((i for i, part in enumerate(parts) if _MAGIC.search(part)), len(parts))
+        self.root = "/".join(parts[:first]) or ("/" if pattern.startswith("/") else "")
+        components = [part for part in parts[first:] if part]
+
+        regex, self.levels, self.hidden, self.depth = [], [], [], len(components) - 1
+        for i, component in enumerate(components):
+            if component == "**":
+                self.depth = None
+                regex.append(r"(?:(?!\.)[^/]+/)*" if i < len(components) - 1 else r"(?:(?!\.)[^/]+/)*(?!\.)[^/]+")
+                continue
+            if i < len(components) - 1:
+                (self.levels if self.depth is not None else self.hidden).append(re.compile(_translate(component)))
+            regex.append(_translate(component) + ("/" if i < len(components) - 1 else ""))
+        self.regex = re.compile("".join(regex)) if components and not pattern.endswith("/") else None
+
+    def enter(self, name, depth):
+        """Whether the directory *name*, *depth* levels below the root, may hold matching files"""
+        if self.depth is not None:
+            return depth < self.depth and self.levels[depth].fullmatch(name) is not None
+        if depth < len(self.levels):
+            return self.levels[depth].fullmatch(name) is not None
+        return not name.startswith(".") or any(r.fullmatch(name) for r in self.hidden)
+
+
+def _scan_files(patterns, exclude=None, max_depth=None, directories=None):
+    """Return the files (not directories) matching any of the glob *patterns*
+
+    Patterns follow :func:`glob.glob` with ``recursive=True`` and are scanned
+    with :func:`os.scandir`, once per root directory whatever the number of
+    patterns. *exclude* is a compiled regular expression: matching paths are
+    skipped. With *max_depth*, directories more than *max_depth* levels below
+    the root of a pattern are not entered. If *directories* is a dict, the
+    ``[mtime_ns, number of entries]`` of each directory read is stored in it
+    (see :func:`_directories_unchanged`).
+    """
+    roots = {}
+    for pattern in patterns:
+        compiled = _GlobPattern(pattern)
+        if compiled.regex is not None:
+            roots.setdefault(compiled.root, []).append(compiled)
+
+    found = {}
+    for root, compiled in roots.items():
+        stack = [("", 0)]  # directory relative to the root, depth
+        while stack:
+            directory, depth = stack.pop()
+            path = os.path.join(root, directory) if root or directory else "."
+            try:
+                mtime = os.stat(path).st_mtime_ns if directories is not None else None
+                with os.scandir(path) as entries:
+                    entries = list(entries)
+            except OSError:
+                if directories is not None:
+                    directories[path] = [None, 0]
+                continue
+            if directories is not None:
+                directories[path] = [mtime, len(entries)]
+            for entry in entries:
+                relative = directory + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:  # pragma: no cover
+                    is_dir = False
+                if is_dir:
+                    if (max_depth is None or depth < max_depth) and any(c.enter(entry.name, depth) for c in compiled):
+                        stack.append((relative + "/", depth + 1))
+                elif any(c.regex.fullmatch(relative) for c in compiled):
+                    path = os.path.join(root, relative) if root else relative
+                    if not (exclude and exclude.search(path)):
+                        found[path] = None
+    return list(found)
+
+
+def _directory_state(path):
+    """Return the ``[mtime_ns, number of entries]`` of a directory (``[None, 0]`` if it cannot be read)"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        return [mtime, len(os.listdir(path))]
+    except OSError:
+        return [None, 0]
+
+
+def _directories_unchanged(directories, scanned):
+    """Whether the directories recorded by :func:`_scan_files` at *scanned* (ns) still have the same entries
+
+    Adding, removing or renaming an entry changes the modification time of
+    its directory. When that time is too close to the scan to be conclusive
+    (timestamps are coarse on some filesystems), the entries are counted.
+    """
+    for path, (mtime, count) in directories.items():
+        try:
+            current = os.stat(path).st_mtime_ns
+        except OSError:
+            current = None
+        if current != mtime:
+            return False
+        if mtime is not None and mtime > scanned - 2_000_000_000 and _directory_state(path) != [mtime, count]:
+            return False
+    return True
+
+
+def _cached(func, doc):
+    """Return a property computed by *func* on first access only (see :meth:`FileFactory._load`)"""
+    name = func.__name__
+
+    def getter(self):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = func(self)
+            return value
+
+    return property(getter, doc=doc)
+
 
 class FileFactory:
     """Factory to handle a set of files
@@ -59,6 +268,9 @@ class FileFactory:
         does not happen, so we can write the basenames and other attributes in variables
         once for all
 
+    .. versionchanged:: 1.6.0 attributes are computed on first access and cached.
+        Setting the :attr:`pattern` searches the files again and resets them.
+
 
     Some files may be prefixed with a common name separated by a dot. For example,
     with pacbio data you may have::
@@ -71,12 +283,14 @@ class FileFactory:
 
     """
 
-    def __init__(self, pattern, extra_prefixes_to_strip=[], sample_pattern=None, exclude_pattern=None, **kwargs):
+    def __init__(
+        self, pattern, extra_prefixes_to_strip=[], sample_pattern=None, exclude_pattern=None, max_depth=None, **kwargs
+    ):
         """.. rubric:: Constructor
 
         :param pattern: can be a filename, list of filenames, or a global
             pattern (a unix regular expression with wildcards). For instance,
-            ``*/*fastq.gz``
+            ``*/*fastq.gz``. A list may mix filenames and global patterns.
         :param extra_prefixes_to_strip: we automatically remove common prefixes.
             However, you may have extra prefixes not common to all samples
             that needs to be removed. Provide a list with extra_prefixes_to_strip
@@ -87,41 +301,96 @@ class FileFactory:
             a filename A_sorted.fastq.gz where sorted appears in all sample
             buy is not wished, use sample_pattern='{sample}_sorted.fastq.gz'
             and your sample will be only 'A'.
+        :param exclude_pattern: files whose path contains this string (or one of
+            these strings, if a list) are ignored.
+        :param max_depth: do not look for files more than max_depth directories
+            below the directory of a pattern (e.g. with ``**``).
 
         """
-        self.pattern = pattern
         self.extra_prefixes_to_strip = extra_prefixes_to_strip
         self.sample_pattern = sample_pattern
         self.exclude_pattern = exclude_pattern
+        self.max_depth = max_depth
+        self.pattern = pattern
 
-        try:
-            if os.path.exists(pattern):
-                self._glob = [pattern]
-            else:
-                self._glob = glob.glob(pattern, recursive=True)
-        except TypeError:
-            # Error if pattern is a list of file
-            for filename in pattern:
-                if not os.path.exists(filename):  # pragma: no cover
+    def _get_pattern(self):
+        return self._pattern
+
+    def _set_pattern(self, pattern):
+        self._pattern = pattern
+        self._load()
+
+    pattern = property(
+        _get_pattern, _set_pattern, doc="the pattern or list of files; setting it searches the files again"
+    )
+
+    def _load(self):
+        # search the files of the pattern; the derived attributes are computed again on demand
+        self._cache = {}
+        self._scanned = time.time_ns()
+        self._directories = {}  # directories read: see unchanged()
+        filenames, patterns = [], []
+        if isinstance(self._pattern, (str, os.PathLike)):
+            pattern = os.fspath(self._pattern)
+            (filenames if os.path.exists(pattern) else patterns).append(pattern)
+        else:
+            for filename in map(os.fspath, self._pattern):
+                if os.path.exists(filename):
+                    filenames.append(filename)
+                elif _MAGIC.search(filename):
+                    patterns.append(filename)
+                else:  # pragma: no cover
                     raise FileNotFoundError(f"This file {filename} does not exist")
-            self._glob = pattern[:]
-
-        # remove directories if they exist
-        self._glob = [x for x in self._glob if not os.path.isdir(x)]
 
         # remove candidates that have the exclude pattern
-        if self.exclude_pattern:  # pragma: no cover
-            self._glob = [x for x in self._glob if not self.exclude_pattern in x]
+        exclude = self.exclude_pattern
+        if exclude:
+            exclude = [exclude] if isinstance(exclude, str) else exclude
+            exclude = re.compile("|".join(re.escape(x) for x in exclude))
+
+        # remove directories if they exist (the scanner only returns files)
+        self._glob = [x for x in filenames if not os.path.isdir(x) and not (exclude and exclude.search(x))]
+        for directory in {os.path.dirname(x) or "." for x in filenames}:
+            self._directories[directory] = _directory_state(directory)
+        if patterns:
+            found = set(self._glob)
+            files = _scan_files(patterns, exclude, self.max_depth, self._directories)
+            self._glob += [x for x in files if x not in found]
+
+    def unchanged(self):
+        """Whether the directories searched for the files still have the same entries (see :meth:`get_state`)"""
+        return _directories_unchanged(self._directories, self._scanned)
+
+    def get_state(self):
+        """Return the files found and the attributes computed so far, as a JSON-serialisable dict
+
+        The factory can be restored with :meth:`from_state` without searching
+        the files again, e.g. from a cache validated with :meth:`unchanged`.
+        """
+        return {name: value for name, value in vars(self).items() if name not in self._DERIVED}
+
+    @classmethod
+    def from_state(cls, state):
+        """Return the factory saved by :meth:`get_state`"""
+        ff = cls.__new__(cls)
+        vars(ff).update(state)
+        ff._restore()
+        return ff
+
+    _DERIVED = ()  # attributes rebuilt by _restore()
+
+    def _restore(self):
+        pass
 
     def _get_realpaths(self):
-        return [os.path.realpath(filename) for filename in self._glob]
+        return _realpaths(self._glob)
 
-    realpaths = property(_get_realpaths, doc="the full path (e.g., /home/user/readme.txt)")
+    realpaths = _cached(_get_realpaths, doc="the full path (e.g., /home/user/readme.txt)")
 
     def _get_basenames(self):
         return [os.path.split(filename)[1] for filename in self._glob]
 
-    basenames = property(_get_basenames, doc="the basename without the path (e.g. readme.txt)")
+    basenames = _cached(_get_basenames, doc="the basename without the path (e.g. readme.txt)")
 
     def _get_filenames(self):
         # make sure there is a '.' at the end
@@ -177,17 +446,17 @@ class FileFactory:
 
         return filenames
 
-    filenames = property(_get_filenames, doc="get basename without extension (e.g., readme)")
+    filenames = _cached(_get_filenames, doc="get basename without extension (e.g., readme)")
 
     def _get_extensions(self):
         return [os.path.splitext(filename)[1] for filename in self._glob]
 
-    extensions = property(_get_extensions, doc="get final extension    ")
+    extensions = _cached(_get_extensions, doc="get final extension    ")
 
     def _get_all_extensions(self):
         return [basename.split(".", 1)[1] if "." in basename else "" for basename in self.basenames]
 
-    all_extensions = property(_get_all_extensions, doc=" get all trailing extensions")
+    all_extensions = _cached(_get_all_extensions, doc=" get all trailing extensions")
 
     def __len__(self):
         return len(self.filenames)
@@ -252,6 +521,7 @@ class FastQFactory(FileFactory):
         extra_prefixes_to_strip=[],
         sample_pattern=None,
         exclude_pattern=None,
+        max_depth=None,
         **kwargs,
     ):
         r""".. rubric:: Constructor
@@ -271,20 +541,37 @@ class FastQFactory(FileFactory):
             a filename A_sorted.fastq.gz where sorted appears in all sample
             buy is not wished, use sample_pattern='{sample}_sorted.fastq.gz'
             and your sample will be only 'A'.
+        :param exclude_pattern: see :class:`FileFactory`
+        :param max_depth: see :class:`FileFactory`
         """
+        self.read_tag = read_tag
+        if self.read_tag is None or self.read_tag.strip() == "":
+            self.read_tag = ""
+
+        # check if tag is informative
+        if self.read_tag != "":
+            if "[12]" not in self.read_tag:
+                msg = "the read_tag parameter must contain '[12]' to differentiate read 1 and 2."
+                logger.error(msg)
+                raise ValueError(msg)
+            elif self.read_tag == "[12]":
+                msg = "The read_tag parameter must be more informative than just have [12]"
+                logger.error(msg)
+                raise ValueError(msg)
+
         super(FastQFactory, self).__init__(
             pattern,
             extra_prefixes_to_strip=extra_prefixes_to_strip,
             sample_pattern=sample_pattern,
             exclude_pattern=exclude_pattern,
+            max_depth=max_depth,
         )
 
-        self.read_tag = read_tag
+    def _load(self):
+        super()._load()
+
         # Filter out reads that do not have the read_tag
         # https://github.com/sequana/sequana/issues/480
-        if self.read_tag is None or self.read_tag.strip() == "":
-            self.read_tag = ""
-
         if self.read_tag:
             remaining = [filename for filename in self._glob if re.search(self.read_tag, os.path.basename(filename))]
             if len(remaining) < len(self._glob):
@@ -293,26 +580,12 @@ class FastQFactory(FileFactory):
 
             self._glob = remaining
 
-        # check if tag is informative
-        if self.read_tag != "":
-            if "[12]" not in self.read_tag:
-                msg = "the read_tag parameter must contain '[12]' to differentiate read 1 and 2."
-                logger.error(msg)
-                raise ValueError(msg)
-            elif self.read_tag == "[12]":
-                msg = "The read_tag parameter must be more informative than just have [12]"
-                logger.error(msg)
-                raise ValueError(msg)
-
             if len(self.filenames) == 0:
                 msg = "No files found with the requested pattern ({}) and readtag ({}). If your data is not paired, set the readtag to empty string"
-                msg = msg.format(pattern, self.read_tag)
+                msg = msg.format(self.pattern, self.read_tag)
                 logger.error(msg)
                 raise ValueError(msg)
 
-        # save pattern and read tag
-        self.pattern = pattern
-
         # If a user uses a . it should be taken into account hence the regex
         # that follows
         if self.read_tag:
@@ -328,6 +601,41 @@ class FastQFactory(FileFactory):
 
         logger.info("Found %s projects/samples " % len(self.tags))
 
+        self._restore()
+
+    _DERIVED = ("_index", "_tag_set")
+
+    def _restore(self):
+        # files of each (tag, read), built once for get_file1/get_file2
+        self._index = self._build_index()
+        self._tag_set = set(self.tags)
+
+    def _build_index(self):
+        """Return the candidate files of each tag and read as ``{(tag, '1'): [realpath, ...], ...}``
+
+        With a read tag, the candidates of a tag are the files whose basename
+        contains the read tag preceded by the tag. Without read tag, they are
+        the files whose basename starts with the tag (for read 1 and 2 alike).
+        """
+        entries = list(zip(self.basenames, self.realpaths))
+        index = {}
+        if self.read_tag:
+            for r in "12":
+                read_tag = self.read_tag.replace("[12]", r)
+                for basename, realpath in entries:
+                    if read_tag in basename:
+                        index.setdefault((basename.split(read_tag)[0], r), []).append(realpath)
+        else:
+            # the basenames starting with a tag are contiguous once sorted
+            entries.sort()
+            basenames = [basename for basename, _ in entries]
+            for tag in self.tags:
+                start = end = bisect.bisect_left(basenames, tag)
+                while end < len(basenames) and basenames[end].startswith(tag):
+                    end += 1
+                index[(tag, "1")] = index[(tag, "2")] = [realpath for _, realpath in entries[start:end]]
+        return index
+
     def _get_file(self, tag, r):
         if tag is None:
             if len(self.tags) == 1:
@@ -335,25 +643,14 @@ class FastQFactory(FileFactory):
             elif len(self.tags) > 1:
                 raise ValueError("Ambiguous tag. You must provide one " "(sequana.FastQFactory)")
         else:
-            if tag not in self.tags:
+            if tag not in self._tag_set:
                 raise ValueError(f"Invalid tag '{tag}'. Valid tags are: {self.tags}")
 
         # retrieve file of tag
-        if self.read_tag:
-            read_tag = self.read_tag.replace("[12]", r)
-
-            # changed in v0.8.7 tricky hanhling of sample names
-            # https://github.com/sequana/sequana/issues/576
-            candidates = [
-                realpath
-                for basename, realpath in zip(self.basenames, self.realpaths)
-                if read_tag in basename and tag == basename.split(read_tag)[0]
-            ]
-        else:
-            read_tag = ""
-            candidates = [
-                realpath for basename, realpath in zip(self.basenames, self.realpaths) if basename.startswith(tag)
-            ]
+        # changed in v0.8.7 tricky hanhling of sample names
+        # https://github.com/sequana/sequana/issues/576
+        read_tag = self.read_tag.replace("[12]", r) if self.read_tag else ""
+        candidates = self._index.get((tag, r), [])
 
         if len(candidates) == 0 and r == "2":
             # assuming there is no R2
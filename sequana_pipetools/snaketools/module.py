@@ -12,8 +12,10 @@
 ##############################################################################
 import hashlib
 import importlib.metadata
+import json
 import os
 import shutil
+from pathlib import Path
 
 import colorlog
 
@@ -21,6 +23,12 @@ from .module_finder import ModuleFinder
 
 logger = colorlog.getLogger(__name__)
 
+# on-disk index of the installed pipelines (see _get_modules)
+_INDEX_NAME = "pipelines_index.json"
+
+# the installed pipelines, {name: snakefile} (see _get_modules)
+_modules = None
+
 
 def _md5(fname, chunk=65536):
     hash_md5 = hashlib.md5()
@@ -298,8 +306,77 @@ def _get_modules_snakefiles():
             yield name, filename
 
 
-# dictionary with module names as keys and fullpath to the Snakefile as values
-modules = {name: filename for name, filename in _get_modules_snakefiles()}
+def _index_path():
+    """Return the location of the index of the pipelines (sequana's user config directory).
+
+    Unlike easydev.CustomConfig, the directory is not created (nor reported on
+    stdout) here: reading the pipeline registry has no side effect.
+    """
+    from easydev import appdirs
+
+    return Path(appdirs.AppDirs("sequana").user_config_dir) / _INDEX_NAME
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
 
-# list of pipeline names found in the list of modules
-pipeline_names = [m for m in modules]
+def _get_modules():
+    """Return a dictionary with the names of the installed pipelines as keys and their Snakefile as values
+
+    Finding the pipelines means scanning the sequana_pipelines namespace and
+    probing the Snakefile names of each pipeline. The result is kept in memory
+    and in an index on disk, used as long as the directories of the namespace
+    and of the pipelines are not modified (a pipeline is installed or removed,
+    a Snakefile is renamed…).
+    """
+    global _modules
+    if _modules is not None:
+        return _modules
+
+    from sequana_pipetools import get_package_version
+
+    try:
+        import sequana_pipelines
+
+        namespace = list(sequana_pipelines.__path__)
+    except ModuleNotFoundError:  # pragma: no cover
+        namespace = []
+    key = {"namespace": namespace, "version": get_package_version("sequana_pipetools")}
+
+    index_path = _index_path()
+    try:
+        with open(index_path) as fin:
+            index = json.load(fin)
+        if index["key"] == key and all(_mtime(path) == mtime for path, mtime in index["mtimes"].items()):
+            _modules = index["modules"]
+            return _modules
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    _modules = dict(_get_modules_snakefiles())
+    paths = namespace + list(ModuleFinder()._paths.values())
+    index = {"key": key, "mtimes": {path: _mtime(path) for path in paths}, "modules": _modules}
+    tmp = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(index))
+        os.replace(tmp, index_path)
+    except OSError as err:  # pragma: no cover
+        logger.debug(f"Could not save the index of the pipelines {index_path}: {err}")
+        tmp.unlink(missing_ok=True)
+    return _modules
+
+
+def __getattr__(name):
+    # modules: dictionary with module names as keys and fullpath to the Snakefile as values
+    # pipeline_names: list of pipeline names found in the list of modules
+    # both are built when first used, not when sequana_pipetools is imported
+    if name == "modules":
+        return _get_modules()
+    if name == "pipeline_names":
+        return list(_get_modules())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -11,6 +11,7 @@
 #  Contributors:  https://github.com/sequana/sequana/graphs/contributors
 ##############################################################################
 import importlib
+import json
 import os
 import shutil
 
@@ -36,6 +37,9 @@ CITATION_MESSAGE = (
 
 logger = colorlog.getLogger(__name__)
 
+# input files found by the PipelineManager, reused by the next parses of the Snakefile
+_INPUT_CACHE = os.path.join(".sequana", "input_files.json")
+
 
 def get_shell(tool_path: str, version: str) -> str:
     """Return a shell command string from the sequana_wrappers shell library.
@@ -549,6 +553,7 @@ class PipelineManager(PipelineManagerBase):
 
         if not self.ff.filenames:
             self.error(f"No files were found with pattern {glob_dir} and read tag {readtag}.")
+        self._save_factory()
 
         # finally, keep track of the config file
         self.config = cfg.config
@@ -561,15 +566,65 @@ class PipelineManager(PipelineManagerBase):
 
     paired = property(_get_paired)
 
-    def _get_fastq_files(self, glob_dir, read_tag):
-        """ """
-        self.ff = FastQFactory(
-            glob_dir,
-            read_tag=read_tag,
+    def _get_factory(self, factory, pattern, **kwargs):
+        """Return the *factory* of the input files, restored from the cache in .sequana/ if still valid
+
+        The Snakefile, hence the manager, is parsed again by every snakemake
+        command (dry run, run, unlock, cluster jobs…). The files found are
+        saved in .sequana/input_files.json (when the directory exists) and
+        reused as long as the factory arguments are the same and the
+        directories searched have the same entries (see
+        :meth:`FileFactory.unchanged`).
+        """
+        kwargs.update(
             extra_prefixes_to_strip=self.extra_prefixes_to_strip,
             sample_pattern=self.sample_pattern,
             exclude_pattern=self.exclude_pattern,
         )
+        key = {
+            "factory": factory.__name__,
+            "pattern": pattern,
+            "cwd": os.getcwd(),
+            "version": get_package_version("sequana_pipetools"),
+            **kwargs,
+        }
+        try:
+            # compared with the key read back from JSON (tuples become lists…)
+            key = json.loads(json.dumps(key))
+        except (TypeError, ValueError):  # not serializable: no cache
+            return factory(pattern, **kwargs)
+        try:
+            with open(_INPUT_CACHE) as fin:
+                cache = json.load(fin)
+            if cache["key"] == key:
+                ff = factory.from_state(cache["state"])
+                if ff.unchanged():
+                    logger.debug(f"Using the input files found previously ({_INPUT_CACHE})")
+                    return ff
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        ff = factory(pattern, **kwargs)
+        self._input_cache = key
+        return ff
+
+    def _save_factory(self):
+        # see _get_factory
+        key = getattr(self, "_input_cache", None)
+        if key is None or not os.path.isdir(os.path.dirname(_INPUT_CACHE)):
+            return
+        tmp = f"{_INPUT_CACHE}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as fout:
+                json.dump({"key": key, "state": self.ff.get_state()}, fout)
+            os.replace(tmp, _INPUT_CACHE)
+        except (OSError, TypeError, ValueError) as err:  # pragma: no cover
+            logger.debug(f"Could not cache the input files: {err}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _get_fastq_files(self, glob_dir, read_tag):
+        """ """
+        self.ff = self._get_factory(FastQFactory, glob_dir, read_tag=read_tag)
 
         # check whether it is paired or not. This is just to raise an error when
         # there is inconsistent mix of R1 and R2
@@ -577,12 +632,10 @@ class PipelineManager(PipelineManagerBase):
 
         # samples contains a correspondance between the sample name and the
         # real filename location.
-        self.samples = {
-            tag: [self.ff.get_file1(tag), self.ff.get_file2(tag)]
-            if self.ff.get_file2(tag)
-            else [self.ff.get_file1(tag)]
-            for tag in self.ff.tags
-        }
+        self.samples = {}
+        for tag in self.ff.tags:
+            file1, file2 = self.ff.get_file1(tag), self.ff.get_file2(tag)
+            self.samples[tag] = [file1, file2] if file2 else [file1]
 
         if len(self.ff.tags) == 0:
             raise ValueError(
@@ -592,12 +645,7 @@ class PipelineManager(PipelineManagerBase):
             )
 
     def _get_any_files(self, pattern):
-        self.ff = FileFactory(
-            pattern,
-            extra_prefixes_to_strip=self.extra_prefixes_to_strip,
-            sample_pattern=self.sample_pattern,
-            exclude_pattern=self.exclude_pattern,
-        )
+        self.ff = self._get_factory(FileFactory, pattern)
 
         # samples contains a correspondance between the sample name and the
         # real filename location.
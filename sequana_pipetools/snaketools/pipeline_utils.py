@@ -16,7 +16,7 @@ import sys
 
 import colorlog
 
-from .module import Pipeline, modules
+from .module import Pipeline, _get_modules
 
 logger = colorlog.getLogger(__name__)
 
@@ -121,7 +121,7 @@ def get_pipeline_statistics():
         df.sum(axis=0).plot(kind="barh")
 
     """
-    pipelines = sorted(modules)
+    pipelines = sorted(_get_modules())
     # FIXME should be in pyproject as extra
     import numpy as np
     import pandas as pd
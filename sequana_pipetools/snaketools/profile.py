@@ -8,12 +8,18 @@ try:
 except ImportError:  # pragma: no cover
     import importlib_resources as resources
 
+import math
+import re
+import statistics
 from pathlib import Path
 
 import colorlog
 
 logger = colorlog.getLogger(__name__)
 
+# maximum factor applied to the memory/runtime of the jobs of the largest samples
+_MAX_SCALE = 4.0
+
 
 def _snakemake_version():
     """Return the installed snakemake version as a tuple (major, minor, patch)."""
@@ -76,8 +82,53 @@ def _build_local_config_v8(**kwargs) -> dict:
     return config
 
 
+def _memory_mb(memory):
+    """Return a slurm memory value (e.g. 4G, 4000) in MB, or None if it cannot be parsed."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*", str(memory), re.IGNORECASE)
+    if not match:
+        return None
+    units = {"K": 1 / 1024, "": 1, "M": 1, "G": 1024, "T": 1024**2}
+    return float(match.group(1)) * units[match.group(2).upper()]
+
+
+def _sample_scales(input_profile) -> dict:
+    """Return the scale of the samples larger than the median sample (their relative input size, up to _MAX_SCALE)."""
+    if not input_profile:
+        return {}
+    sizes = {name: sample["size"] for name, sample in input_profile.get("samples", {}).items()}
+    median = statistics.median(sizes.values()) if sizes else 0
+    if not median:
+        return {}
+    return {name: min(size / median, _MAX_SCALE) for name, size in sizes.items() if size > median}
+
+
+def _per_sample(default, values: dict):
+    """Return a resource evaluated by snakemake for each job: the value of the job's sample, if any, else *default*.
+
+    No braces in the expression: snakemake fails to report that it is not a size.
+    """
+    if not values:
+        return default
+    return f"dict({sorted(values.items())!r}).get(getattr(wildcards, 'sample', None), {default!r})"
+
+
 def _build_slurm_config_v8(**kwargs) -> dict:
-    """Build a snakemake v8 slurm profile config dict using cluster-generic plugin."""
+    """Build a snakemake v8 slurm profile config dict using cluster-generic plugin.
+
+    With an *input_profile* (see :mod:`sequana_pipetools.input_profile`), the
+    memory (in MB, and *runtime* in minutes, if set) of the jobs of a sample
+    larger than the median sample is scaled by their size ratio (up to
+    :data:`_MAX_SCALE`). Jobs without a *sample* wildcard use the defaults.
+    """
+    scales = _sample_scales(kwargs.get("input_profile"))
+    memory = kwargs["memory"]
+    base = _memory_mb(memory)
+    if base:
+        memory = _per_sample(memory, {name: math.ceil(base * scale) for name, scale in scales.items()})
+    runtime = kwargs.get("runtime")
+    if runtime:
+        runtime = _per_sample(int(runtime), {name: math.ceil(int(runtime) * scale) for name, scale in scales.items()})
+
     submit_cmd = (
         "mkdir -p logs/{rule} && "
         "sbatch "
@@ -89,13 +140,15 @@ def _build_slurm_config_v8(**kwargs) -> dict:
         "--output=logs/{rule}/{rule}-{wildcards}-slurm-%j.out "
         '$(bash -c \'[[ ! -z "{resources.gres}" ]] && echo "--gres={resources.gres}"\')'
     )
+    if runtime:
+        submit_cmd += " --time={resources.runtime}"
     config = {
         "executor": "cluster-generic",
         "cluster-generic-submit-cmd": submit_cmd,
         "default-resources": {
             "partition": kwargs["partition"],
             "qos": kwargs["qos"],
-            "mem": kwargs["memory"],
+            "mem": memory,
             "gres": "",
         },
         "keep-going": bool(kwargs.get("keep_going", False)),
@@ -104,6 +157,8 @@ def _build_slurm_config_v8(**kwargs) -> dict:
         "wrapper-prefix": kwargs["wrappers"],
         "forceall": bool(kwargs.get("forceall", False)),
     }
+    if runtime:
+        config["default-resources"]["runtime"] = runtime
     if kwargs.get("use_apptainer"):
         config["software-deployment-method"] = ["apptainer"]
         if kwargs.get("apptainer_args"):
@@ -10,17 +10,97 @@
 #  Documentation: http://sequana.readthedocs.io
 #  Contributors:  https://github.com/sequana/sequana/graphs/contributors
 ##############################################################################
+import functools
 import os
-import tempfile
 import warnings
 from types import SimpleNamespace
 
+import pykwalify
 import ruamel.yaml
 from pykwalify.core import Core, CoreError, SchemaError
+from ruamel.yaml.nodes import ScalarNode, SequenceNode
+
+# the attributes of a SimpleNamespace (bypasses _Namespace.__dict__)
+_attributes = SimpleNamespace.__dict__["__dict__"].__get__
 
 
 class _Namespace(SimpleNamespace):
-    """SimpleNamespace extended with dict-like access helpers."""
+    """SimpleNamespace extended with dict-like access helpers.
+
+    A namespace can also be a lazy view of a mapping (see :func:`_dict_to_ns`).
+    The values are read from the mapping when first accessed (nested mappings
+    becoming views themselves) and kept in the namespace, so that later
+    accesses are plain attribute lookups. The view reads a snapshot of the
+    mapping: a shallow copy of each dict, taken when its view is created, and
+    a plain dict copy of a namespace (see :func:`_ns_to_dict`), so that the
+    view and its source can be modified independently.
+    """
+
+    # (mapping, cleanup) of a view; removed once all values were read
+    __slots__ = ("_lazy",)
+
+    @classmethod
+    def _view(cls, mapping, cleanup=None):
+        ns = cls()
+        ns._lazy = (_ns_to_dict(mapping) if isinstance(mapping, SimpleNamespace) else dict(mapping), cleanup)
+        return ns
+
+    @staticmethod
+    def _read(key, value, cleanup):
+        if isinstance(value, (dict, SimpleNamespace)):
+            return _Namespace._view(value, cleanup)
+        return cleanup(key, value) if cleanup else value
+
+    def __getattr__(self, key):
+        # only called for the values not read yet
+        try:
+            if key == "_lazy":
+                raise AttributeError
+            mapping, cleanup = self._lazy
+            value = mapping[key]
+        except (AttributeError, KeyError):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {key!r}") from None
+        value = _attributes(self)[key] = self._read(key, value, cleanup)
+        return value
+
+    def _fill(self):
+        # read all values, keeping the order of the mapping (new attributes last)
+        try:
+            mapping, cleanup = self._lazy
+        except AttributeError:
+            return
+        SimpleNamespace.__delattr__(self, "_lazy")
+        attributes = _attributes(self)
+        values = {
+            key: attributes[key] if key in attributes else self._read(key, value, cleanup)
+            for key, value in mapping.items()
+        }
+        values.update(attributes)
+        attributes.clear()
+        attributes.update(values)
+
+    @property
+    def __dict__(self):
+        self._fill()
+        return _attributes(self)
+
+    def __delattr__(self, key):
+        self._fill()
+        super().__delattr__(key)
+
+    def __eq__(self, other):
+        self._fill()
+        if isinstance(other, _Namespace):
+            other._fill()
+        return super().__eq__(other)
+
+    def __repr__(self):
+        self._fill()
+        return super().__repr__()
+
+    def __reduce__(self):
+        self._fill()
+        return super().__reduce__()
 
     def get(self, key, default=None):
         return getattr(self, key, default)
@@ -52,10 +132,14 @@ import colorlog
 logger = colorlog.getLogger(__name__)
 
 
-def _dict_to_ns(d):
-    """Recursively convert a dict to a _Namespace."""
-    if isinstance(d, dict):
-        return _Namespace(**{k: _dict_to_ns(v) for k, v in d.items()})
+def _dict_to_ns(d, cleanup=None):
+    """Return a lazy _Namespace view of a snapshot of a dict or namespace (other values are returned as is)
+
+    :param cleanup: function called with the key and the value of the
+        non-mapping values when they are read from the dict
+    """
+    if isinstance(d, (dict, SimpleNamespace)):
+        return _Namespace._view(d, cleanup)
     return d
 
 
@@ -68,6 +152,123 @@ def _ns_to_dict(d):
     return d
 
 
+def _cleanup(key, value):
+    """Return a value of the config as exposed by SequanaConfig
+
+    None is replaced by an empty string, strings are stripped and the ~ (tilde)
+    of the paths to directories and files is expanded.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        value = value.strip()
+        # https://github.com/sequana/sequana/issues/486
+        if isinstance(key, str) and key.endswith(("_directory", "_file")) and value.startswith("~/"):
+            value = os.path.expanduser(value)
+    return value
+
+
+# YAML code of the configs created from another config, built when first used
+_FROM_CONFIG = object()
+
+
+@functools.lru_cache(maxsize=None)
+def _pyyaml():
+    """Return the PyYAML module with the resolver and constructor of yaml.safe_load"""
+    import yaml
+
+    return yaml, yaml.resolver.Resolver(), yaml.constructor.SafeConstructor()
+
+
+def _yaml_to_data(node, resolver, memo=None):
+    """Return the data of a YAML *node* composed by ruamel.yaml, as read by yaml.safe_load
+
+    The config file is parsed once: the round-trip tree (that keeps the
+    comments) and the data are both built from its nodes. ruamel.yaml follows
+    YAML 1.2 whereas the data are read as PyYAML does, following YAML 1.1 (yes
+    and no are booleans, 010 is an octal integer...): the implicit tag of the
+    plain scalars (as resolved by the ruamel.yaml *resolver*) is resolved again
+    by PyYAML. Merge keys (<<) are flattened.
+    """
+    memo = {} if memo is None else memo
+    if id(node) in memo:  # anchors
+        return memo[id(node)]
+
+    if isinstance(node, ScalarNode):
+        yaml, pyyaml_resolver, constructor = _pyyaml()
+        tag = str(node.tag)
+        if node.style is None and tag == str(resolver.resolve(ScalarNode, node.value, (True, False))):
+            tag = pyyaml_resolver.resolve(yaml.ScalarNode, node.value, (True, False))
+        if tag == "tag:yaml.org,2002:str":
+            return node.value
+        construct = constructor.yaml_constructors.get(tag) or constructor.yaml_constructors[None]
+        return construct(constructor, yaml.ScalarNode(tag, node.value, style=node.style))
+
+    if isinstance(node, SequenceNode):
+        data = memo[id(node)] = []
+        data.extend(_yaml_to_data(x, resolver, memo) for x in node.value)
+        return data
+
+    data = memo[id(node)] = {}
+    merged = {}
+    for key, value in node.value:
+        if str(key.tag) == "tag:yaml.org,2002:merge":
+            # the first mappings merged have precedence
+            for mapping in (value.value if isinstance(value, SequenceNode) else [value])[::-1]:
+                merged.update(_yaml_to_data(mapping, resolver, memo))
+        else:
+            data[_yaml_to_data(key, resolver, memo)] = _yaml_to_data(value, resolver, memo)
+    if merged:
+        items = {**merged, **data}
+        data.clear()
+        data.update(items)
+    return data
+
+
+class _SchemaValidator(Core):
+    """A pykwalify Core whose rules are built from the schema once and reused by each validation"""
+
+    def _start_validate(self, value=None):
+        if self.root_rule is None:
+            partials = [key.split(";", 1)[1] for key in self.schema if key.startswith("schema;")]
+            super()._start_validate(value)
+            self._partial_schemas = {name: pykwalify.partial_schemas[name] for name in partials}
+        else:
+            # partial schemas are global: another schema may have replaced them
+            pykwalify.partial_schemas.update(self._partial_schemas)
+            self.errors = []
+            self._validate(value, self.root_rule, "", [])
+
+
+# validators of the schema files already read: {path: (mtime, validator)}
+_SCHEMA_VALIDATORS = {}
+
+
+def _get_schema_validator(schemafile):
+    """Return the validator of *schemafile* (cached as long as the file is not modified)"""
+    path = os.path.abspath(schemafile)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None  # pykwalify reports the missing file
+    cached = _SCHEMA_VALIDATORS.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    # add custom extensions
+    try:
+        ext_name = resources.files("sequana_pipetools.resources").joinpath("ext.py")
+        extensions = [str(ext_name)]
+    except AttributeError:  # pragma: no cover
+        with resources.path("sequana_pipetools.resources", "ext.py") as ext_name:
+            extensions = [str(ext_name)]
+
+    # the data are given to each validation
+    validator = _SchemaValidator(source_data={}, schema_files=[path], extensions=extensions)
+    _SCHEMA_VALIDATORS[path] = (mtime, validator)
+    return validator
+
+
 class SequanaConfig:
     """Reads YAML config file and ease access to its contents
 
@@ -107,26 +308,34 @@ class SequanaConfig:
         # if yaml dictionary not updated correctly.
         if data:
             if isinstance(data, dict):
-                self.config = _dict_to_ns(data)
+                config = data
                 self._yaml_code = ruamel.yaml.comments.CommentedMap(data.copy())
             elif hasattr(data, "config"):
-                d = _ns_to_dict(data.config)
-                self.config = _dict_to_ns(d)
-                self._yaml_code = ruamel.yaml.comments.CommentedMap(d)
+                config = data.config
+                self._yaml_code = _FROM_CONFIG
             elif isinstance(data, SimpleNamespace):
-                d = _ns_to_dict(data)
-                self.config = _dict_to_ns(d)
-                self._yaml_code = ruamel.yaml.comments.CommentedMap(d)
+                config = data
+                self._yaml_code = _FROM_CONFIG
             else:
                 # populate self._yaml_code from a YAML/JSON filename
                 config = self._read_file(data)
-                self.config = _dict_to_ns(config)
         else:
-            self.config = _Namespace()
+            config = {}
             self._yaml_code = ruamel.yaml.comments.CommentedMap()
 
-        # remove templates and None->""
-        self._recursive_cleanup(self.config)
+        # lazy view of the data (a snapshot of the other config, if any);
+        # templates are removed and None->"" when the values are read
+        self.config = _dict_to_ns(config, _cleanup)
+
+    @property
+    def _yaml_code(self):
+        if self._yaml is _FROM_CONFIG:
+            self._yaml = ruamel.yaml.comments.CommentedMap(_ns_to_dict(self.config))
+        return self._yaml
+
+    @_yaml_code.setter
+    def _yaml_code(self, value):
+        self._yaml = value
 
     def _read_file(self, data):
         """Read yaml"""
@@ -134,17 +343,19 @@ class SequanaConfig:
             logger.warning("You should use a YAML file with .yaml or .yml extension")
 
         if os.path.exists(data):
-            yaml = ruamel.yaml.YAML()
             with open(data, "r") as fh:
                 thisdata = fh.read()
-                self._yaml_code = yaml.load(thisdata)
-
-            # import the Python yaml module to avoid ruamel.yaml ordereddict and
-            # other structures. We only want the data
-            with open(data, "r") as fh:
-                import yaml as _yaml
 
-                config = _yaml.safe_load(fh)
+            # parse once; the data (without ruamel.yaml ordereddict and other
+            # structures) must be built before the round-trip tree, whose
+            # construction flattens the merge keys of the nodes
+            yaml = ruamel.yaml.YAML()
+            node = yaml.compose(thisdata)
+            if node is None:
+                self._yaml_code = None
+                return None
+            config = _yaml_to_data(node, yaml.resolver)
+            self._yaml_code = yaml.constructor.construct_document(node)
             return config
         else:
             raise FileNotFoundError(f"input string must be an existing file {data}")
@@ -199,59 +410,28 @@ class SequanaConfig:
     def _update_yaml(self):
         self._recursive_update(self._yaml_code, self.config)
 
-    def _recursive_cleanup(self, d):
-        # expand the tilde (see https://github.com/sequana/sequana/issues/486)
-        # remove the %() templates
-        for key, value in d.items():
-            try:
-                self._recursive_cleanup(value)
-            except AttributeError:
-                if value is None:
-                    setattr(d, key, "")
-                elif isinstance(value, str):
-                    value = value.strip()
-                    setattr(d, key, value)
-
-                    # https://github.com/sequana/sequana/issues/486
-                    if key.endswith("_directory") and value.startswith("~/"):
-                        setattr(d, key, os.path.expanduser(value))
-                    if key.endswith("_file") and value.startswith("~/"):
-                        setattr(d, key, os.path.expanduser(value))
-
-        self._update_yaml()
-
     def check_config_with_schema(self, schemafile):
         """Check the config file with respect to a schema file
 
         Sequana pipelines should have a schema file in the Module.
 
-        """
-        # add custom extensions
-        try:
-            ext_name = resources.files("sequana_pipetools.resources").joinpath("ext.py")
-            extensions = [str(ext_name)]
-        except AttributeError:  # pragma: no cover
-            with resources.path("sequana_pipetools.resources", "ext.py") as ext_name:
-                extensions = [str(ext_name)]
+        The config is validated in memory. The schema (and the extensions) are
+        read once and cached until the schema file is modified.
 
+        .. versionchanged:: 1.6.0
+            the config is not saved to a temporary file anymore
+        """
         # causes issue with ruamel.yaml 0.12.13. Works for 0.15
         warnings.simplefilter("ignore", ruamel.yaml.error.UnsafeLoaderWarning)
 
         try:
-            # open the config and the schema file
-            with tempfile.NamedTemporaryFile(suffix=".yaml", delete=False) as fh:
-                tmp_name = fh.name
+            validator = _get_schema_validator(schemafile)
+            validator.source = _ns_to_dict(self.config)
             try:
-                self.save(tmp_name)
-                c = Core(
-                    source_file=tmp_name,
-                    schema_files=[schemafile],
-                    extensions=extensions,
-                )
-                c.validate()
-                return True
+                validator.validate()
             finally:
-                os.unlink(tmp_name)
+                validator.source = None  # not kept in the cache
+            return True
         except (SchemaError, CoreError) as err:
             logger.warning(err.msg)
             return False
@@ -108,7 +108,43 @@ def test_monitor_runs(tmp_path):
             ],
         )
     assert results.exit_code == 0
-    mock_run.assert_called_once_with("pipeline.rules", ".sequana/profile_local", "test", "", str(tmp_path))
+    mock_run.assert_called_once_with(
+        "pipeline.rules",
+        ".sequana/profile_local",
+        "test",
+        "",
+        str(tmp_path),
+        watcher="auto",
+        scan_interval=0.5,
+        memory_interval=2.0,
+        render_interval=0.5,
+        max_interval=10.0,
+        attach=False,
+        resume=True,
+        background_dryrun=False,
+        collapse_done=False,
+        top=0,
+        events=None,
+        metrics=None,
+        history=True,
+        stall_after=1800.0,
+        straggler_factor=3.0,
+    )
+
+
+def test_monitor_runs_aggregate(tmp_path):
+    runner = CliRunner()
+    with patch("sequana_pipetools.monitor.run_aggregate", return_value=0) as mock_run:
+        results = runner.invoke(monitor_main, ["--runs", f"{tmp_path}/*", "--follow", "--stall-after", "10"])
+    assert results.exit_code == 0
+    assert mock_run.call_args.args == ((f"{tmp_path}/*",),)
+    assert mock_run.call_args.kwargs["follow"] is True
+    assert mock_run.call_args.kwargs["stall_after"] == 600
+
+
+def test_monitor_requires_snakefile():
+    results = CliRunner().invoke(monitor_main, ["--profile", ".sequana/profile_local"])
+    assert results.exit_code == 2
 
 
 # ── _print_diagnosis ──────────────────────────────────────────────────────────
@@ -104,3 +104,120 @@ def test_file_factory_sample_names():
     # finally, we can also use a sample_pattern
     ff = snaketools.FileFactory(test_dir + "/data/prefix.mess.*", sample_pattern="prefix.mess.{sample}.fastq.gz")
     assert set(ff.filenames) == {"A", "B"}
+
+
+def test_fastqfactory_index(tmp_path):
+    for sample in ("A", "B", "AB"):
+        for read in ("1", "2"):
+            (tmp_path / f"{sample}_R{read}_001.fastq.gz").touch()
+    (tmp_path / "C_R1_001.fastq.gz").touch()
+
+    ff = snaketools.FastQFactory(str(tmp_path / "*fastq.gz"))
+    assert sorted(ff.tags) == ["A", "AB", "B", "C"]
+    assert ff.get_file1("A") == str(tmp_path / "A_R1_001.fastq.gz")
+    assert ff.get_file2("AB") == str(tmp_path / "AB_R2_001.fastq.gz")
+    assert ff.get_file2("C") is None
+    with pytest.raises(ValueError):
+        ff.get_file1("D")
+
+    # without read tag, the files of a sample are those starting with its name
+    ff = snaketools.FastQFactory(str(tmp_path / "[BC]_*fastq.gz"), read_tag=None)
+    assert ff.get_file1("C_R1_001") == str(tmp_path / "C_R1_001.fastq.gz")
+    ff = snaketools.FastQFactory(str(tmp_path / "A*_R1_001.fastq.gz"), read_tag=None)
+    assert ff.get_file1("AB_R1_001") == str(tmp_path / "AB_R1_001.fastq.gz")
+    (tmp_path / "AB_R1_001.fastq.gz.md5").touch()
+    ff = snaketools.FastQFactory(str(tmp_path / "AB_R1*"), read_tag=None)
+    with pytest.raises(ValueError, match="too many candidates"):
+        ff.get_file1("AB_R1_001")
+
+
+def test_file_factory_cached_attributes(tmp_path):
+    for name in ("A.fastq.gz", "B.fastq.gz", "C.txt"):
+        (tmp_path / name).touch()
+    ff = snaketools.FileFactory(str(tmp_path / "*.fastq.gz"))
+    assert ff.filenames is ff.filenames
+    assert sorted(ff.filenames) == ["A", "B"]
+
+    # a new pattern searches the files again
+    ff.pattern = str(tmp_path / "*.txt")
+    assert ff.filenames == ["C"] and ff.extensions == [".txt"]
+    assert ff.realpaths == [str(tmp_path / "C.txt")]
+
+    ff = snaketools.FastQFactory(str(tmp_path / "*.fastq.gz"), read_tag=None)
+    ff.pattern = str(tmp_path / "A*")
+    assert ff.tags == ["A"] and ff.get_file1("A") == str(tmp_path / "A.fastq.gz")
+
+
+def test_realpaths(tmp_path, monkeypatch):
+    from sequana_pipetools.snaketools import file_factory
+
+    data = tmp_path / "data"
+    data.mkdir()
+    (tmp_path / "link").symlink_to(data)
+    files = []
+    for i in range(10):
+        (data / f"S{i}.fastq.gz").touch()
+        files.append(str(tmp_path / "link" / f"S{i}.fastq.gz"))
+    (tmp_path / "S.fastq.gz").symlink_to(data / "S0.fastq.gz")
+    files += [str(tmp_path / "S.fastq.gz"), str(tmp_path / "link" / ".." / "S.fastq.gz")]
+
+    expected = [os.path.realpath(f) for f in files]
+    assert file_factory._realpaths(files) == expected
+    monkeypatch.setattr(file_factory, "_REALPATH_BATCH", 3)  # thread pool
+    assert file_factory._realpaths(files) == expected
+
+
+def test_scan_files(tmp_path, monkeypatch):
+    import glob
+
+    from sequana_pipetools.snaketools.file_factory import _scan_files
+
+    for directory in ("", "run1/", "run1/lane1/", "run2/", ".hidden/", "run3.fastq.gz/", "run1/.h/", ".hidden/.h/"):
+        (tmp_path / directory).mkdir(exist_ok=True)
+        for name in ("A_R1_.fastq.gz", "B_R1_.fq.gz", ".C_R1_.fastq.gz", "x[1].txt"):
+            (tmp_path / directory / name).touch()
+
+    monkeypatch.chdir(tmp_path)
+    patterns = ("*.fastq.gz", "*/*.gz", "**/*.fastq.gz", "run1/**", "run[!1]/*", "x[[]1].txt", ".*", "none/*")
+    # hidden directories named by the pattern, trailing separators (directories only)
+    patterns += ("**/.h/*.gz", "run1/.h/*", ".*/.h/*", "**/.*/*.gz", "run*/", "**/", "*/*/", "run1/**/")
+    for pattern in patterns:
+        expected = [x for x in glob.glob(pattern, recursive=True) if not os.path.isdir(x)]
+        assert sorted(_scan_files([pattern])) == sorted(expected), pattern
+    assert sorted(_scan_files([str(tmp_path / "run[12]" / "*.fq.gz")])) == [
+        str(tmp_path / "run1" / "B_R1_.fq.gz"),
+        str(tmp_path / "run2" / "B_R1_.fq.gz"),
+    ]
+    assert sorted(_scan_files(["**/A*.fastq.gz"], max_depth=1)) == [
+        "A_R1_.fastq.gz",
+        "run1/A_R1_.fastq.gz",
+        "run2/A_R1_.fastq.gz",
+        "run3.fastq.gz/A_R1_.fastq.gz",
+    ]
+    # several patterns, each file once
+    assert len(_scan_files(["run1/*.gz", "run1/A*", "run2/A*"])) == 3
+
+    ff = snaketools.FileFactory(["run1/A_R1_.fastq.gz", "run2/*.gz", "**/*.gz"], exclude_pattern=["lane1", ".fq"])
+    assert len(ff._glob) == 4
+    assert ff._glob[0] == "run1/A_R1_.fastq.gz"
+
+
+def test_file_factory_state(tmp_path):
+    import json
+
+    for name in ("A_R1_.fastq.gz", "A_R2_.fastq.gz", "B_R1_.fastq.gz", "B_R2_.fastq.gz"):
+        (tmp_path / name).touch()
+    ff = snaketools.FastQFactory(str(tmp_path / "*fastq.gz"))
+    ff.realpaths
+    state = json.loads(json.dumps(ff.get_state()))
+    assert "_index" not in state
+
+    restored = snaketools.FastQFactory.from_state(state)
+    assert restored.unchanged()
+    assert sorted(restored.tags) == ["A", "B"]
+    assert restored.paired
+    assert restored.get_file2("B") == str(tmp_path / "B_R2_.fastq.gz")
+    assert restored.realpaths == ff.realpaths
+
+    (tmp_path / "C_R1_.fastq.gz").touch()
+    assert not restored.unchanged()
@@ -1,3 +1,8 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
 from sequana_pipetools import Pipeline, snaketools
 
 
@@ -15,3 +20,47 @@ def test_module():
     print(m)
     m
     m.__repr__()
+
+
+def test_modules_index(tmpdir, monkeypatch):
+    from sequana_pipetools.snaketools import module
+
+    index = Path(tmpdir) / "index.json"
+    monkeypatch.setattr(module, "_index_path", lambda: index)
+    monkeypatch.setattr(module, "_modules", None)
+    assert snaketools.modules["fastqc"].endswith("fastqc.rules")
+    assert "fastqc" in snaketools.pipeline_names
+
+    # the index is used...
+    data = json.loads(index.read_text())
+    data["modules"]["dummy"] = "dummy.rules"
+    index.write_text(json.dumps(data))
+    monkeypatch.setattr(module, "_modules", None)
+    assert "dummy" in module.modules
+
+    # ... as long as the directories are not modified
+    path = next(iter(data["mtimes"]))
+    data["mtimes"][path] -= 1
+    index.write_text(json.dumps(data))
+    monkeypatch.setattr(module, "_modules", None)
+    assert "dummy" not in module.modules
+
+
+def test_modules_index_silent(tmpdir, monkeypatch, capsys):
+    from sequana_pipetools.snaketools import module
+
+    # on a fresh machine, sequana's config directory does not exist yet
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmpdir))
+    monkeypatch.setattr(module, "_modules", None)
+    index = module._index_path()
+    assert index == Path(tmpdir) / "sequana" / module._INDEX_NAME
+    assert not index.parent.exists()
+
+    assert "fastqc" in module.modules
+    assert capsys.readouterr().out == ""
+    assert index.exists()
+
+
+def test_import_does_not_scan_pipelines():
+    code = "import sys, sequana_pipetools; assert 'sequana_pipelines' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -270,3 +270,46 @@ def test_pipeline_manager_teardown_creates_versions(tmpdir):
     pm.teardown(outdir=str(working_dir))
 
     assert os.path.exists(str(seq_dir.join("versions.txt")))
+
+
+def test_pipeline_manager_input_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = tmp_path / "data"
+    data.mkdir()
+    for name in ("A_R1_.fastq.gz", "A_R2_.fastq.gz"):
+        (data / name).touch()
+    cfg = SequanaConfig({})
+    cfg.config.input_directory = str(data)
+    cfg.config.input_pattern = "*fastq.gz"
+    cfg.config.input_readtag = "_R[12]_"
+
+    # no cache without a .sequana directory
+    snaketools.PipelineManager("test", cfg)
+    assert not (tmp_path / ".sequana").exists()
+
+    (tmp_path / ".sequana").mkdir()
+    pm = snaketools.PipelineManager("test", cfg)
+    assert (tmp_path / ".sequana" / "input_files.json").exists()
+    assert pm._input_cache
+
+    pm = snaketools.PipelineManager("test", cfg)
+    assert not hasattr(pm, "_input_cache")  # restored from the cache
+    assert pm.paired and list(pm.samples) == ["A"]
+
+    # a new sample invalidates the cache
+    for name in ("B_R1_.fastq.gz", "B_R2_.fastq.gz"):
+        (data / name).touch()
+    pm = snaketools.PipelineManager("test", cfg)
+    assert sorted(pm.samples) == ["A", "B"]
+
+    # and so does a different pattern
+    cfg.config.input_pattern = "A*fastq.gz"
+    pm = snaketools.PipelineManager("test", cfg)
+    assert list(pm.samples) == ["A"]
+
+    # arguments that are not JSON types (tuple) also hit the cache
+    pm = snaketools.PipelineManager("test", cfg, extra_prefixes_to_strip=("X",))
+    assert pm._input_cache
+    pm = snaketools.PipelineManager("test", cfg, extra_prefixes_to_strip=("X",))
+    assert not hasattr(pm, "_input_cache")
+    assert list(pm.samples) == ["A"]
@@ -151,3 +151,23 @@ def test_create_profile_uses_v8(tmp_path):
     with patch("sequana_pipetools.snaketools.profile._is_v8", return_value=True):
         result = create_profile(tmp_path, "local", **_base_kwargs())
     assert "profile_local" in result
+
+
+def test_build_slurm_config_v8_input_profile():
+    kwargs = _base_kwargs()
+    kwargs.update({"partition": "common", "qos": "normal", "memory": "4G"})
+    samples = {"A": {"size": 100}, "B": {"size": 100}, "C": {"size": 250}, "D": {"size": 10000}}
+    config = _build_slurm_config_v8(input_profile={"samples": samples}, runtime=60, **kwargs)
+    resources = config["default-resources"]
+    assert resources["mem"] == "dict([('C', 5852), ('D', 16384)]).get(getattr(wildcards, 'sample', None), '4G')"
+    wildcards = type("Wildcards", (), {"sample": "D"})
+    assert eval(resources["mem"], {"wildcards": wildcards}) == 4096 * 4  # at most _MAX_SCALE times the memory
+    assert eval(resources["runtime"], {"wildcards": object()}) == 60
+    assert "--time={resources.runtime}" in config["cluster-generic-submit-cmd"]
+
+    # same samples sizes or memory that cannot be parsed: unchanged
+    config = _build_slurm_config_v8(input_profile={"samples": {"A": {"size": 1}}}, **kwargs)
+    assert config["default-resources"]["mem"] == "4G"
+    assert "runtime" not in config["default-resources"]
+    kwargs["memory"] = "lots"
+    assert _build_slurm_config_v8(input_profile={"samples": samples}, **kwargs)["default-resources"]["mem"] == "lots"
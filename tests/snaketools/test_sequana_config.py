@@ -89,13 +89,11 @@ def test_sequana_config(tmpdir):
             assert cfg2._yaml_code == cfg1._yaml_code
             assert cfg1.config == cfg2.config
 
-    # test config with a _directory or _file  based on the fastqc pipeline
-    cfg = SequanaConfig(s.config)
-    cfg.config.input_directory = "~/"
-    cfg.config.multiqc.config_file = "~/"
-    cfg._recursive_cleanup(cfg.config)
+    # test config with a _directory or _file: the tilde is expanded when read
+    cfg = SequanaConfig({"input_directory": "~/", "multiqc": {"config_file": " ~/"}})
     assert cfg.config.input_directory.startswith("/")
     assert cfg.config.multiqc.config_file.startswith("/")
+    assert SequanaConfig(cfg).config.multiqc.config_file.startswith("/")
 
 
 def test_check_config_with_schema():
@@ -152,3 +150,94 @@ def test_long_value_no_line_wrap(tmpdir):
 
     # The long path should appear on a single line, not wrapped
     assert long_path in content
+
+
+def test_sequana_config_single_parse(tmpdir):
+    import yaml
+
+    text = """# comment
+input_directory: ~/data
+flags: {a: yes, b: off, c: 010, d: 1:20, e: 1e3, f: !!str 10, g: "yes", h: 2024-01-02}
+base: &base
+    x: 1
+    y: [1, 2.5, null]
+sample:   # kept
+    <<: *base
+    y: 2
+empty:
+"""
+    filename = tmpdir.join("config.yaml")
+    filename.write(text)
+    cfg = SequanaConfig(str(filename))
+
+    # same data as yaml.safe_load (YAML 1.1), except for the cleanup (None, ~)
+    data = yaml.safe_load(text)
+    assert vars(cfg.config.flags) == data["flags"]
+    assert list(vars(cfg.config.sample).items()) == [("x", 1), ("y", 2)]
+    assert cfg.config.empty == ""
+    assert cfg.config.input_directory == os.path.expanduser("~/data")
+
+    # comments are kept
+    cfg.save(str(filename))
+    assert "# kept" in filename.read()
+
+
+def test_check_config_with_schema_cache(tmpdir):
+    from sequana_pipetools.snaketools import sequana_config
+
+    cfg = SequanaConfig(os.path.join(test_dir, "data", "config.yml"))
+    schema = tmpdir.join("schema.yml")
+    schema.write(open(os.path.join(test_dir, "data", "schema.yml")).read())
+
+    assert cfg.check_config_with_schema(str(schema))
+    validator = sequana_config._SCHEMA_VALIDATORS[str(schema)][1]
+    assert cfg.check_config_with_schema(str(schema))
+    assert sequana_config._SCHEMA_VALIDATORS[str(schema)][1] is validator
+    assert validator.source is None
+
+    # a modified schema is read again
+    schema.write(schema.read().replace("mapping:\n", "mapping:\n  new_key:\n    type: str\n    required: True\n", 1))
+    os.utime(str(schema), ns=(0, 0))
+    assert not cfg.check_config_with_schema(str(schema))
+    assert sequana_config._SCHEMA_VALIDATORS[str(schema)][1] is not validator
+    assert not cfg.check_config_with_schema(os.path.join(str(tmpdir), "missing.yml"))
+
+
+def test_config_copy_on_write(tmpdir):
+    import pickle
+
+    from sequana_pipetools.snaketools.sequana_config import _dict_to_ns
+
+    data = {"a": 1, "b": {"c": " x ", "d": None}, "e": [1, 2]}
+    ns = _dict_to_ns(data)
+    assert ns.b.c == " x "
+    ns.b.c = "y"
+    ns.f = 2
+    del ns.a
+    assert data == {"a": 1, "b": {"c": " x ", "d": None}, "e": [1, 2]}
+    assert list(ns.keys()) == ["b", "e", "f"]
+    assert vars(ns.b) == {"c": "y", "d": None}
+    assert pickle.loads(pickle.dumps(ns)) == ns
+    assert "e" in ns and "a" not in ns
+
+    # a config created from another one shares its data until modified
+    cfg1 = SequanaConfig(os.path.join(test_dir, "data", "config.yml"))
+    cfg2 = SequanaConfig(cfg1)
+    assert cfg1.config == cfg2.config
+    cfg2.config.input_directory = "~/other"
+    cfg2.config.busco.options = "--offline"
+    assert cfg1.config.busco.options == ""
+    assert "input_directory" not in cfg1.config
+
+    # ... and the other way around
+    cfg1.config.busco.lineage = "fungi"
+    cfg1.config.busco.threads = 8
+    assert cfg2.config.busco.lineage == "bacteria" and cfg2.config.busco.threads == 4
+    ns2 = _dict_to_ns(data)
+    data["a"] = 2
+    assert ns2.a == 1
+
+    cfg2.save(str(tmpdir.join("config.yml")))
+    cfg3 = SequanaConfig(str(tmpdir.join("config.yml")))
+    assert cfg3.config.busco.options == "--offline"
+    assert cfg3.config.input_directory == os.path.expanduser("~/other")
@@ -0,0 +1,34 @@
+import importlib.util
+from pathlib import Path
+
+from sequana_pipetools.monitor import DONE, RUNNING, _scan_snakemake_log
+
+BENCH = Path(__file__).parent.parent / "benchmarks" / "bench_monitor.py"
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location("bench_monitor", BENCH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_run_is_parsed_by_the_monitor(tmp_path):
+    bench = _load_bench()
+    for fmt in ("v7", "v8"):
+        run = bench.SyntheticRun(tmp_path / fmt, 40, fmt, running=0.1)
+        state = _scan_snakemake_log(run.snakelog, {})
+        jobs = [j for rule_jobs in state.values() for j in rule_jobs.values()]
+        assert sum(j["state"] == DONE for j in jobs) == 36
+        assert sum(j["state"] == RUNNING for j in jobs) == 4
+        assert sum(run.expected.values()) == 40
+
+
+def test_benchmark_reports_all_stages():
+    bench = _load_bench()
+    results = bench.benchmark(30, "v8", ticks=2, churn=2, skip=("render",))
+    assert "_scan_logs[polling]" in results
+    assert "_scan_snakemake_log[tail]" in results
+    assert "render" not in results
+    for metrics in results.values():
+        assert set(metrics) == {"first_ms", "median_ms", "p95_ms", "alloc_kib", "peak_kib"}
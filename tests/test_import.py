@@ -0,0 +1,70 @@
+import subprocess
+import sys
+
+import pytest
+
+import sequana_pipetools
+
+# cumulative time of `import sequana_pipetools` (µs), as reported by python -X importtime;
+# about 50ms when the budget was set (750ms before the public API was imported lazily)
+BUDGET = 250_000
+
+# must not be imported by `import sequana_pipetools`
+HEAVY = (
+    "aiohttp",
+    "easydev",
+    "pykwalify",
+    "requests",
+    "rich",
+    "rich_click",
+    "ruamel",
+    "sequana_pipelines",
+    "sequana_pipetools.sequana_manager",
+    "sequana_pipetools.snaketools",
+    "snakemake",
+)
+
+
+def _importtime(module):
+    """Return {module: cumulative import time in µs} of a fresh interpreter importing *module*"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_budget():
+    times = _importtime("sequana_pipetools")
+    heavy = [name for name in HEAVY if name in times]
+    assert heavy == [], f"imported by sequana_pipetools: {heavy}"
+    assert times["sequana_pipetools"] < BUDGET, f"import sequana_pipetools took {times['sequana_pipetools']}µs"
+
+
+def test_lazy_api():
+    # submodules are attributes of a freshly imported package
+    code = (
+        "import sequana_pipetools, types; "
+        "assert isinstance(sequana_pipetools.snaketools, types.ModuleType); "
+        "assert isinstance(sequana_pipetools.misc, types.ModuleType); "
+        "assert isinstance(sequana_pipetools.sequana_manager, types.ModuleType); "
+        "assert isinstance(sequana_pipetools.snaketools.profile, types.ModuleType)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    from sequana_pipetools import snaketools
+    from sequana_pipetools.sequana_manager import SequanaManager
+    from sequana_pipetools.snaketools.pipeline_manager import PipelineManager
+
+    assert sequana_pipetools.SequanaManager is SequanaManager
+    assert sequana_pipetools.PipelineManager is snaketools.PipelineManager is PipelineManager
+    assert "SequanaConfig" in dir(sequana_pipetools) and "FileFactory" in dir(snaketools)
+    with pytest.raises(AttributeError):
+        sequana_pipetools.dummy
+    with pytest.raises(AttributeError):
+        snaketools.dummy
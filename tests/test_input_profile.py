@@ -0,0 +1,39 @@
+import gzip
+
+from sequana_pipetools import input_profile
+from sequana_pipetools.input_profile import estimate_reads, profile_inputs, save_profile
+
+from . import test_dir
+
+
+def test_estimate_reads(tmp_path, monkeypatch):
+    # exact for small files
+    assert estimate_reads(f"{test_dir}/data/Hm2_GTGAAA_L005_R1_001.fastq.gz") == 1499
+    assert estimate_reads(f"{test_dir}/data/config.yml") is None
+    (tmp_path / "plain.fq").write_text("@a\nAC\n+\nII\n" * 3)
+    assert estimate_reads(str(tmp_path / "plain.fq")) == 3
+
+    # sampled
+    records = "".join(f"@read{i}\nACGTACGTAC\n+\nIIIIIIIIII\n" for i in range(20000)).encode()
+    (tmp_path / "big.fastq.gz").write_bytes(gzip.compress(records))
+    monkeypatch.setattr(input_profile, "_SAMPLE_BYTES", 10000)
+    assert abs(estimate_reads(str(tmp_path / "big.fastq.gz")) - 20000) < 2000
+    (tmp_path / "bad.fastq.gz").write_bytes(b"\x1f\x8bnot a gzip file")
+    assert estimate_reads(str(tmp_path / "bad.fastq.gz")) is None
+
+
+def test_profile_inputs(tmp_path):
+    files = [f"{test_dir}/data/Hm2_GTGAAA_L005_R1_001.fastq.gz", f"{test_dir}/data/Hm2_GTGAAA_L005_R2_001.fastq.gz"]
+    profile = profile_inputs(files, read_tag="_R[12]_")
+    sample = profile["samples"]["Hm2_GTGAAA_L005"]
+    assert len(sample["files"]) == 2
+    assert sample["reads"] == profile["reads"] == 2998
+    assert sample["size"] == profile["size"] > 0
+
+    # no read tag: one sample per file; reads unknown for other files
+    profile = profile_inputs(files[:1] + [f"{test_dir}/data/bam_notag.bam"])
+    assert sorted(profile["samples"]) == ["Hm2_GTGAAA_L005_R1_001", "bam_notag"]
+    assert profile["reads"] is None
+
+    (tmp_path / ".sequana").mkdir()
+    assert save_profile(profile, tmp_path).exists()
@@ -0,0 +1,66 @@
+import gzip
+import os
+
+from sequana_pipetools import integrity
+from sequana_pipetools.integrity import check_file, check_integrity
+
+from . import test_dir
+
+
+def _fastq(path, reads, compress=True):
+    data = "".join(f"@r{i}\nACGT\n+\nIIII\n" for i in range(reads)).encode()
+    if compress:
+        data = gzip.compress(data)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_check_file(tmp_path):
+    assert check_file(f"{test_dir}/data/Hm2_GTGAAA_L005_R1_001.fastq.gz") == (1499, None)
+    assert check_file(_fastq(tmp_path / "plain.fastq", 3, compress=False)) == (3, None)
+    assert check_file(f"{test_dir}/data/config.yml") == (None, None)
+
+    # concatenated gzip members (bgzip)
+    data = gzip.compress(b"@a\nAC\n+\nII\n") + gzip.compress(b"@b\nAC\n+\nII\n")
+    (tmp_path / "multi.fq.gz").write_bytes(data)
+    assert check_file(str(tmp_path / "multi.fq.gz")) == (2, None)
+
+    # truncated file, bad trailer, truncated FastQ record
+    data = (tmp_path / "multi.fq.gz").read_bytes()
+    (tmp_path / "truncated.fq.gz").write_bytes(data[:-10])
+    assert "truncated" in check_file(str(tmp_path / "truncated.fq.gz"))[1]
+    (tmp_path / "crc.fq.gz").write_bytes(data[:-8] + b"\0" * 8)
+    assert "corrupted" in check_file(str(tmp_path / "crc.fq.gz"))[1]
+    (tmp_path / "record.fq.gz").write_bytes(gzip.compress(b"@a\nAC\n+\n"))
+    assert "multiple of 4" in check_file(str(tmp_path / "record.fq.gz"))[1]
+    assert check_file(str(tmp_path / "missing.fq.gz"))[0] is None
+
+
+def test_check_integrity(tmp_path, monkeypatch):
+    files = [
+        _fastq(tmp_path / "A_R1_.fastq.gz", 10),
+        _fastq(tmp_path / "A_R2_.fastq.gz", 10),
+        _fastq(tmp_path / "B_R1_.fastq.gz", 10),
+        _fastq(tmp_path / "B_R2_.fastq.gz", 9),
+    ]
+    (tmp_path / "C_R1_.fastq.gz").write_bytes(b"\x1f\x8b\x08\x00")
+    files.append(str(tmp_path / "C_R1_.fastq.gz"))
+    cache = tmp_path / "cache.json"
+
+    result = check_integrity(files, read_tag="_R[12]_", jobs=2, cache=cache)
+    assert result["reads"][files[0]] == 10
+    assert list(result["errors"]) == [files[4]]
+    assert result["mismatches"] == [(files[2], 10, files[3], 9)]
+
+    # cached: nothing is read again, except modified files
+    monkeypatch.setattr(integrity, "check_file", lambda x: (_ for _ in ()).throw(AssertionError(x)))
+    assert check_integrity(files[:4], read_tag="_R[12]_", cache=cache) == {
+        "reads": dict(zip(files[:4], [10, 10, 10, 9])),
+        "errors": {},
+        "mismatches": [(files[2], 10, files[3], 9)],
+    }
+    _fastq(tmp_path / "B_R2_.fastq.gz", 12)
+    os.utime(files[3], ns=(0, 0))
+    monkeypatch.setattr(integrity, "check_file", lambda x: (12, None))
+    result = check_integrity(files[:4], read_tag="_R[12]_", cache=cache)
+    assert result["mismatches"] == [(files[2], 10, files[3], 12)]
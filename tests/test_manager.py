@@ -49,6 +49,8 @@ def test_sequana_manager(tmpdir):
 
     pm.setup()
     pm.teardown()
+    # the inputs are profiled for the slurm profile only
+    assert not (wkdir / ".sequana" / "input_profile.json").exists()
 
     # We can now try to do it again from the existing project itself
     dd = default_dict.copy()
@@ -67,6 +69,7 @@ def test_sequana_manager(tmpdir):
     pm.options.slurm_queue = "biomics"
     pm.setup()
     pm.teardown()
+    assert (wkdir / ".sequana" / "input_profile.json").exists()
 
     # test requirements (even if it is empty)
     pm.config.config.requirements = []
@@ -113,6 +116,7 @@ def test_scheduler(tmpdir):
     pm.config.config.input_pattern = "Hm2*gz"
     pm.config.config.input_readtag = "_R[12]_"
 
+    pm.options.slurm_runtime = 60
     pm.setup()
     pm.teardown()
 
@@ -249,3 +253,29 @@ def test_sequana_manager_teardown_with_monitor(tmpdir):
 
     script = (wkdir / "fastqc.sh").read_text("utf-8")
     assert "sequana_pipetools_monitor" in script
+
+
+def test_sequana_manager_check_input_integrity(tmpdir, monkeypatch):
+    import gzip
+    from pathlib import Path
+
+    from sequana_pipetools import integrity
+
+    monkeypatch.setattr(integrity, "_cache_path", lambda: Path(tmpdir) / "integrity.json")
+    data = tmpdir.mkdir("data")
+    for name, reads in (("A_R1_.fastq.gz", 2), ("A_R2_.fastq.gz", 2)):
+        (data / name).write_binary(gzip.compress(b"@r\nAC\n+\nII\n" * reads))
+
+    dd = default_dict.copy()
+    dd["workdir"] = tmpdir.mkdir("wkdir")
+    dd["check_input_integrity"] = True
+    pm = SequanaManager(SimpleNamespace(**dd), "fastqc")
+    pm.config.config.input_directory = str(data)
+    pm.config.config.input_pattern = "*fastq.gz"
+    pm.config.config.input_readtag = "_R[12]_"
+    pm.check_input_files()
+
+    (data / "A_R2_.fastq.gz").write_binary(gzip.compress(b"@r\nAC\n+\nII\n"))
+    with pytest.raises(SystemExit):
+        pm.check_input_files()
+    pm.check_input_files(stop_on_error=False)
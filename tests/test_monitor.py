@@ -1,8 +1,9 @@
 import io
 import os
+import statistics
 import time
 from collections import OrderedDict
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -13,17 +14,43 @@ from sequana_pipetools.monitor import (
     DONE,
     FAILED,
     RUNNING,
+    WAITING,
+    _AttachedProcess,
     _build_display,
     _classify_log,
     _elapsed_str,
     _find_log_files,
+    _InotifyLogWatcher,
+    _is_snakemake,
+    _Job,
+    _job_from_cmdline,
+    _JobResources,
+    _Journal,
+    _journal_states,
+    _load_journal,
+    _make_log_watcher,
     _mark_remaining_done,
     _mark_remaining_failed,
+    _PollingLogWatcher,
     _ram_gb,
+    _returncode_from_log,
     _scan_logs,
     _scan_snakemake_log,
+    _Scheduler,
+    _SnakemakeLogParser,
 )
 
+
+def _job(state, start, end=None):
+    return _Job(state, start.timestamp(), None if end is None else end.timestamp())
+
+
+@pytest.fixture(autouse=True)
+def _history(tmp_path, monkeypatch):
+    # keep the job durations of test runs out of the user's config directory
+    monkeypatch.setattr("sequana_pipetools.monitor._history_path", lambda: tmp_path / "durations.json")
+
+
 # ── _elapsed_str ──────────────────────────────────────────────────────────────
 
 
@@ -136,7 +163,7 @@ def test_scan_logs_preserves_done(tmp_path):
     log = tmp_path / "logs" / "rule1" / "s1.log"
     log.parent.mkdir(parents=True)
     log.write_text("done")
-    prev = {"rule1": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}}}
+    prev = {"rule1": {"s1": _job(DONE, datetime.now(), datetime.now())}}
     state = _scan_logs(tmp_path, prev)
     assert state["rule1"]["s1"]["state"] == DONE
 
@@ -152,13 +179,151 @@ def test_scan_logs_uses_log_to_job(tmp_path):
     assert "sample1" in state["fastp"]
 
 
+# ── log watchers ──────────────────────────────────────────────────────────────
+
+
+def _make_watchers(workdir):
+    watchers = [_PollingLogWatcher(workdir)]
+    try:
+        watchers.append(_InotifyLogWatcher(workdir))
+    except OSError:  # pragma: no cover
+        pass
+    return watchers
+
+
+def test_watcher_initial_poll_reports_existing_logs(tmp_path):
+    log = tmp_path / "logs" / "fastqc" / "s1.log"
+    log.parent.mkdir(parents=True)
+    log.write_text("output")
+    (tmp_path / ".sequana").mkdir()
+    (tmp_path / ".sequana" / "snakemake.log").write_text("hidden")
+    for watcher in _make_watchers(tmp_path):
+        changed = watcher.poll()
+        assert list(changed) == [log]
+        assert watcher.poll() == {}
+        watcher.close()
+
+
+def test_watcher_reports_new_and_modified_logs(tmp_path):
+    (tmp_path / "logs").mkdir()
+    for watcher in _make_watchers(tmp_path):
+        log = tmp_path / "logs" / watcher.backend / "s1.log"
+        watcher.poll()
+        log.parent.mkdir()
+        log.write_text("start")
+        assert log in watcher.poll()
+
+        # appending does not change the directory mtime but is still reported
+        new_mtime = time.time() + 1
+        os.utime(log, (new_mtime, new_mtime))
+        assert watcher.poll() == {log: new_mtime}
+        watcher.close()
+
+
+def test_polling_watcher_forgets_settled_files(tmp_path):
+    log = tmp_path / "logs" / "rule1" / "s1.log"
+    log.parent.mkdir(parents=True)
+    log.write_text("output")
+    old = time.time() - 10
+    os.utime(log, (old, old))
+
+    watcher = _PollingLogWatcher(tmp_path)
+    assert log in watcher.poll()
+    watcher.poll()
+    assert str(log) not in watcher._hot
+
+
+def test_polling_watcher_deleted_logs(tmp_path):
+    import shutil
+
+    log1, log2 = tmp_path / "logs" / "rule1" / "s1.log", tmp_path / "logs" / "rule2" / "s1.log"
+    for log in (log1, log2):
+        log.parent.mkdir(parents=True)
+        log.write_text("output")
+    watcher = _PollingLogWatcher(tmp_path)
+    watcher.poll()
+    assert watcher._files[str(log1.parent)] == {"s1.log"}
+
+    # a deleted then re-created log (e.g. a rerun job) is reported again
+    log1.unlink()
+    os.utime(log1.parent, ns=(0, 0))
+    assert watcher.poll() == {}
+    assert watcher._files[str(log1.parent)] == set()
+    assert watcher._files[str(log2.parent)] == {"s1.log"}
+    log1.write_text("rerun")
+    assert list(watcher.poll()) == [log1]
+
+    # and so are the logs of a re-created directory
+    shutil.rmtree(log2.parent)
+    watcher.poll()
+    assert str(log2.parent) not in watcher._files
+    log2.parent.mkdir()
+    log2.write_text("rerun")
+    os.utime(log2.parent.parent, ns=(0, 0))
+    assert list(watcher.poll()) == [log2]
+
+
+def test_make_log_watcher_backends(tmp_path):
+    assert _make_log_watcher(tmp_path, "polling").backend == "polling"
+    with patch("sequana_pipetools.monitor._fs_type", return_value="nfs"):
+        assert _make_log_watcher(tmp_path, "auto").backend == "polling"
+    with patch("sequana_pipetools.monitor._InotifyLogWatcher", side_effect=OSError("limit")):
+        assert _make_log_watcher(tmp_path, "inotify").backend == "polling"
+
+
+@pytest.mark.parametrize("backend", ["polling", "inotify"])
+def test_log_watcher_group(tmp_path, backend):
+    from sequana_pipetools.monitor import _LogWatcherGroup
+
+    run1, run2 = tmp_path / "run1", tmp_path / "run2"
+    log1, log2 = run1 / "logs" / "trim" / "s1.log", run2 / "logs" / "trim" / "s1.log"
+    for log in (log1, log2):
+        log.parent.mkdir(parents=True)
+        log.write_text("start")
+
+    group = _LogWatcherGroup(backend)
+    view1 = group.add(run1)
+    group.poll()
+    view2 = group.add(run2)
+    assert len(group._watchers) == 1  # one watcher for both runs
+    group.poll()
+    assert list(view1.poll()) == [log1]
+    assert list(view2.poll()) == [log2]
+    assert view1.n_reported == 1
+
+    view1.close()
+    new = time.time() + 1
+    for log in (log1, log2):
+        os.utime(log, (new, new))
+    group.poll()
+    assert view1.poll() == {}
+    assert view2.poll() == {log2: new}
+    group.close()
+
+
+def test_scan_logs_with_watcher(tmp_path):
+    log = tmp_path / "logs" / "fastqc" / "s1.log"
+    log.parent.mkdir(parents=True)
+    log.write_text("output")
+    watcher = _PollingLogWatcher(tmp_path)
+    state = _scan_logs(tmp_path, {}, watcher=watcher)
+    assert state["fastqc"]["s1"]["state"] == RUNNING
+
+    # once the file is older than the threshold the job is DONE and no longer tracked
+    old = time.time() - 10
+    os.utime(log, (old, old))
+    state = _scan_logs(tmp_path, state, watcher=watcher)
+    assert state["fastqc"]["s1"]["state"] == DONE
+    assert watcher.active == {}
+
+
 # ── _mark_remaining_failed / _mark_remaining_done ────────────────────────────
 
 
 def test_mark_remaining_failed():
     state = {
-        "rule1": {"s1": {"state": RUNNING, "start": datetime.now(), "end": None}},
-        "rule2": {"s2": {"state": DONE, "start": datetime.now(), "end": datetime.now()}},
+        "rule1": {"s1": _job(RUNNING, datetime.now())},
+        "rule2": {"s2": _job(DONE, datetime.now(), datetime.now())},
     }
     result = _mark_remaining_failed(state)
     assert result["rule1"]["s1"]["state"] == FAILED
@@ -167,7 +332,7 @@ def test_mark_remaining_failed():
 
 def test_mark_remaining_done_running():
     state = {
-        "rule1": {"s1": {"state": RUNNING, "start": datetime.now(), "end": None}},
+        "rule1": {"s1": _job(RUNNING, datetime.now())},
     }
     result = _mark_remaining_done(state)
     assert result["rule1"]["s1"]["state"] == DONE
@@ -183,7 +348,7 @@ def test_mark_remaining_done_inserts_expected(tmp_path):
 
 
 def test_mark_remaining_done_fills_partial(tmp_path):
-    state = {"fastqc": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}}}
+    state = {"fastqc": {"s1": _job(DONE, datetime.now(), datetime.now())}}
     result = _mark_remaining_done(state, expected={"fastqc": 3})
     assert len(result["fastqc"]) == 3
 
@@ -231,11 +396,267 @@ def test_scan_snakemake_log_running_job(tmp_path):
 def test_scan_snakemake_log_preserves_previous_done(tmp_path):
     log = tmp_path / "snakemake.log"
     log.write_text("")
-    prev = {"fastqc": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}}}
+    prev = {"fastqc": {"s1": _job(DONE, datetime.now(), datetime.now())}}
     state = _scan_snakemake_log(log, prev)
     assert state["fastqc"]["s1"]["state"] == DONE
 
 
+def test_snakemake_log_parser_incremental(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("[Wed Jan 01 12:00:00 2025]\n" "rule align:\n" "    jobid: 3\n" "    wildcards: sample=s2\n")
+    parser = _SnakemakeLogParser(log)
+    state = parser.update()
+    assert state["align"]["sample=s2"]["state"] == RUNNING
+    offset = parser.offset
+    assert parser.update() is state  # nothing new: cached state
+
+    with open(log, "a") as fh:
+        fh.write("[Wed Jan 01 12:01:00 2025]\nFinished jo")
+    state = parser.update()
+    assert state["align"]["sample=s2"]["state"] == RUNNING  # incomplete line kept aside
+    assert parser.offset > offset
+
+    with open(log, "a") as fh:
+        fh.write("b 3.\n")
+    state = parser.update()
+    assert state["align"]["sample=s2"]["state"] == DONE
+    assert state["align"]["sample=s2"]["end"] == datetime(2025, 1, 1, 12, 1)
+    assert parser.done_count == {"align": 1}
+
+
+def test_snakemake_log_parser_state_in_place(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("")
+    parser = _SnakemakeLogParser(log)
+    chunks = [
+        "[Wed Jan 01 12:00:00 2025]\nrule trim:\n    jobid: 1\n    wildcards: sample=s1\n",
+        "rule trim:\n    jobid: 2\nrule map:\n    jobid: 3\n    wildcards: sample=s1\n",
+        "[Wed Jan 01 12:01:00 2025]\nFinished job 1.\n",
+        "rule trim:\n    jobid: 4\n    wildcards: sample=s3\n",
+        "[Wed Jan 01 12:02:00 2025]\nFinished job 2.\nFinished job 3.\n",
+    ]
+    state = parser.update()
+    for chunk in chunks:
+        trim, done = state.get("trim"), state.get("trim", {}).get("sample=s1")
+        with open(log, "a") as fh:
+            fh.write(chunk)
+        assert parser.update() is state
+        # same jobs, in the same order, as parsing the whole log
+        fresh = _SnakemakeLogParser(log).update()
+        assert {r: [(k, j.state) for k, j in jobs.items()] for r, jobs in state.items()} == {
+            r: [(k, j.state) for k, j in jobs.items()] for r, jobs in fresh.items()
+        }
+        if done is not None and done.state == DONE:
+            # finished jobs are not copied
+            assert state["trim"] is trim and state["trim"]["sample=s1"] is done
+    assert list(state["trim"]) == ["sample=s1", "job_2", "sample=s3"]
+
+
+def test_snakemake_log_parser_final_flushes_partial_line(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("rule trim:\nError in rule trim:")
+    parser = _SnakemakeLogParser(log)
+    assert parser.update()["trim"]["job_1"]["state"] == RUNNING
+    assert parser.update(final=True)["trim"]["job_1"]["state"] == FAILED
+
+
+def test_snakemake_log_parser_truncation_restarts(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("rule trim:\n    jobid: 1\n    wildcards: sample=s1\n" + "# padding\n" * 10)
+    parser = _SnakemakeLogParser(log)
+    parser.update()
+    assert parser.jobid_to_rule == {"1": "trim"}
+
+    log.write_text("rule align:\n    jobid: 2\n")
+    state = parser.update()
+    assert parser.jobid_to_rule == {"2": "align"}
+    assert "trim" not in state
+    assert state["align"]["job_1"]["state"] == RUNNING
+
+
+def test_snakemake_log_parser_rotation_restarts(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("rule trim:\n")
+    parser = _SnakemakeLogParser(log)
+    parser.update()
+
+    rotated = tmp_path / "new.log"
+    rotated.write_text("rule align:\n" + "x\n" * 10)
+    os.replace(rotated, log)
+    state = parser.update()
+    assert list(state) == ["align"]
+
+
+def test_scan_snakemake_log_with_parser(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("rule trim:\n")
+    parser = _SnakemakeLogParser(log)
+    assert _scan_snakemake_log(log, {}, parser)["trim"]["job_1"]["state"] == RUNNING
+    assert _scan_snakemake_log(tmp_path / "missing.log", {}, parser) == {}
+
+
+# ── per-job resources ─────────────────────────────────────────────────────────
+
+
+def test_job_from_cmdline_log_file(tmp_path):
+    log_to_job = {"logs/fastqc/s1.log": ("fastqc", "s1")}
+    cmd = "/bin/bash -c set -euo pipefail; fastqc s1.fq.gz > logs/fastqc/s1.log 2>&1"
+    assert _job_from_cmdline(cmd, log_to_job) == ("fastqc", "s1")
+    cmd = f"/bin/bash -c fastqc s1.fq.gz &>{tmp_path}/logs/fastqc/s1.log"
+    assert _job_from_cmdline(cmd, log_to_job, str(tmp_path)) == ("fastqc", "s1")
+    assert _job_from_cmdline("fastqc other.fq.gz", log_to_job) is None
+
+
+def test_job_from_cmdline_jobscript_and_target_jobs():
+    cmd = "/bin/sh /tmp/wd/.snakemake/tmp.x/snakejob.bowtie2.12.sh"
+    assert _job_from_cmdline(cmd, {}) == ("bowtie2", "job_12")
+    assert _job_from_cmdline(cmd, {}, jobid_to_job=lambda jid: ("bowtie2", "sample=A")) == ("bowtie2", "sample=A")
+    cmd = "python -m snakemake --target-jobs 'fastp:sample=B' --allowed-rules fastp"
+    assert _job_from_cmdline(cmd, {}) == ("fastp", "B")
+
+
+def test_job_resources_attributes_child_processes(tmp_path):
+    import subprocess
+
+    (tmp_path / "logs" / "sleep").mkdir(parents=True)
+    log_to_job = {"logs/sleep/s1.log": ("sleep", "s1")}
+    proc = subprocess.Popen(["/bin/bash", "-c", "sleep 5; echo > logs/sleep/s1.log"], cwd=tmp_path)
+    try:
+        tracker = _JobResources(log_to_job, str(tmp_path))
+        time.sleep(0.2)
+        total = tracker.sample(os.getpid())
+        assert total > 0
+        assert ("sleep", "s1") in tracker.jobs
+        assert tracker.jobs[("sleep", "s1")]["rss"] > 0
+        assert 0 < tracker.rule_peaks()["sleep"] < total
+    finally:
+        proc.kill()
+        proc.wait()
+
+    tracker.to_tsv(tmp_path / "rules.tsv", tmp_path / "jobs.tsv")
+    header, row = (tmp_path / "rules.tsv").read_text().splitlines()
+    assert header.split("\t")[:3] == ["rule", "jobs", "max_rss_gb"]
+    assert row.startswith("sleep\t1\t")
+    assert "s1" in (tmp_path / "jobs.tsv").read_text()
+
+
+def test_job_resources_no_psutil():
+    with patch("sequana_pipetools.monitor._HAS_PSUTIL", False):
+        assert _JobResources().sample(os.getpid()) == 0.0
+
+
+def test_snakemake_log_parser_job_for_jobid(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("rule align:\n    jobid: 3\n    wildcards: sample=s2\nrule trim:\n    jobid: 4\n")
+    parser = _SnakemakeLogParser(log)
+    parser.update()
+    assert parser.job_for_jobid("3") == ("align", "sample=s2")
+    assert parser.job_for_jobid("4") == ("trim", "job_4")
+    assert parser.job_for_jobid("99") is None
+
+
+# ── journal ───────────────────────────────────────────────────────────────────
+
+
+def test_journal_records_transitions_and_reloads(tmp_path):
+    path = tmp_path / "monitor.journal"
+    t0, t1 = datetime(2025, 1, 1, 12, 0), datetime(2025, 1, 1, 12, 5)
+    log_state = {"trim": {"s1": _job(RUNNING, t0)}}
+    merged = {**log_state, "slicer": {"job_1": _job(DONE, t0, t1)}}
+
+    journal = _Journal(path)
+    journal.write("start", {"pid": 42, "time": 1.0, "pipeline": "demo", "version": ""})
+    journal.record_jobs(merged, log_state)
+    journal.record_jobs(merged, log_state)  # no transition: nothing written
+    log_state["trim"]["s1"] = _job(DONE, t0, t1)
+    journal.record_jobs(merged, log_state)
+    tracker = _JobResources()
+    tracker.jobs[("trim", "s1")] = {"rss": 2 * 1024**3, "cpu": 3.0, "first": 10.0, "last": 20.0}
+    journal.record_resources(tracker)
+    journal.close()
+    assert len(path.read_text().splitlines()) == 5
+
+    with open(path, "a") as fh:
+        fh.write('{"job":["trim","s2"')  # interrupted write
+    data = _load_journal(path)
+    assert data["start"]["pid"] == 42
+    assert data["end"] is None
+    assert data["jobs"][("trim", "s1")] == ["done", t0.timestamp(), t1.timestamp(), "log"]
+    assert data["jobs"][("slicer", "job_1")][3] == "sm"
+    assert data["resources"][("trim", "s1")]["rss"] == 2 * 1024**3
+
+    log_done, sm_done = _journal_states(data)
+    assert log_done["trim"]["s1"] == _job(DONE, t0, t1)
+    assert sm_done["slicer"]["job_1"]["state"] == DONE
+
+    # compaction keeps one record per job
+    _Journal(path, data, compact=True).close()
+    assert len(path.read_text().splitlines()) == 4
+    assert _load_journal(path)["jobs"] == data["jobs"]
+
+
+def test_load_journal_missing(tmp_path):
+    assert _load_journal(tmp_path / "monitor.journal") is None
+
+
+def test_journal_states_running_only_when_attached():
+    data = {"jobs": {("trim", "s1"): ["running", 1.0, None, "log"], ("trim", "s2"): ["failed", 1.0, 2.0, "log"]}}
+    assert _journal_states(data) == ({}, {})
+    log_state, _ = _journal_states(data, running=True)
+    assert log_state["trim"]["s1"]["state"] == RUNNING
+    assert log_state["trim"]["s2"]["state"] == FAILED
+
+
+def test_snakemake_log_parser_checkpoint_restore(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text(
+        "[Wed Jan  1 12:00:00 2025]\nrule align:\n    jobid: 3\n    wildcards: sample=s2\n"
+        "rule trim:\n    jobid: 4\n[Wed Jan  1 12:01:00 2025]\nFinished job 4.\n"
+    )
+    parser = _SnakemakeLogParser(log)
+    state = parser.update()
+    assert parser.jobid_to_rule == {"3": "align"}  # finished jobs are forgotten
+
+    restored = _SnakemakeLogParser(log, state)
+    restored.restore(parser.checkpoint())
+    with open(log, "a") as fh:
+        fh.write("[Wed Jan  1 12:02:00 2025]\nFinished job 3.\n")
+    state = restored.update()
+    assert state["trim"]["job_1"]["state"] == DONE
+    assert state["align"]["sample=s2"]["state"] == DONE
+    assert state["align"]["sample=s2"]["start"] == datetime(2025, 1, 1, 12, 0)
+
+
+def test_returncode_from_log(tmp_path):
+    log = tmp_path / "snakemake.log"
+    log.write_text("Finished job 0.\n10 of 10 steps (100%) done\n")
+    assert _returncode_from_log(log) == 0
+    log.write_text("Error in rule trim:\nExiting because a job execution failed. Look above for error message\n")
+    assert _returncode_from_log(log) == 1
+    assert _returncode_from_log(tmp_path / "missing.log") == 1
+
+
+def test_is_snakemake():
+    assert _is_snakemake(["/usr/bin/python3", "/env/bin/snakemake", "-s", "x.rules", "--profile", "p"])
+    assert _is_snakemake(["snakemake", "-s", "x.rules"])
+    assert not _is_snakemake(["snakemake", "-s", "x.rules", "--dryrun"])
+    assert not _is_snakemake(["python", "-m", "snakemake", "--target-jobs", "trim:sample=A"])
+    assert not _is_snakemake(["bash", "-c", "fastqc"])
+
+
+def test_attached_process_exit_code_from_log(tmp_path):
+    import subprocess
+
+    log = tmp_path / "snakemake.log"
+    log.write_text("Exiting because a job execution failed.\n")
+    child = subprocess.Popen(["sleep", "0.2"])
+    proc = _AttachedProcess(child.pid, log)
+    assert proc.poll() is None
+    proc.send_signal(2)  # not forwarded
+    child.wait()
+    assert proc.poll() == 1
+
+
 # ── _build_display ────────────────────────────────────────────────────────────
 
 
@@ -243,8 +664,8 @@ def test_build_display_renders(tmp_path):
     from rich.console import Console
 
     current = {
-        "fastqc": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}},
-        "multiqc": {"s1": {"state": RUNNING, "start": datetime.now(), "end": None}},
+        "fastqc": {"s1": _job(DONE, datetime.now(), datetime.now())},
+        "multiqc": {"s1": _job(RUNNING, datetime.now())},
     }
     expected = {"fastqc": 1, "multiqc": 1}
     group = _build_display("test", "1.0", expected, current, time.time(), None)
@@ -267,7 +688,7 @@ def test_build_display_with_failed():
     from rich.console import Console
 
     current = {
-        "trim": {"s1": {"state": FAILED, "start": datetime.now(), "end": datetime.now()}},
+        "trim": {"s1": _job(FAILED, datetime.now(), datetime.now())},
     }
     group = _build_display("pipe", "2.0", {"trim": 1}, current, time.time(), None)
     buf = io.StringIO()
@@ -280,7 +701,7 @@ def test_build_display_eta_computed():
 
     # Create a state with done jobs so ETA is computed
     current = {
-        "rule1": {f"s{i}": {"state": DONE, "start": datetime.now(), "end": datetime.now()} for i in range(3)},
+        "rule1": {f"s{i}": _job(DONE, datetime.now(), datetime.now()) for i in range(3)},
     }
     expected = {"rule1": 10}
     group = _build_display("pipe", "", expected, current, time.time() - 30, None)
@@ -288,14 +709,213 @@ def test_build_display_eta_computed():
     Console(file=buf, width=120).print(group)
 
 
+def test_job_record_item_access():
+    t0 = datetime(2025, 1, 1, 12, 0)
+    job = _job(DONE, t0, t0 + timedelta(seconds=5))
+    assert job["state"] == DONE
+    assert job["start"] == t0
+    assert job["end"] - job["start"] == timedelta(seconds=5)
+    assert _job(RUNNING, t0).get("end") is None
+    with pytest.raises(KeyError):
+        job["rule"]
+
+
+def test_merge_states_transitions():
+    from sequana_pipetools.monitor import _merge_states
+
+    t0 = datetime.now() - timedelta(minutes=5)
+    log_state = {"trim": {"s1": _job(RUNNING, t0), "s2": _job(RUNNING, t0)}}
+    sm_state = {"trim": {"sample=s3": _job(RUNNING, t0)}}
+    merged, prev = _merge_states(log_state, sm_state, {})
+    snapshot = prev["trim"]["s1"]
+
+    # s1 log goes stale while snakemake still runs a trim job: held RUNNING
+    log_state["trim"]["s1"].state = DONE
+    merged, prev = _merge_states(log_state, sm_state, prev)
+    assert merged["trim"]["s1"].state == RUNNING
+    assert prev["trim"]["s1"] is snapshot  # updated in place, not copied
+
+    # snakemake done with the rule: RUNNING→DONE timed by the monitor
+    sm_state["trim"]["sample=s3"].state = DONE
+    merged, prev = _merge_states(log_state, sm_state, prev)
+    job = merged["trim"]["s1"]
+    assert job.state == DONE and job.start == t0.timestamp()
+    assert time.time() - job.end < 5
+    end = job.end
+
+    # a later trim job does not bring s1 back to RUNNING and its end is kept
+    sm_state["trim"]["sample=s4"] = _job(RUNNING, datetime.now())
+    log_state["trim"]["s1"].end = time.time() + 100
+    merged, prev = _merge_states(log_state, sm_state, prev)
+    assert merged["trim"]["s1"].state == DONE
+    assert merged["trim"]["s1"].end == end
+
+
+def test_rule_counters_incremental():
+    from sequana_pipetools.monitor import _RuleCounters
+
+    t0 = datetime.now()
+    state = {"trim": OrderedDict([("s1", _job(RUNNING, t0))])}
+    counters = _RuleCounters(time.time() - 60).update(state)
+    assert counters.totals[RUNNING] == 1
+    assert counters.rules["trim"].running == {"s1": t0.timestamp()}
+
+    state["trim"]["s1"] = _job(DONE, t0, t0 + timedelta(seconds=30))
+    state["trim"]["s2"] = _job(FAILED, t0, t0)
+    counters.update(state)
+    rc = counters.rules["trim"]
+    assert rc.counts[DONE] == 1 and rc.counts[FAILED] == 1 and rc.counts[RUNNING] == 0
+    assert rc.running == {} and list(rc.failed) == ["s2"]
+    assert rc.max_done == 30
+    assert counters.totals == {DONE: 1, RUNNING: 0, FAILED: 1, WAITING: 0}
+
+    # jobs and rules that disappear from the state are no longer counted
+    counters.update({"trim": OrderedDict([("s1", state["trim"]["s1"])])})
+    assert counters.totals[FAILED] == 0
+    counters.update({})
+    assert counters.rules == {} and counters.totals[DONE] == 0
+
+
+def test_rule_counters_shrinking_rule():
+    from sequana_pipetools.monitor import _RuleCounters
+
+    t0 = datetime.now()
+    done = _job(DONE, t0, t0 + timedelta(seconds=10))
+    state = {
+        "A": OrderedDict([("s1", done), ("s2", done)]),
+        "B": OrderedDict([("_job_1", _job(RUNNING, t0)), ("_job_2", _job(RUNNING, t0))]),
+    }
+    counters = _RuleCounters(time.time() - 60).update(state)
+    assert counters.totals == {DONE: 2, RUNNING: 2, FAILED: 0, WAITING: 0}
+
+    # the snakemake-log entries of B are replaced by a log file
+    state["B"] = OrderedDict([("s1", _job(RUNNING, t0))])
+    counters.update(state)
+    assert list(counters.rules) == ["A", "B"]
+    assert counters.rules["A"].counts[DONE] == 2
+    assert counters.rules["B"].counts[RUNNING] == 1
+    assert counters.totals == {DONE: 2, RUNNING: 1, FAILED: 0, WAITING: 0}
+
+
+def test_rule_counters_transitions():
+    from sequana_pipetools.monitor import _merge_states, _RuleCounters
+
+    t0 = datetime.now()
+    log_state = {"trim": OrderedDict([("s1", _job(RUNNING, t0)), ("s2", _job(RUNNING, t0))])}
+    sm_state = {"map": OrderedDict([("job_1", _job(RUNNING, t0)), ("job_2", _job(RUNNING, t0))])}
+    counters = _RuleCounters(time.time() - 60)
+    prev: dict = {}
+
+    def scan():
+        nonlocal prev
+        transitions = []
+        merged, prev = _merge_states(log_state, sm_state, prev, transitions)
+        counters.update(merged, transitions)
+        # same counts as counting every job again
+        full = _RuleCounters(counters.start_time).update(merged)
+        assert counters.totals == full.totals
+        assert {r: rc.counts for r, rc in counters.rules.items()} == {r: rc.counts for r, rc in full.rules.items()}
+        return transitions
+
+    assert len(scan()) == 4
+    assert scan() == []  # nothing changed: nothing to count
+
+    log_state["trim"]["s1"].state = DONE
+    transitions = scan()
+    assert transitions == [("trim", "s1", log_state["trim"]["s1"])]
+    assert counters.rules["trim"].counts[DONE] == 1
+
+    # map jobs superseded by log files, trim no longer reported
+    del log_state["trim"]
+    log_state["map"] = OrderedDict([("s1", _job(RUNNING, t0))])
+    sm_state.clear()
+    transitions = scan()
+    assert ("trim", None, None) in transitions and ("map", "job_1", None) in transitions
+    assert counters.totals == {DONE: 0, RUNNING: 1, FAILED: 0, WAITING: 0}
+
+
+def _render(group) -> str:
+    buf = io.StringIO()
+    Console(file=buf, width=200).print(group)
+    return buf.getvalue()
+
+
+def test_build_display_collapse_done_and_top():
+    now = datetime.now()
+    current = {
+        "fastqc": {"s1": _job(DONE, now, now)},
+        "trim": {"s1": _job(DONE, now, now)},
+        "align": {f"s{i}": _job(RUNNING, now) for i in range(3)},
+        "sort": {"s1": _job(RUNNING, now)},
+    }
+    expected = {"fastqc": 1, "trim": 1, "align": 3, "sort": 1, "multiqc": 1}
+    output = _render(_build_display("test", "1.0", expected, current, time.time(), None, collapse_done=True))
+    assert "2 finished steps" in output
+    assert "fastqc" not in output and "align" in output and "multiqc" in output
+
+    output = _render(_build_display("test", "1.0", expected, current, time.time(), None, top=1))
+    assert "align" in output and "sort" not in output
+    assert "4 more steps (2 done, 1 running, 1 waiting)" in output
+
+
+def test_build_display_large_rule_lists_active_samples_only():
+    now = datetime.now()
+    jobs = {f"s{i}": _job(DONE, now, now) for i in range(100)}
+    jobs["s100"] = _job(RUNNING, now)
+    output = _render(_build_display("test", "1.0", {"align": 200}, {"align": jobs}, time.time(), None))
+    assert "s100" in output
+    assert "s99" not in output
+    assert "100/200" in output
+
+
+# ── _Scheduler ───────────────────────────────────────────────────────────────
+
+
+def test_scheduler_tasks_due_at_start():
+    sched = _Scheduler({"scan": 0.5, "render": 1.0})
+    now = time.monotonic()
+    assert sched.due("scan", now)
+    assert sched.due("render", now)
+
+
+def test_scheduler_backoff_and_reset():
+    sched = _Scheduler({"scan": 0.5}, max_interval=3.0)
+    sched.done("scan", 100.0, changed=False)
+    assert sched.interval["scan"] == 1.0
+    assert not sched.due("scan", 100.5)
+    assert sched.due("scan", 101.0)
+    for _ in range(5):
+        sched.done("scan", 100.0, changed=False)
+    assert sched.interval["scan"] == 3.0  # capped
+    sched.done("scan", 100.0, changed=True)
+    assert sched.interval["scan"] == 0.5
+
+
+def test_scheduler_wake_and_wait():
+    sched = _Scheduler({"scan": 0.5, "render": 2.0}, max_interval=8.0)
+    sched.done("scan", 10.0, changed=False)
+    sched.done("render", 10.0, changed=False)
+    assert sched.wait(10.0) == pytest.approx(1.0)
+    sched.wake("render", 10.5)
+    assert sched.due("render", 10.5)
+    assert sched.interval["render"] == 2.0
+
+
 # ── _parse_dryrun ─────────────────────────────────────────────────────────────
 
 
+def _fake_popen(output: str, returncode: int = 0):
+    proc = MagicMock()
+    proc.stdout = io.StringIO(output)
+    proc.wait.return_value = returncode
+    return proc
+
+
 def test_parse_dryrun_exception(tmp_path):
     """Falls back to ({}, {}) on subprocess error."""
     from sequana_pipetools.monitor import _parse_dryrun
 
-    with patch("subprocess.run", side_effect=Exception("timeout")):
+    with patch("subprocess.Popen", side_effect=Exception("timeout")):
         expected, log_to_job = _parse_dryrun("pipeline.rules", "profile", tmp_path)
 
     assert expected == OrderedDict()
@@ -320,11 +940,7 @@ def test_parse_dryrun_parses_output(tmp_path):
         "multiqc   1\n"
         "total     3\n"
     )
-    mock_result = MagicMock()
-    mock_result.stdout = fake_output
-    mock_result.stderr = ""
-
-    with patch("subprocess.run", return_value=mock_result):
+    with patch("subprocess.Popen", return_value=_fake_popen(fake_output)):
         expected, log_to_job = _parse_dryrun("pipeline.rules", "profile", tmp_path)
 
     assert expected.get("fastqc") == 2
@@ -338,17 +954,121 @@ def test_parse_dryrun_with_configfile(tmp_path):
     from sequana_pipetools.monitor import _parse_dryrun
 
     (tmp_path / "config.yaml").write_text("key: value\n")
-    mock_result = MagicMock()
-    mock_result.stdout = ""
-    mock_result.stderr = ""
 
-    with patch("subprocess.run", return_value=mock_result) as mock_sub:
+    with patch("subprocess.Popen", return_value=_fake_popen("")) as mock_sub:
         _parse_dryrun("pipeline.rules", "profile", tmp_path)
 
     called_cmd = mock_sub.call_args[0][0]
     assert "--configfile" in called_cmd
 
 
+def test_dryrun_parser_partial_counts():
+    from sequana_pipetools.monitor import _DryRunParser
+
+    parser = _DryRunParser()
+    parser._PUBLISH_EVERY = 2
+    for line in ["rule fastqc:", "    log: logs/fastqc/s1.log", "    wildcards: sample=s1", "rule fastqc:"]:
+        parser.feed(line)
+    assert parser.partial == {"fastqc": 2}  # job blocks seen so far
+    assert parser.log_to_job == {"logs/fastqc/s1.log": ("fastqc", "s1")}
+
+    for line in ["Job stats:", "job      count", "-------  -----", "fastqc   10", "multiqc  1", "total    11", ""]:
+        parser.feed(line)
+    assert parser.partial == {"fastqc": 10, "multiqc": 1}  # job stats win
+    parser.feed("rule multiqc:")
+    parser.feed("    log: multiqc/multiqc.log")
+    parser.close()
+    assert parser.log_to_job["multiqc/multiqc.log"] == ("multiqc", "multiqc")
+    assert parser.expected == {"fastqc": 10, "multiqc": 1}
+
+
+def test_parse_dryrun_failure_is_not_cached(tmp_path):
+    from sequana_pipetools.monitor import _DryRunParser, _load_dryrun_cache, _run_dryrun
+
+    output = "Job stats:\njob count\nfastqc 2\ntotal 2\n\nrule fastqc:\n"
+    with patch("subprocess.Popen", return_value=_fake_popen(output, returncode=1)):
+        parser = _DryRunParser()
+        expected, *_ = _run_dryrun("pipeline.rules", "profile", tmp_path, "key", parser)
+    assert expected == {"fastqc": 2}
+    assert not parser.complete
+    assert _load_dryrun_cache(tmp_path, "key") is None
+
+
+def test_dryrun_key_changes_with_inputs(tmp_path):
+    from sequana_pipetools.monitor import _dryrun_key
+
+    (tmp_path / "pipeline.rules").write_text("rule all:\n")
+    (tmp_path / "config.yaml").write_text("input_directory: data\ninput_pattern: '*.fastq.gz'\n")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "A.fastq.gz").touch()
+    key = _dryrun_key("pipeline.rules", tmp_path)
+    assert _dryrun_key("pipeline.rules", tmp_path) == key
+
+    (tmp_path / "data" / "other.txt").touch()  # not an input file
+    assert _dryrun_key("pipeline.rules", tmp_path) == key
+    (tmp_path / "data" / "B.fastq.gz").touch()
+    key2 = _dryrun_key("pipeline.rules", tmp_path)
+    assert key2 != key
+
+    (tmp_path / "rules").mkdir()
+    (tmp_path / "rules" / "fastqc.smk").write_text("rule fastqc:\n")
+    key3 = _dryrun_key("pipeline.rules", tmp_path)
+    assert key3 != key2
+    (tmp_path / "config.yaml").write_text("input_directory: data\ninput_pattern: '*.fastq.gz'\nthreads: 4\n")
+    assert _dryrun_key("pipeline.rules", tmp_path) != key3
+
+
+def test_run_dryrun_caches_result(tmp_path):
+    from sequana_pipetools.monitor import _load_dryrun_cache, _run_dryrun
+
+    expected, log_to_job = OrderedDict([("fastqc", 2)]), {"logs/fastqc/s1.log": ("fastqc", "s1")}
+    result = (expected, log_to_job, {"multiqc": ["fastqc"]})
+
+    def parse(snakefile, profile, workdir, parser):
+        parser.complete = True
+        parser.deps = {"multiqc": ["fastqc"]}
+        return expected, log_to_job
+
+    with patch("sequana_pipetools.monitor._parse_dryrun", side_effect=parse) as mock_parse:
+        assert _run_dryrun("pipeline.rules", "profile", tmp_path, "key1") == result
+    mock_parse.assert_called_once()
+    assert _load_dryrun_cache(tmp_path, "key1") == result
+    assert _load_dryrun_cache(tmp_path, "key2") is None
+
+    # failed dry runs are not cached
+    with patch("sequana_pipetools.monitor._parse_dryrun", return_value=(OrderedDict(), {})):
+        _run_dryrun("pipeline.rules", "profile", tmp_path, "key2")
+    assert _load_dryrun_cache(tmp_path, "key2") is None
+    assert _load_dryrun_cache(tmp_path, "key1") == result
+
+
+def test_background_dryrun(tmp_path):
+    from sequana_pipetools.monitor import _BackgroundDryRun
+
+    result = (OrderedDict([("fastqc", 1)]), {})
+    with patch("sequana_pipetools.monitor._parse_dryrun", return_value=result):
+        thread = _BackgroundDryRun("pipeline.rules", "profile", tmp_path, "key")
+        thread.start()
+        thread.join(5)
+    assert thread.result == (*result, {})
+
+
+def test_reclassify_logs(tmp_path):
+    from sequana_pipetools.monitor import _reclassify_logs
+
+    log = tmp_path / "s1" / "fastqc" / "fastqc.log"
+    log.parent.mkdir(parents=True)
+    log.touch()
+    job = _job(RUNNING, datetime.now())
+    state = {"fastqc": OrderedDict([("s1", job)])}  # guessed by _classify_log
+    watcher = _PollingLogWatcher(tmp_path)
+    watcher.active[log] = [0.0, "fastqc", "s1"]
+
+    _reclassify_logs(tmp_path, state, {"s1/fastqc/fastqc.log": ("fastqc_raw", "s1")}, watcher)
+    assert state == {"fastqc_raw": {"s1": job}}
+    assert watcher.active[log] == [0.0, "fastqc_raw", "s1"]
+
+
 # ── _ram_gb ─────────────────────────────────────────────────────────────────
 
 
@@ -412,11 +1132,7 @@ def test_scan_logs_preserves_existing_end_time(tmp_path):
     existing_end = datetime(2025, 1, 1, 12, 0, 0)
     prev = {
         "rule1": {
-            "s1": {
-                "state": RUNNING,  # not DONE → no early continue
-                "start": datetime.now(),
-                "end": existing_end,  # end already set
-            }
+            "s1": _job(RUNNING, datetime.now(), existing_end),  # not DONE → no early continue, end already set
         }
     }
     state = _scan_logs(tmp_path, prev)
@@ -431,7 +1147,7 @@ def test_scan_snakemake_log_oserror(tmp_path):
     log = tmp_path / "snakemake.log"
     log.write_text("")
 
-    prev = {"fastqc": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}}}
+    prev = {"fastqc": {"s1": _job(DONE, datetime.now(), datetime.now())}}
 
     with patch.object(Path, "read_text", side_effect=OSError("denied")):
         state = _scan_snakemake_log(log, prev)
@@ -480,7 +1196,7 @@ def test_scan_snakemake_log_snakemake8_finished(tmp_path):
 def test_build_display_with_pid_and_ram():
     """When pid is given and _ram_gb returns > 0, Peak RAM appears in output."""
     current = {
-        "rule1": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}},
+        "rule1": {"s1": _job(DONE, datetime.now(), datetime.now())},
     }
     with patch("sequana_pipetools.monitor._ram_gb", return_value=2.5):
         group = _build_display("test", "1.0", {"rule1": 1}, current, time.time(), pid=99999)
@@ -492,7 +1208,7 @@ def test_build_display_with_pid_and_ram():
 def test_build_display_with_memory_peaks():
     """Memory peak column appears when _HAS_PSUTIL=True and memory_peaks provided."""
     current = {
-        "rule1": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}},
+        "rule1": {"s1": _job(DONE, datetime.now(), datetime.now())},
     }
     with patch("sequana_pipetools.monitor._HAS_PSUTIL", True):
         group = _build_display("test", "1.0", {"rule1": 1}, current, time.time(), pid=None, memory_peaks={"rule1": 1.5})
@@ -501,10 +1217,20 @@ def test_build_display_with_memory_peaks():
     assert "Mem Peak" in buf.getvalue()
 
 
+def test_build_display_uses_given_ram():
+    """A RAM value sampled by the caller is used as is (no psutil walk)."""
+    with patch("sequana_pipetools.monitor._ram_gb") as mock_ram:
+        group = _build_display("test", "1.0", {}, {}, time.time(), pid=99999, ram=3.5)
+    mock_ram.assert_not_called()
+    buf = io.StringIO()
+    Console(file=buf, width=200).print(group)
+    assert "3.5 GB" in buf.getvalue()
+
+
 def test_build_display_rule_not_in_expected():
     """Rule in current but missing from expected is appended to display."""
     current = {
-        "extra_rule": {"s1": {"state": DONE, "start": datetime.now(), "end": datetime.now()}},
+        "extra_rule": {"s1": _job(DONE, datetime.now(), datetime.now())},
     }
     group = _build_display("test", "1.0", {"fastqc": 1}, current, time.time(), pid=None)
     buf = io.StringIO()
@@ -523,7 +1249,7 @@ def test_build_display_waiting_state():
 def test_build_display_running_with_queued_and_memory():
     """RUNNING rule with queued placeholders and memory peaks column."""
     current = {
-        "fastp": {"s1": {"state": RUNNING, "start": datetime.now(), "end": None}},
+        "fastp": {"s1": _job(RUNNING, datetime.now())},
     }
     with patch("sequana_pipetools.monitor._HAS_PSUTIL", True):
         group = _build_display(
@@ -543,7 +1269,7 @@ def test_build_display_running_with_queued_and_memory():
 def test_build_display_failed_with_show_mem():
     """FAILED rule with memory peaks shows sub-rows including mem column."""
     current = {
-        "trim": {"s1": {"state": FAILED, "start": datetime.now(), "end": datetime.now()}},
+        "trim": {"s1": _job(FAILED, datetime.now(), datetime.now())},
     }
     with patch("sequana_pipetools.monitor._HAS_PSUTIL", True):
         group = _build_display("test", "1.0", {"trim": 1}, current, time.time(), pid=None, memory_peaks={})
@@ -582,3 +1308,471 @@ def test_run_monitor_non_tty_nonzero_exit(tmp_path):
             result = run_monitor("pipeline.rules", "profile_local", workdir=str(tmp_path))
 
     assert result == 1
+
+
+def test_run_monitor_headless(tmp_path):
+    """Non-TTY stdout with events/metrics: tracked without display."""
+    import json
+    import signal
+
+    from sequana_pipetools.monitor import run_monitor
+
+    log = tmp_path / "logs" / "trim" / "s1.log"
+    log.parent.mkdir(parents=True)
+    log.write_text("trimming")
+    proc = MagicMock(pid=os.getpid(), returncode=0)
+    proc.poll.side_effect = [None, None, 0]
+    events = tmp_path / "events.jsonl"
+    metrics = tmp_path / "monitor.prom"
+    history = tmp_path / "history.json"
+
+    handler = signal.getsignal(signal.SIGINT)
+    try:
+        with patch("sequana_pipetools.monitor._load_dryrun_cache", return_value=({"trim": 1}, {}, {})), patch(
+            "subprocess.Popen", return_value=proc
+        ), patch("sys.stdout", io.StringIO()):
+            result = run_monitor(
+                "pipeline.rules",
+                "profile_local",
+                "test",
+                "1.0",
+                str(tmp_path),
+                watcher="polling",
+                scan_interval=0.01,
+                render_interval=0.01,
+                events=str(events),
+                metrics=str(metrics),
+                history=str(history),
+            )
+    finally:
+        signal.signal(signal.SIGINT, handler)
+
+    assert result == 0
+    records = [json.loads(line) for line in events.read_text().splitlines()]
+    kinds = [r["event"] for r in records]
+    assert kinds[0] == "start" and records[0]["expected"] == 1
+    assert "job_started" in kinds and kinds[-3:] == ["job_finished", "progress", "end"]
+    finished = records[-3]
+    assert (finished["rule"], finished["job"]) == ("trim", "s1")
+    progress = [r for r in records if r["event"] == "progress"][-1]
+    assert progress["rules"]["trim"] == {"expected": 1, "done": 1, "running": 0, "failed": 0}
+    text = metrics.read_text()
+    assert f'sequana_monitor_jobs{{pipeline="test",workdir="{tmp_path}",rule="trim",state="done"}} 1' in text
+    assert "sequana_monitor_exit_code" in text
+    assert list(json.loads(history.read_text())["test"]) == ["trim"]
+
+
+def test_run_monitor_idle_scans_do_not_merge(tmp_path):
+    import signal
+
+    from sequana_pipetools import monitor
+
+    log = tmp_path / "logs" / "trim" / "s1.log"
+    log.parent.mkdir(parents=True)
+    log.write_text("trimming")
+    proc = MagicMock(pid=os.getpid(), returncode=0)
+    proc.poll.side_effect = [None] * 10 + [0]
+
+    handler = signal.getsignal(signal.SIGINT)
+    try:
+        with patch("sequana_pipetools.monitor._load_dryrun_cache", return_value=({"trim": 1}, {}, {})), patch(
+            "subprocess.Popen", return_value=proc
+        ), patch("sys.stdout", io.StringIO()), patch("time.sleep"), patch(
+            "sequana_pipetools.monitor._merge_states", wraps=monitor._merge_states
+        ) as merge:
+            result = monitor.run_monitor(
+                "pipeline.rules",
+                "profile_local",
+                workdir=str(tmp_path),
+                watcher="polling",
+                scan_interval=0,
+                metrics=str(tmp_path / "monitor.prom"),
+            )
+    finally:
+        signal.signal(signal.SIGINT, handler)
+
+    assert result == 0
+    # the first scan and the final one: the scans in between found nothing new
+    assert merge.call_count == 2
+
+
+def test_event_stream(tmp_path):
+    import json
+
+    from sequana_pipetools.monitor import _EventStream, _RuleCounters
+
+    t0 = datetime.now()
+    path = tmp_path / "events.jsonl"
+    seed = {"trim": {"s1": _job(DONE, t0, t0)}}
+    stream = _EventStream(str(path), "demo", tmp_path, seed=seed)
+    state = {"trim": {"s1": _job(DONE, t0, t0), "s2": _job(RUNNING, t0)}}
+    stream.record_jobs(state)
+    stream.record_jobs(state)  # no change: nothing written
+    counters = _RuleCounters().update(state)
+    stream.progress(counters, {"trim": 3})
+    stream.progress(counters, {"trim": 3})
+    state["trim"]["s2"] = _job(FAILED, t0, t0 + timedelta(seconds=2))
+    stream.record_jobs(state)
+    stream.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["event"] for r in records] == ["job_started", "progress", "job_failed"]
+    assert records[0]["job"] == "s2" and records[0]["pipeline"] == "demo"
+    assert records[1]["totals"] == {"done": 1, "running": 1, "failed": 0, "expected": 3}
+    assert records[2]["duration"] == 2.0
+
+
+def test_write_prometheus(tmp_path):
+    from sequana_pipetools.monitor import _RuleCounters, _write_prometheus
+
+    t0 = datetime.now()
+    counters = _RuleCounters().update({"trim": {"s1": _job(DONE, t0, t0), "s2": _job(RUNNING, t0)}})
+    path = tmp_path / "run.prom"
+    _write_prometheus(path, 'my"pipe', tmp_path, counters, {"trim": 2, "align": 2}, 100.0, {"trim": 1.0})
+    text = path.read_text()
+    labels = f'pipeline="my\\"pipe",workdir="{tmp_path}"'
+    assert f'sequana_monitor_jobs{{{labels},rule="trim",state="running"}} 1' in text
+    assert f'sequana_monitor_jobs_expected{{{labels},rule="align"}} 2' in text
+    assert f'sequana_monitor_rule_peak_rss_bytes{{{labels},rule="trim"}} {1024**3}' in text
+    assert f"sequana_monitor_running{{{labels}}} 1" in text
+    assert "exit_code" not in text
+    assert list(tmp_path.iterdir()) == [path]
+
+
+# ── run_aggregate ─────────────────────────────────────────────────────────────
+
+
+def _finished_run(workdir, returncode=0, pipeline="demo"):
+    (workdir / ".sequana").mkdir(parents=True)
+    journal = _Journal(workdir / ".sequana" / "monitor.journal")
+    journal.write("start", {"pid": 1, "time": 100.0, "pipeline": pipeline, "version": "1.0"})
+    journal.write("job", ["trim", "s1", "done", 100.0, 160.0, "log"])
+    journal.write("end", {"returncode": returncode, "time": 200.0})
+    journal.close()
+    return workdir
+
+
+def test_expand_runs(tmp_path):
+    from sequana_pipetools.monitor import _expand_runs
+
+    (tmp_path / "run1" / ".sequana").mkdir(parents=True)
+    (tmp_path / "run2" / ".snakemake").mkdir(parents=True)
+    (tmp_path / "other").mkdir()
+    (tmp_path / "file.txt").touch()
+    assert _expand_runs([str(tmp_path / "*"), str(tmp_path / "run1")]) == [tmp_path / "run1", tmp_path / "run2"]
+
+
+def test_find_snakemakes():
+    from sequana_pipetools.monitor import _find_snakemakes
+
+    def proc(pid, cwd, created, cmd="snakemake -s x.rules"):
+        return MagicMock(info={"pid": pid, "cwd": cwd, "create_time": created, "cmdline": cmd.split()})
+
+    procs = [
+        proc(10, "/runs/a", 5.0),
+        proc(11, "/runs/a", 1.0),
+        proc(12, "/runs/b", 1.0, "snakemake -n"),
+        proc(13, "/runs/c", 1.0),
+        proc(14, "/elsewhere", 1.0),
+    ]
+    with patch("sequana_pipetools.monitor.psutil.process_iter", return_value=procs) as mock_iter:
+        found = _find_snakemakes([Path("/runs/a"), Path("/runs/b"), Path("/runs/c")])
+    assert found == {Path("/runs/a"): 11, Path("/runs/c"): 13}
+    mock_iter.assert_called_once()
+
+
+def test_run_tracker_finished_from_journal(tmp_path):
+    from sequana_pipetools.monitor import _LogWatcherGroup, _RunTracker
+
+    workdir = _finished_run(tmp_path / "run1", returncode=1)
+    tracker = _RunTracker(workdir, None, _LogWatcherGroup("polling"))
+    assert tracker.finished and tracker.returncode == 1
+    assert (tracker.pipeline, tracker.version) == ("demo", "1.0")
+    assert tracker.elapsed == 100.0
+    assert tracker.totals() == (1, 1, 0, 0)
+    assert tracker.scan() is False
+
+
+def test_run_aggregate(tmp_path):
+    import json
+
+    from sequana_pipetools.monitor import run_aggregate
+
+    _finished_run(tmp_path / "run1")
+    _finished_run(tmp_path / "run2", returncode=1, pipeline="variant")
+    events = tmp_path / "events.jsonl"
+    metrics = tmp_path / "runs.prom"
+    with patch("sys.stdout", io.StringIO()), patch("sequana_pipetools.monitor._find_snakemakes", return_value={}):
+        result = run_aggregate([str(tmp_path / "run*")], events=str(events), metrics=str(metrics))
+    assert result == 1
+
+    records = [json.loads(line) for line in events.read_text().splitlines()]
+    ends = {r["workdir"]: r["returncode"] for r in records if r["event"] == "end"}
+    assert ends == {str(tmp_path / "run1"): 0, str(tmp_path / "run2"): 1}
+    text = metrics.read_text()
+    assert text.count("# HELP sequana_monitor_exit_code") == 1
+    assert f'sequana_monitor_exit_code{{pipeline="variant",workdir="{tmp_path / "run2"}"}} 1' in text
+
+
+def test_run_aggregate_exited_snakemake(tmp_path):
+    import subprocess
+
+    from sequana_pipetools.monitor import _LogWatcherGroup, _RunTracker, run_aggregate
+
+    # a snakemake found running that exits before it is followed
+    child = subprocess.Popen(["true"])
+    child.wait()
+    workdir = _finished_run(tmp_path / "run1")
+    tracker = _RunTracker(workdir, child.pid, _LogWatcherGroup("polling"))
+    assert tracker.start_time and tracker.proc.poll() is not None
+
+    with patch("sys.stdout", io.StringIO()), patch(
+        "sequana_pipetools.monitor._find_snakemakes", return_value={workdir: child.pid}
+    ):
+        # followed until its end (without a snakemake log, its exit code is unknown)
+        assert run_aggregate([str(tmp_path / "run*")], scan_interval=0.05, render_interval=0.05) == 1
+
+
+def test_run_aggregate_no_run(tmp_path):
+    from sequana_pipetools.monitor import run_aggregate
+
+    with patch("sys.stdout", io.StringIO()):
+        assert run_aggregate([str(tmp_path / "*")]) == 1
+
+
+def test_build_aggregate_display(tmp_path):
+    from sequana_pipetools.monitor import (
+        _build_aggregate_display,
+        _LogWatcherGroup,
+        _RunTracker,
+    )
+
+    trackers = [_RunTracker(_finished_run(tmp_path / "run1"), None, _LogWatcherGroup("polling"))]
+    buf = io.StringIO()
+    Console(file=buf, width=160).print(_build_aggregate_display(trackers, time.time()))
+    out = buf.getvalue()
+    assert "run1" in out and "demo v1.0" in out and "1 completed" in out
+
+
+# ── run-time estimates ────────────────────────────────────────────────────────
+
+
+def test_dryrun_parser_deps():
+    from sequana_pipetools.monitor import _DryRunParser
+
+    parser = _DryRunParser()
+    lines = [
+        "rule fastp:",
+        "    input: data/s1_R1.fastq.gz, data/s1_R2.fastq.gz",
+        "    output: s1/fastp/s1_R1.fastq.gz, s1/fastp/s1_R2.fastq.gz",
+        "rule bowtie2:",
+        "    input: s1/fastp/s1_R1.fastq.gz, s1/fastp/s1_R2.fastq.gz",
+        "    output: s1/bowtie2/s1.bam",
+        "rule multiqc:",
+        "    input: s1/bowtie2/s1.bam, s1/fastp/s1_R1.fastq.gz",
+        "    output: multiqc/multiqc_report.html",
+    ]
+    for line in lines:
+        parser.feed(line)
+    parser.close()
+    assert parser.deps == {"bowtie2": ["fastp"], "multiqc": ["bowtie2", "fastp"]}
+
+
+def test_duration_history(tmp_path):
+    from sequana_pipetools.monitor import _DurationHistory, _RuleCounters
+
+    t0 = datetime.now()
+    counters = _RuleCounters(t0.timestamp()).update(
+        {
+            "trim": {f"s{i}": _job(DONE, t0, t0 + timedelta(seconds=10 * i)) for i in (1, 2, 3)},
+            "map": {"s1": _job(RUNNING, t0)},
+        }
+    )
+    path = tmp_path / "history" / "durations.json"
+    _DurationHistory(path).record("demo", counters, input_gb=2.0)
+
+    history = _DurationHistory(path)
+    assert history.data["demo"]["trim"] == {"durations": [10.0, 20.0, 30.0], "per_gb": [5.0, 10.0, 15.0]}
+    assert "map" not in history.data["demo"]
+    assert history.estimates("demo") == {"trim": 20.0}
+    assert history.estimates("demo", input_gb=4.0) == {"trim": 40.0}  # scaled to the input size
+    assert history.estimates("other") == {}
+    assert _DurationHistory(tmp_path / "missing.json").data == {}
+
+
+def test_duration_history_concurrent(tmp_path):
+    from sequana_pipetools.monitor import _DurationHistory, _RuleCounters
+
+    t0 = datetime.now()
+
+    def done(rule, seconds):
+        return _RuleCounters(t0.timestamp()).update({rule: {"s1": _job(DONE, t0, t0 + timedelta(seconds=seconds))}})
+
+    path = tmp_path / "durations.json"
+    # two monitors load the history, then finish one after the other
+    first, second = _DurationHistory(path), _DurationHistory(path)
+    first.record("demo", done("trim", 10))
+    second.record("demo", done("map", 20))
+    second.record("other", done("trim", 5))
+
+    data = _DurationHistory(path).data
+    assert data["demo"]["trim"]["durations"] == [10.0]
+    assert data["demo"]["map"]["durations"] == [20.0]
+    assert data["other"]["trim"]["durations"] == [5.0]
+
+
+def test_eta_model():
+    from sequana_pipetools.monitor import _EtaModel, _RuleCounters
+
+    t0 = datetime(2025, 1, 1, 8)
+    now = (t0 + timedelta(seconds=100)).timestamp()
+    state = {"trim": {"s1": _job(DONE, t0, t0 + timedelta(seconds=60)), "s2": _job(RUNNING, t0)}}
+    counters = _RuleCounters(t0.timestamp()).update(state)
+    expected = {"trim": 4, "map": 4, "report": 1}
+    deps = {"map": ["trim"], "report": ["map"]}
+
+    # nothing done yet and no history: no estimate
+    waiting = _RuleCounters(t0.timestamp()).update({"trim": {"s2": _job(RUNNING, t0)}})
+    assert _EtaModel(deps).remaining(waiting, expected, now) is None
+    # without history, the median of the jobs done so far (60s) is used for all rules
+    assert _EtaModel(deps).remaining(counters, expected, now) == 420.0
+
+    history = {"map": 30.0, "report": 5.0}
+    # critical path: trim (60s, jobs still waiting) → map (30s) → report (5s)
+    assert _EtaModel(deps, history, parallelism=100).remaining(counters, expected, now) == 95.0
+    # one job at a time: 2 trim jobs waiting, 4 map jobs, 1 report (s2 is overdue)
+    assert _EtaModel(deps, history, parallelism=1).remaining(counters, expected, now) == 245.0
+    # without the DAG, rules are independent
+    assert _EtaModel({}, history, parallelism=100).remaining(counters, expected, now) == 60.0
+
+    # the medians are computed again only when a job is done
+    model = _EtaModel(deps)
+    with patch("statistics.median", wraps=statistics.median) as median:
+        model.remaining(counters, expected, now)
+        model.remaining(counters, expected, now)
+        assert median.call_count == 2  # trim, all the rules
+        state["trim"]["s2"] = _job(DONE, t0, t0 + timedelta(seconds=20))
+        counters.update(state)
+        assert model.remaining(counters, expected, now) == 280.0  # 7 jobs of 40s
+        assert median.call_count == 4
+
+
+def test_profile_parallelism_and_input_gb(tmp_path):
+    from sequana_pipetools.monitor import _input_gb, _profile_parallelism
+
+    profile = tmp_path / ".sequana" / "profile_local"
+    profile.mkdir(parents=True)
+    (profile / "config.yaml").write_text("cores: 8\nprintshellcmds: true\n")
+    assert _profile_parallelism(tmp_path, ".sequana/profile_local") == 8
+    assert _profile_parallelism(tmp_path, "missing") is None
+
+    assert _input_gb(tmp_path) is None
+    (tmp_path / "config.yaml").write_text("input_directory: data\ninput_pattern: '*.fastq.gz'\n")
+    (tmp_path / "data").mkdir()
+    for name, size in (("a.fastq.gz", 1024**2), ("b.fastq.gz", 3 * 1024**2), ("notes.txt", 10)):
+        (tmp_path / "data" / name).write_bytes(b"0" * size)
+    assert _input_gb(tmp_path) == pytest.approx(2 / 1024)
+
+
+def test_build_display_eta_model():
+    from sequana_pipetools.monitor import _EtaModel, _RuleCounters
+
+    start = int(time.time()) - 100
+    t0 = datetime.fromtimestamp(start)
+    state = {"trim": {"s1": _job(DONE, t0, t0 + timedelta(seconds=60)), "s2": _job(WAITING, t0)}}
+    counters = _RuleCounters(start).update(state)
+    group = _build_display(
+        "demo", "1.0", {"trim": 2}, state, start, None, {}, counters=counters, eta_model=_EtaModel(parallelism=1)
+    )
+    console = Console(file=io.StringIO(), width=200)
+    console.print(group)
+    assert "~1m" in console.file.getvalue()
+
+
+# ── stragglers and stalls ─────────────────────────────────────────────────────
+
+
+def test_job_health_stragglers():
+    from sequana_pipetools.monitor import _JobHealth, _RuleCounters
+
+    t0 = datetime(2025, 1, 1, 8)
+    state = {"trim": {f"s{i}": _job(DONE, t0, t0 + timedelta(seconds=100)) for i in range(3)}}
+    state["trim"]["slow"] = _job(RUNNING, t0)
+    state["trim"]["ok"] = _job(RUNNING, t0 + timedelta(seconds=200))
+    counters = _RuleCounters(t0.timestamp()).update(state)
+    health = _JobHealth(Path("."))
+
+    now = (t0 + timedelta(seconds=350)).timestamp()
+    assert health.check(counters, now) == [("job_straggler", "trim", "slow", {"runtime": 350, "median": 100.0})]
+    assert health.flags("trim", "slow") == "slow" and health.flags("trim", "ok") == ""
+    assert health.check(counters, now) == []  # reported once
+
+    state["trim"]["slow"] = _job(DONE, t0, t0 + timedelta(seconds=360))
+    counters.update(state)
+    health.check(counters, now)
+    assert not health.stragglers
+
+    # too few jobs done for a median
+    counters = _RuleCounters(t0.timestamp()).update({"map": {"a": state["trim"]["s0"], "b": _job(RUNNING, t0)}})
+    assert _JobHealth(Path(".")).check(counters, now) == []
+
+
+def test_job_health_stalled(tmp_path):
+    from sequana_pipetools.monitor import _JobHealth, _JobResources, _RuleCounters
+
+    log = tmp_path / "logs" / "map" / "s1.log"
+    log.parent.mkdir(parents=True)
+    log.write_text("mapping")
+    t0 = time.time() - 3600
+    os.utime(log, (t0 + 60, t0 + 60))
+    state = {"map": {"s1": _Job(RUNNING, t0), "s2": _Job(RUNNING, t0)}}
+    counters = _RuleCounters(t0).update(state)
+    resources = _JobResources()
+    health = _JobHealth(tmp_path, {"logs/map/s1.log": ("map", "s1")}, resources, stall_after=600)
+
+    # s1: log idle for ~59 min; s2: no log nor process known, never stalled
+    changes = health.check(counters, t0 + 3600)
+    assert [c[:3] for c in changes] == [("job_stalled", "map", "s1")]
+    assert changes[0][3]["idle"] == 3540
+    assert health.flags("map", "s1") == "stalled"
+
+    # CPU used again
+    resources.jobs[("map", "s1")] = {"rss": 0, "cpu": 30.0, "first": t0, "last": t0 + 3590}
+    assert health.check(counters, t0 + 3600) == [("job_resumed", "map", "s1", {"runtime": 3600})]
+    # no CPU used since
+    resources.jobs[("map", "s1")].update(cpu=30.5, last=t0 + 4500)
+    assert [c[0] for c in health.check(counters, t0 + 4500)] == ["job_stalled"]
+    # the log grows
+    os.utime(log, (t0 + 4400, t0 + 4400))
+    assert [c[0] for c in health.check(counters, t0 + 4500)] == ["job_resumed"]
+
+
+def test_event_stream_record_health(tmp_path):
+    import json
+
+    from sequana_pipetools.monitor import _EventStream
+
+    path = tmp_path / "events.jsonl"
+    stream = _EventStream(str(path), "demo", tmp_path)
+    stream.record_health([("job_stalled", "map", "s1", {"runtime": 4000, "idle": 1900})])
+    stream.close()
+    record = json.loads(path.read_text())
+    assert (record["event"], record["rule"], record["job"], record["idle"]) == ("job_stalled", "map", "s1", 1900)
+
+
+def test_build_display_health():
+    from sequana_pipetools.monitor import _JobHealth, _RuleCounters
+
+    start = int(time.time()) - 1000
+    t0 = datetime.fromtimestamp(start)
+    state = {"trim": {f"s{i}": _job(DONE, t0, t0 + timedelta(seconds=60)) for i in range(3)}}
+    state["trim"]["late"] = _job(RUNNING, t0)
+    counters = _RuleCounters(start).update(state)
+    health = _JobHealth(Path("."))
+    health.check(counters)
+    group = _build_display("demo", "1.0", {"trim": 4}, state, start, None, {}, counters=counters, health=health)
+    console = Console(file=io.StringIO(), width=200)
+    console.print(group)
+    output = console.file.getvalue()
+    assert "Stragglers: 1 jobs" in output
+    assert "⚠ slow" in output